@@ -0,0 +1,186 @@
+import logging
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+ORGANIZATION_CONTEXT_TIMEOUT = 60 * 10
+
+# cached in place of a row which does not exist, None means "not cached"
+MISSING = "missing"
+
+
+def default_organization_user_key(user_id) -> str:
+    return f"organization-context:user:{user_id}"
+
+
+def domain_organization_user_key(user_id, domain) -> str:
+    return f"organization-context:user:{user_id}:domain:{domain}"
+
+
+def domain_organization_key(domain) -> str:
+    return f"organization-context:domain:{domain}"
+
+
+def _get_or_load(key, loader):
+    try:
+        value = cache.get(key)
+    except Exception:
+        logger.warning("Organization context cache is unavailable, reading %s", key)
+        return loader()
+
+    if isinstance(value, str) and value == MISSING:
+        return None
+    if value is not None:
+        return value
+
+    value = loader()
+    try:
+        cache.set(
+            key, MISSING if value is None else value, ORGANIZATION_CONTEXT_TIMEOUT
+        )
+    except Exception:
+        logger.warning("Could not cache organization context %s", key)
+    return value
+
+
+def get_default_organization_user(user_id):
+    """The default `OrganizationUser` of a user with its organization, or None."""
+    from accountio.models import OrganizationUser
+
+    return _get_or_load(
+        default_organization_user_key(user_id),
+        lambda: OrganizationUser.objects.select_related("organization")
+        .filter(user_id=user_id, is_default=True)
+        .first(),
+    )
+
+
+def get_domain_organization_user(user_id, domain):
+    """The membership of a user in the organization serving `domain`, or None."""
+    from accountio.models import OrganizationUser
+
+    return _get_or_load(
+        domain_organization_user_key(user_id, domain),
+        lambda: OrganizationUser.objects.select_related("organization")
+        .filter(user_id=user_id, organization__domain=domain)
+        .first(),
+    )
+
+
+def get_domain_organization(domain):
+    """The editable organization serving `domain`, or None."""
+    from accountio.models import Organization
+
+    return _get_or_load(
+        domain_organization_key(domain),
+        lambda: Organization.objects.get_status_editable()
+        .filter(domain=domain)
+        .first(),
+    )
+
+
+def _delete_on_commit(keys):
+    keys = list(keys)
+    if not keys:
+        return
+
+    def delete():
+        try:
+            cache.delete_many(keys)
+        except Exception:
+            logger.warning("Could not invalidate organization context %s", keys)
+
+    # drop them now and again after commit, so a concurrent request cannot
+    # cache the rows of the old transaction state
+    delete()
+    transaction.on_commit(delete)
+
+
+def invalidate_organization_user(organization_user):
+    keys = [default_organization_user_key(organization_user.user_id)]
+    try:
+        domain = organization_user.organization.domain
+    except ObjectDoesNotExist:
+        domain = None
+    if domain:
+        keys.append(domain_organization_user_key(organization_user.user_id, domain))
+    _delete_on_commit(keys)
+
+
+def invalidate_organization(organization):
+    from accountio.models import OrganizationUser
+
+    domains = {domain for domain in (organization.domain, organization.slug) if domain}
+    keys = [domain_organization_key(domain) for domain in domains]
+    for user_id in OrganizationUser.objects.filter(
+        organization=organization
+    ).values_list("user_id", flat=True):
+        keys.append(default_organization_user_key(user_id))
+        keys += [domain_organization_user_key(user_id, domain) for domain in domains]
+    _delete_on_commit(keys)
+
+
+class OrganizationContext:
+    """Organization lookups of one request.
+
+    Attached by `OrganizationContextMiddleware` before DRF authenticates, so the user
+    is only read when a permission, view or serializer asks for it. The default
+    organization user is shared with `User.get_organization()` of the request user.
+    """
+
+    def __init__(self, request):
+        self._request = request
+        self._domain_organization = {}
+        self._domain_organization_user = {}
+
+    @property
+    def user(self):
+        return self._request.user
+
+    @property
+    def domain(self):
+        return self._request.headers.get("X-DOMAIN", None)
+
+    @property
+    def organization_user(self):
+        if not self.user.is_authenticated:
+            return None
+        return self.user.get_default_organization_user()
+
+    @property
+    def organization(self):
+        organization_user = self.organization_user
+        return organization_user.organization if organization_user else None
+
+    @property
+    def domain_organization(self):
+        if not self.domain:
+            return None
+
+        if self.domain not in self._domain_organization:
+            self._domain_organization[self.domain] = get_domain_organization(
+                self.domain
+            )
+        return self._domain_organization[self.domain]
+
+    @property
+    def domain_organization_user(self):
+        if not self.domain or not self.user.is_authenticated:
+            return None
+
+        key = (self.user.pk, self.domain)
+        if key not in self._domain_organization_user:
+            self._domain_organization_user[key] = get_domain_organization_user(*key)
+        return self._domain_organization_user[key]
+
+
+def get_organization_context(request) -> OrganizationContext:
+    """Return the context of `request`, also for requests which skipped the middleware."""
+    request = getattr(request, "_request", request)
+    context = getattr(request, "organization_context", None)
+    if context is None:
+        context = request.organization_context = OrganizationContext(request)
+    return context
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Max, Sum
 
 from .choices import OrganizationStatus, OrganizationUserStatus
 
@@ -29,3 +30,41 @@ class OrganizationUserQuerySet(models.QuerySet):
             OrganizationUserStatus.HIDDEN,
         ]
         return self.filter(status__in=statuses)
+
+
+class CustomerBalanceQuerySet(models.QuerySet):
+    def refresh(self, organization_id, user_id):
+        """Recalculate the balance of a customer from its orders and transactions.
+
+        The balance row is locked first, so concurrent writers of the same customer
+        are serialized and the later one aggregates the rows of the earlier one.
+        """
+        from orderio.models import Order
+
+        from .models import TransactionOrganizationUser
+
+        with transaction.atomic():
+            self.get_or_create(organization_id=organization_id, user_id=user_id)
+            customer_balance = self.select_for_update().get(
+                organization_id=organization_id, user_id=user_id
+            )
+
+            orders = Order.objects.filter(
+                organization_id=organization_id, customer_id=user_id
+            ).aggregate(
+                total_buy=Sum("total_price", default=0),
+                order_count=Count("id"),
+                last_order_at=Max("created_at"),
+            )
+            total_pay = TransactionOrganizationUser.objects.filter(
+                organization_id=organization_id, user_id=user_id
+            ).aggregate(total_pay=Sum("payable_money", default=0))["total_pay"]
+
+            customer_balance.total_buy = orders["total_buy"]
+            customer_balance.total_pay = total_pay
+            customer_balance.balance = total_pay - orders["total_buy"]
+            customer_balance.order_count = orders["order_count"]
+            customer_balance.last_order_at = orders["last_order_at"]
+            customer_balance.save()
+
+        return customer_balance
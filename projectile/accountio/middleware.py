@@ -0,0 +1,12 @@
+from .context import OrganizationContext
+
+
+class OrganizationContextMiddleware:
+    """Attach a lazy `OrganizationContext` as `request.organization_context`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.organization_context = OrganizationContext(request)
+        return self.get_response(request)
@@ -0,0 +1,61 @@
+from django.db import migrations
+from django.db.models import Count, Max, Sum
+
+
+def backfill_customer_balances(apps, schema_editor):
+    CustomerBalance = apps.get_model("accountio", "CustomerBalance")
+    TransactionOrganizationUser = apps.get_model(
+        "accountio", "TransactionOrganizationUser"
+    )
+    Order = apps.get_model("orderio", "Order")
+
+    balances = {}
+    for row in (
+        Order.objects.values("organization_id", "customer_id")
+        .order_by()
+        .annotate(
+            total_buy=Sum("total_price", default=0),
+            order_count=Count("id"),
+            last_order_at=Max("created_at"),
+        )
+    ):
+        balances[(row["organization_id"], row["customer_id"])] = CustomerBalance(
+            organization_id=row["organization_id"],
+            user_id=row["customer_id"],
+            total_buy=row["total_buy"],
+            order_count=row["order_count"],
+            last_order_at=row["last_order_at"],
+        )
+
+    for row in (
+        TransactionOrganizationUser.objects.values("organization_id", "user_id")
+        .order_by()
+        .annotate(total_pay=Sum("payable_money", default=0))
+    ):
+        key = (row["organization_id"], row["user_id"])
+        if key not in balances:
+            balances[key] = CustomerBalance(
+                organization_id=row["organization_id"], user_id=row["user_id"]
+            )
+        balances[key].total_pay = row["total_pay"]
+
+    for customer_balance in balances.values():
+        customer_balance.balance = (
+            customer_balance.total_pay - customer_balance.total_buy
+        )
+
+    CustomerBalance.objects.bulk_create(balances.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accountio", "0012_customerbalance"),
+        (
+            "orderio",
+            "0007_historicalreturnorderproduct_historicalorderdelivery_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_customer_balances, migrations.RunPython.noop),
+    ]
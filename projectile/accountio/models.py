@@ -14,7 +14,11 @@ from common.utils import unique_number_generator
 from core.utils import BaseModelwithUID
 
 from .choices import OrganizationStatus, OrganizationUserRole, OrganizationUserStatus
-from .managers import OrganizationQuerySet, OrganizationUserQuerySet
+from .managers import (
+    CustomerBalanceQuerySet,
+    OrganizationQuerySet,
+    OrganizationUserQuerySet,
+)
 
 User = get_user_model()
 
@@ -278,3 +282,38 @@ class TransactionOrganizationUser(BaseModelwithUID):
         if self.pk is None:
             self.serial_number = unique_number_generator(self)
         super().save(*args, **kwargs)
+
+
+class CustomerBalance(BaseModelwithUID):
+    """Running totals of a customer in an organization.
+
+    Derived from `Order` and `TransactionOrganizationUser`, it is refreshed by the
+    signals of both whenever they are written (see accountio.signals).
+    """
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="customer_balances"
+    )
+    total_buy = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_pay = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    balance = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="total_pay - total_buy, positive is an advance and negative is a due",
+    )
+    order_count = models.PositiveIntegerField(default=0)
+    last_order_at = models.DateTimeField(null=True, blank=True)
+
+    # custom managers use
+    objects = CustomerBalanceQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ("organization", "user")
+        indexes = [
+            models.Index(fields=["organization", "balance"]),
+        ]
+
+    def __str__(self):
+        return f"Org: {self.organization_id}, User: {self.user_id}, Balance: {self.balance}"
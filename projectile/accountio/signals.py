@@ -1,7 +1,20 @@
-from django.db.models.signals import pre_save, post_save
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
-from accountio.models import OrganizationUser, Organization
+from accountio.context import invalidate_organization, invalidate_organization_user
+from accountio.models import (
+    CustomerBalance,
+    OrganizationUser,
+    Organization,
+    TransactionOrganizationUser,
+)
+
+from common.utils import is_deleted_with
+
+from orderio.models import Order
+
+User = get_user_model()
 
 
 @receiver(pre_save, sender=OrganizationUser)
@@ -31,3 +44,39 @@ def organizationuser_update_all_isdefault_organization(
         OrganizationUser.objects.filter(user=instance.user, is_default=True).update(
             is_default=False
         )
+
+
+@receiver(post_save, sender=OrganizationUser)
+@receiver(post_delete, sender=OrganizationUser)
+def organizationuser_invalidate_organization_context(sender, instance, **kwargs):
+    # saving a default organization user resets the other defaults of the user,
+    # all of them live in the user keys
+    invalidate_organization_user(instance)
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def organization_invalidate_organization_context(sender, instance, **kwargs):
+    invalidate_organization(instance)
+
+
+def _deleted_with_owner(origin) -> bool:
+    # the balance row goes away with its organization or user, refreshing it
+    # there would insert a row for a parent which is being deleted
+    return is_deleted_with(origin, Organization, User)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_refresh_customer_balance(sender, instance, **kwargs):
+    if "origin" in kwargs and _deleted_with_owner(kwargs["origin"]):
+        return
+    CustomerBalance.objects.refresh(instance.organization_id, instance.customer_id)
+
+
+@receiver(post_save, sender=TransactionOrganizationUser)
+@receiver(post_delete, sender=TransactionOrganizationUser)
+def transaction_refresh_customer_balance(sender, instance, **kwargs):
+    if "origin" in kwargs and _deleted_with_owner(kwargs["origin"]):
+        return
+    CustomerBalance.objects.refresh(instance.organization_id, instance.user_id)
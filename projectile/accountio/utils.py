@@ -1,17 +1,21 @@
+from django.http import Http404
+
 from rest_framework.exceptions import NotFound
-from rest_framework.generics import get_object_or_404
 from rest_framework.request import Request
 
+from accountio.context import get_organization_context
 from accountio.models import Organization
 
 
 def get_subdomain(request: Request) -> Organization:
+    context = get_organization_context(request)
+
     # checking of header is available or not.
-    subdomain = request.headers.get("X-DOMAIN", None)
-    if subdomain is None:
+    if context.domain is None:
         raise NotFound(detail="Domain header is required.")
 
     # checking if that header is an appropriate domain or not.
-    return get_object_or_404(
-        Organization.objects.get_status_editable(), domain=subdomain
-    )
+    organization = context.domain_organization
+    if organization is None:
+        raise Http404("No Organization matches the given query.")
+    return organization
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CatalogioConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "catalogio"
+
+    def ready(self):
+        from . import signals
@@ -20,3 +20,9 @@ class ProductStatus(models.TextChoices):
 class ProductBoxType(models.TextChoices):
     WITH_BOX = "WITH BOX", "With box"
     WITHOUT_BOX = "WITHOUT BOX", "Without box"
+
+
+class ProductStockStatus(models.TextChoices):
+    IN_STOCK = "In_Stock", "In stock"
+    LOW = "Low", "Low"
+    OUT_OF_STOCK = "Out_Of_Stock", "Out of stock"
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management import BaseCommand
+
+from redisio.services.sync import PRODUCT, SearchIndexSyncService
+
+
+class Command(BaseCommand):
+    help = "Flush changed products and base products to the redis search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Maximum number of ids popped from each change log per batch",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and flush every --interval seconds",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2,
+            help="Seconds to sleep between flushes when running with --loop",
+        )
+        parser.add_argument(
+            "--reindex-products",
+            action="store_true",
+            help="Queue every product first, needed after ProductPy fields change",
+        )
+
+    def handle(self, *args, **options):
+        service = SearchIndexSyncService(batch_size=options["batch_size"])
+
+        if options["reindex_products"]:
+            queued = service.enqueue_all(PRODUCT)
+            self.stdout.write(f"Queued {queued} products for re-indexing")
+
+        while True:
+            stats = service.flush()
+            if stats["batches"]:
+                self.stdout.write(
+                    f"Synced {stats['products']} products, "
+                    f"{stats['base_products']} base products, "
+                    f"removed {stats['deleted']} documents "
+                    f"in {stats['batches']} batches ({stats['seconds']:.2f}s)"
+                )
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
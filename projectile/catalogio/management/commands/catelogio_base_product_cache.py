@@ -1,18 +1,61 @@
 from django.core.management import BaseCommand
 from tqdm import tqdm
 
-from catalogio.models import BaseProduct
-from redisio.services.base_products import BaseProductRedisServices
+from redisio.services.base_products import (
+    BaseProductRedisIndexer,
+    base_product_index_queryset,
+    ensure_search_index,
+)
 
 
 class Command(BaseCommand):
     help = "Base product saved to redis cache"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of base products fetched and written per pipeline",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue after the last id indexed by a previous run",
+        )
+        parser.add_argument(
+            "--start-id",
+            type=int,
+            default=0,
+            help="Only index base products with an id greater than this",
+        )
+
     def handle(self, *args, **options):
-        base_products = BaseProduct.objects.filter(
-            merchant_product__isnull=True
-        ).order_by("-id")
-        redis_base_product = BaseProductRedisServices()
+        indexer = BaseProductRedisIndexer(chunk_size=options["chunk_size"])
+        ensure_search_index()
+
+        start_id = options["start_id"]
+        if options["resume"]:
+            start_id = max(start_id, indexer.get_checkpoint())
+            self.stdout.write(f"Resuming after base product id {start_id}")
+        elif not start_id:
+            indexer.reset_checkpoint()
+
+        total = base_product_index_queryset().filter(id__gt=start_id).count()
+        progress = tqdm(total=total, unit="product")
+
+        def on_chunk(stats):
+            progress.update(stats["indexed"] - progress.n)
+            progress.set_postfix(last_id=stats["last_id"])
+
+        stats = indexer.run(start_id=start_id, on_chunk=on_chunk)
+        progress.close()
 
-        for base_product in tqdm(base_products):
-            redis_base_product.save(pk=base_product.id)
+        rate = stats["indexed"] / stats["seconds"] if stats["seconds"] else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {stats['indexed']} base products in {stats['chunks']} chunks, "
+                f"{stats['seconds']:.2f}s ({rate:.0f} products/s), "
+                f"last id {stats['last_id']}"
+            )
+        )
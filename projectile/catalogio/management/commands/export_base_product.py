@@ -1,46 +1,45 @@
-from typing import Any
-import pandas as pd
 from django.core.management import BaseCommand
 from tqdm import tqdm
-import uuid
-from django.http import HttpResponse
-from tempfile import NamedTemporaryFile
 from catalogio.models import BaseProduct
-import os
+from common.exports import export_rows, stream_csv, write_xlsx
+
+BASE_PRODUCT_EXPORT_COLUMNS = [
+    ("Name", "name"),
+    ("Brand", "brand__name"),
+    ("Strength", "strength"),
+    ("Category", "category__name"),
+    ("Dosage Form", "dosage_form__name"),
+    ("Description", "description"),
+    ("Unit", "unit"),
+    ("Manufacturer", "manufacturer__name"),
+    ("Route of Administration", "route_of_administration__name"),
+    ("Medicine Physical State", "medicine_physical_state__name"),
+]
 
 
 class Command(BaseCommand):
     help = "Base Product download in Excel file"
 
-    def handle(self, *args, **options):
-        base_products = BaseProduct.objects.all()
-
-        # Create a list of dictionaries containing the data
-        data = [
-            {
-                "Name": product.name,
-                "Brand": product.brand.name if product.brand else "",
-                "Strength": product.strength,
-                "Category": product.category.name if product.category else "",
-                "Dosage Form": product.dosage_form.name if product.dosage_form else "",
-                "Description": product.description,
-                "Unit": product.unit,
-                "Manufacturer": product.manufacturer.name
-                if product.manufacturer
-                else "",
-                "Route of Administration": product.route_of_administration.name
-                if product.route_of_administration
-                else "",
-                "Medicine Physical State": product.medicine_physical_state.name
-                if product.medicine_physical_state
-                else "",
-            }
-            for product in tqdm(base_products)
-        ]
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=["xlsx", "csv"], default="xlsx", help="File format"
+        )
+        parser.add_argument(
+            "--output", help="File to write, base_products.<format> by default"
+        )
 
-        # Create a DataFrame from the list of dictionaries
-        df = pd.DataFrame(data)
-
-        # Save the DataFrame to Excel format
-        df.to_excel("base_products.xlsx", index=False)
+    def handle(self, *args, **options):
+        base_products = BaseProduct.objects.order_by("id")
+        output = options["output"] or f"base_products.{options['format']}"
 
+        # the rows are read in chunks while the file is written
+        rows = tqdm(
+            export_rows(base_products, BASE_PRODUCT_EXPORT_COLUMNS),
+            total=base_products.count() + 1,
+        )
+        if options["format"] == "csv":
+            with open(output, "w", newline="") as file:
+                file.writelines(stream_csv(rows))
+        else:
+            with open(output, "wb") as file:
+                write_xlsx(rows, file)
@@ -1,6 +1,20 @@
+from collections import defaultdict
+
 from django.db import models
+from django.db.models import Case, CharField, Count, IntegerField, Value, When
+
+from redisio.services.sync import PRODUCT, mark_dirty
+
+from .choices import ProductStatus, ProductStockStatus
 
-from .choices import ProductStatus
+# upper bounds of the price facet buckets, the last bucket is open ended
+PRICE_BUCKET_BOUNDS = (50, 100, 500, 1000)
+
+FACET_RELATIONS = {
+    "categories": "base_product__category",
+    "manufacturers": "base_product__manufacturer",
+    "dosage_forms": "base_product__dosage_form",
+}
 
 
 class ProductQuerySet(models.QuerySet):
@@ -16,3 +30,103 @@ class ProductQuerySet(models.QuerySet):
             ProductStatus.UNPUBLISHED,
         ]
         return self.filter(status__in=statuses)
+
+    def get_facets(self) -> dict:
+        """Filter sidebar counts of this queryset.
+
+        One GROUP BY over every single valued facet, folded per facet in python,
+        and one grouped query for the many to many ingredients.
+        """
+        # re-select by pk so joins of the search filters cannot inflate the counts
+        products = self.model.objects.filter(
+            pk__in=self.order_by().values("pk")
+        ).annotate(
+            facet_stock_status=Case(
+                When(stock__gte=10, then=Value(ProductStockStatus.IN_STOCK)),
+                When(stock__gt=0, then=Value(ProductStockStatus.LOW)),
+                default=Value(ProductStockStatus.OUT_OF_STOCK),
+                output_field=CharField(),
+            ),
+            facet_price_bucket=Case(
+                *[
+                    When(final_price__lt=bound, then=Value(index))
+                    for index, bound in enumerate(PRICE_BUCKET_BOUNDS)
+                ],
+                default=Value(len(PRICE_BUCKET_BOUNDS)),
+                output_field=IntegerField(),
+            ),
+        )
+
+        value_fields = ["facet_stock_status", "facet_price_bucket"]
+        for relation in FACET_RELATIONS.values():
+            value_fields += [f"{relation}__slug", f"{relation}__name"]
+
+        counts = {facet: defaultdict(int) for facet in FACET_RELATIONS}
+        stock_counts = defaultdict(int)
+        price_counts = defaultdict(int)
+        total = 0
+        for row in products.values(*value_fields).annotate(count=Count("id")):
+            total += row["count"]
+            stock_counts[row["facet_stock_status"]] += row["count"]
+            price_counts[row["facet_price_bucket"]] += row["count"]
+            for facet, relation in FACET_RELATIONS.items():
+                if row[f"{relation}__slug"]:
+                    key = (row[f"{relation}__slug"], row[f"{relation}__name"])
+                    counts[facet][key] += row["count"]
+
+        ingredients = (
+            products.filter(base_product__active_ingredients__isnull=False)
+            .values(
+                "base_product__active_ingredients__slug",
+                "base_product__active_ingredients__name",
+            )
+            .annotate(count=Count("id", distinct=True))
+            .order_by("-count", "base_product__active_ingredients__name")
+        )
+
+        lower_bounds = (0,) + PRICE_BUCKET_BOUNDS
+        upper_bounds = PRICE_BUCKET_BOUNDS + (None,)
+        return {
+            "total": total,
+            **{
+                facet: [
+                    {"slug": slug, "name": name, "count": count}
+                    for (slug, name), count in sorted(
+                        facet_counts.items(), key=lambda item: (-item[1], item[0][1])
+                    )
+                ]
+                for facet, facet_counts in counts.items()
+            },
+            "ingredients": [
+                {
+                    "slug": row["base_product__active_ingredients__slug"],
+                    "name": row["base_product__active_ingredients__name"],
+                    "count": row["count"],
+                }
+                for row in ingredients
+            ],
+            "stock_status": [
+                {"status": stock_status, "count": stock_counts[stock_status]}
+                for stock_status in ProductStockStatus.values
+            ],
+            "price_buckets": [
+                {
+                    "min": lower_bounds[index],
+                    "max": upper_bounds[index],
+                    "count": price_counts[index],
+                }
+                for index in range(len(lower_bounds))
+            ],
+        }
+
+    # bulk writes skip the model signals, record the changed ids for the search index
+    def update(self, **kwargs):
+        ids = list(self.values_list("id", flat=True))
+        rows = super().update(**kwargs)
+        mark_dirty(PRODUCT, ids)
+        return rows
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        rows = super().bulk_update(objs, fields, batch_size=batch_size)
+        mark_dirty(PRODUCT, [obj.pk for obj in objs])
+        return rows
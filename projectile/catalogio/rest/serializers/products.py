@@ -84,3 +84,30 @@ class GlobalProductSerializer(serializers.ModelSerializer):
     #         instance = super().to_representation(instance)
     #
     #     return instance
+
+
+class GlobalProductFacetValueSerializer(serializers.Serializer):
+    slug = serializers.SlugField()
+    name = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class GlobalProductStockFacetSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class GlobalProductPriceFacetSerializer(serializers.Serializer):
+    min = serializers.DecimalField(max_digits=10, decimal_places=2)
+    max = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    count = serializers.IntegerField()
+
+
+class GlobalProductFacetSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    categories = GlobalProductFacetValueSerializer(many=True)
+    manufacturers = GlobalProductFacetValueSerializer(many=True)
+    dosage_forms = GlobalProductFacetValueSerializer(many=True)
+    ingredients = GlobalProductFacetValueSerializer(many=True)
+    stock_status = GlobalProductStockFacetSerializer(many=True)
+    price_buckets = GlobalProductPriceFacetSerializer(many=True)
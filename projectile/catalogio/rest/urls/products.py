@@ -3,6 +3,11 @@ from django.urls import path
 from ..views import products
 
 urlpatterns = [
+    path(
+        "/facets",
+        products.GlobalProductFacetDetail.as_view(),
+        name="global-product-facet-detail",
+    ),
     path(
         "/<slug:slug>",
         products.GlobalProductDetail.as_view(),
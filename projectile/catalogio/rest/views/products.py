@@ -14,6 +14,7 @@ from rest_framework import (
     generics,
     filters,
 )
+from rest_framework.response import Response
 
 from accountio.utils import get_subdomain
 
@@ -22,7 +23,7 @@ from catalogio.models import Product
 from weapi.rest.filters.products import FilterProducts
 from weapi.rest.permissions import IsOrganizationCustomer
 
-from ..serializers.products import GlobalProductSerializer
+from ..serializers.products import GlobalProductSerializer, GlobalProductFacetSerializer
 from ...choices import ProductStatus
 
 
@@ -112,6 +113,19 @@ class GlobalProductSearchList(generics.ListAPIView):
         return products
 
 
+@extend_schema(
+    description="Filter sidebar counts for the catalog, accepts the same filters as the product list."
+)
+class GlobalProductFacetDetail(GlobalProductSearchList):
+    serializer_class = GlobalProductFacetSerializer
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        products = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer(products.get_facets())
+        return Response(serializer.data)
+
+
 class GlobalProductDetail(generics.RetrieveAPIView):
     serializer_class = GlobalProductSerializer
     permission_classes = [IsOrganizationCustomer]
@@ -0,0 +1,55 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from catalogio.models import BaseProduct, Product
+
+from mediaroomio.models import MediaImageConnector
+
+from redisio.services.sync import BASE_PRODUCT, PRODUCT, mark_deleted, mark_dirty
+
+from tagio.models import TagConnector
+
+
+@receiver(post_save, sender=BaseProduct)
+def sync_base_product_search_index(sender, instance, **kwargs):
+    mark_dirty(BASE_PRODUCT, [instance.id])
+
+
+@receiver(post_delete, sender=BaseProduct)
+def remove_base_product_from_search_index(sender, instance, **kwargs):
+    mark_deleted(BASE_PRODUCT, [instance.uid])
+
+
+@receiver(m2m_changed, sender=BaseProduct.active_ingredients.through)
+def sync_base_product_ingredients_search_index(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        mark_dirty(BASE_PRODUCT, [instance.id])
+    elif pk_set:
+        # ingredient.baseproduct_set.add(...), pk_set holds the base product ids
+        mark_dirty(BASE_PRODUCT, pk_set)
+
+
+@receiver(post_save, sender=Product)
+def sync_product_search_index(sender, instance, **kwargs):
+    mark_dirty(PRODUCT, [instance.id])
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_search_index(sender, instance, **kwargs):
+    mark_deleted(PRODUCT, [instance.uid])
+
+
+@receiver(post_save, sender=TagConnector)
+@receiver(post_delete, sender=TagConnector)
+@receiver(post_save, sender=MediaImageConnector)
+@receiver(post_delete, sender=MediaImageConnector)
+def sync_product_connectors_search_index(sender, instance, **kwargs):
+    if instance.product_id:
+        mark_dirty(PRODUCT, [instance.product_id])
+    if getattr(instance, "base_product_id", None):
+        mark_dirty(BASE_PRODUCT, [instance.base_product_id])
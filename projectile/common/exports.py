@@ -0,0 +1,74 @@
+import csv
+import tempfile
+from typing import IO, Iterable, Iterator, Sequence, Tuple
+
+from django.http import FileResponse, StreamingHttpResponse
+
+from openpyxl import Workbook
+
+# rows read from the db per round trip
+EXPORT_CHUNK_SIZE = 2000
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def export_rows(
+    queryset, columns: Sequence[Tuple[str, str]], chunk_size=EXPORT_CHUNK_SIZE
+) -> Iterator[list]:
+    """The header and one row per object of `queryset` for `columns` (title, lookup).
+
+    The lookups are read as one `values_list` projection in chunks of `chunk_size`,
+    so neither model instances nor the whole result are held in memory. Missing
+    values are written empty.
+    """
+    yield [title for title, _ in columns]
+    for row in queryset.values_list(*[lookup for _, lookup in columns]).iterator(
+        chunk_size=chunk_size
+    ):
+        yield ["" if value is None else value for value in row]
+
+
+def write_xlsx(rows: Iterable[list], file: IO[bytes]):
+    """Write `rows` with a write-only workbook, which does not keep the cells."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for row in rows:
+        sheet.append(row)
+    workbook.save(file)
+
+
+class _Echo:
+    """A file-like which hands back what is written, for `csv.writer`."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows: Iterable[list]) -> Iterator[str]:
+    """Encode `rows` as csv lines one by one."""
+    writer = csv.writer(_Echo())
+    return (writer.writerow(row) for row in rows)
+
+
+def xlsx_response(rows: Iterable[list], filename: str) -> FileResponse:
+    """Send `rows` as an xlsx attachment in blocks.
+
+    A workbook is a zip file and cannot be sent before its last row is written, so
+    it goes to a temporary file on disk instead of the memory of the worker.
+    """
+    file = tempfile.TemporaryFile()
+    write_xlsx(rows, file)
+    file.seek(0)
+    return FileResponse(
+        file,
+        as_attachment=True,
+        filename=f"{filename}.xlsx",
+        content_type=XLSX_CONTENT_TYPE,
+    )
+
+
+def csv_response(rows: Iterable[list], filename: str) -> StreamingHttpResponse:
+    """Send `rows` as a csv attachment while they are read from the db."""
+    response = StreamingHttpResponse(stream_csv(rows), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
@@ -0,0 +1,35 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class BoundedLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination with a hard upper bound on the page size.
+
+    For results sliced by an external store (redis): read the window with
+    `get_window`, fetch that slice and answer with `get_total_paginated_response`.
+    """
+
+    default_limit = 20
+    max_limit = 50
+
+    def get_window(self, request):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        return self.offset, self.limit
+
+    def get_total_paginated_response(self, total, data):
+        self.count = total
+        return self.get_paginated_response(data)
+
+
+class BoundedCursorPagination(CursorPagination):
+    """Keyset pagination on `ordering` with a hard upper bound on the page size.
+
+    A page is read from the index with `WHERE ordering < cursor LIMIT size`, deep
+    pages cost the same as the first one and no COUNT is run.
+    """
+
+    ordering = "-created_at"
+    page_size = 20
+    page_size_query_param = "limit"
+    max_page_size = 50
@@ -0,0 +1,82 @@
+import threading
+
+from django.db.models import Max
+from django_redis import get_redis_connection
+
+# serial numbers start after this, they were 6 to 7 digit random numbers before
+SERIAL_FLOOR = 111110
+
+SERIAL_BLOCK_SIZE = 100
+
+# left between the highest stored number and a counter which has to be seeded
+# again (e.g. after the redis data was lost), the unused blocks of running workers
+# are below it
+SERIAL_RESEED_GAP = 100000
+
+
+def serial_key(label, scope) -> str:
+    scope = ":".join(f"{name}={value}" for name, value in sorted(scope.items()))
+    return f"serial:{label}:{scope}" if scope else f"serial:{label}"
+
+
+class SerialAllocator:
+    """Hand out unique serial numbers of `model.field` without querying the table.
+
+    Every process takes a block of `block_size` numbers from one redis counter with
+    INCRBY and allocates from it in memory, so a number costs one redis round trip
+    per block and no existence query. The counter is seeded from the highest stored
+    number the first time it is used.
+
+    Numbers are unique but only increase per process. With `block_size=1` every
+    number comes from the counter and the numbering is monotonic, which together
+    with a scope (e.g. `organization_id`) gives per organization numbering.
+    """
+
+    def __init__(self, model, field="serial_number", block_size=SERIAL_BLOCK_SIZE):
+        self.model = model
+        self.field = field
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def _seed(self, scope) -> int:
+        highest = self.model._default_manager.filter(**scope).aggregate(
+            highest=Max(self.field)
+        )["highest"]
+        if highest is None:
+            return SERIAL_FLOOR
+        return max(highest + SERIAL_RESEED_GAP, SERIAL_FLOOR)
+
+    def _take_block(self, key, scope):
+        connection = get_redis_connection("default")
+        if not connection.exists(key):
+            # only the first of concurrent seeders sets it
+            connection.set(key, self._seed(scope), nx=True)
+        end = connection.incrby(key, self.block_size)
+        return end - self.block_size + 1, end
+
+    def next(self, **scope) -> int:
+        """The next number of `scope`, filter kwargs like `organization_id=1`."""
+        key = serial_key(self.model._meta.label_lower, scope)
+        with self._lock:
+            number, end = self._blocks.get(key, (1, 0))
+            if number > end:
+                number, end = self._take_block(key, scope)
+            self._blocks[key] = (number + 1, end)
+        return number
+
+    def reset(self):
+        """Forget the blocks of this process, e.g. after the counters were flushed."""
+        with self._lock:
+            self._blocks.clear()
+
+
+_allocators = {}
+
+
+def get_serial_allocator(model, field="serial_number") -> SerialAllocator:
+    """The allocator of `model.field` shared by the process."""
+    key = (model._meta.label_lower, field)
+    if key not in _allocators:
+        _allocators.setdefault(key, SerialAllocator(model, field))
+    return _allocators[key]
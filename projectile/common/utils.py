@@ -3,8 +3,11 @@ import random
 import string
 
 from PIL import Image
+from django.db.models import Model
 from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile
 
+from common.serials import get_serial_allocator
+
 
 def generate_fake_image() -> InMemoryUploadedFile:
     upfile = io.BytesIO()
@@ -22,8 +25,11 @@ def generate_fake_image() -> InMemoryUploadedFile:
 
 
 def unique_number_generator(instance) -> int:
-    model = instance.__class__
-    unique_number = random.randint(111111, 9999999)
-    if model.objects.filter(serial_number=unique_number).exists():
-        unique_number_generator(instance)
-    return unique_number
+    """The next `serial_number` of the model of `instance`, see `SerialAllocator`."""
+    return get_serial_allocator(instance.__class__).next()
+
+
+def is_deleted_with(origin, *models) -> bool:
+    """Whether a `post_delete` with `origin` cascades from one of `models`."""
+    model = origin._meta.model if isinstance(origin, Model) else origin.model
+    return issubclass(model, models)
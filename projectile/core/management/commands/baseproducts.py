@@ -33,8 +33,9 @@ from catalogio.models import (
 
 from mediaroomio.models import MediaImage, MediaImageConnector
 
-from orderio.choices import OrderStageChoices, OrderDeliveryStatus
+from orderio.choices import OrderDeliveryStatus
 from orderio.models import Cart, CartProduct, Order, OrderProduct, OrderDelivery
+from orderio.services import change_order_status
 
 from paymentio.models import PaymentMethod
 
@@ -3477,23 +3478,10 @@ class Command(BaseCommand):
                             },
                         )
 
-                    for key, value in OrderDeliveryStatus.choices:
-                        if key.lower() == "order_placed":
-                            OrderDelivery.objects.create(
-                                status=key,
-                                stage=OrderStageChoices.COMPLETED,
-                                order=order,
-                            )
-                        elif key.lower() == "processing":
-                            OrderDelivery.objects.create(
-                                status=key,
-                                stage=OrderStageChoices.CURRENT,
-                                order=order,
-                            )
-                        else:
-                            OrderDelivery.objects.create(
-                                status=key,
-                                stage=OrderStageChoices.PENDING,
-                                order=order,
-                            )
+                    OrderDelivery.objects.create(
+                        order=order,
+                        status=OrderDeliveryStatus.ORDER_PLACED,
+                        changed_by_id=i,
+                    )
+                    change_order_status(order, OrderDeliveryStatus.PROCESSING)
                     cart.delete()
@@ -58,10 +58,16 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModelwithUID):
     def is_merchant(self):
         return self.organizationuser_set.filter().exists()
 
+    def get_default_organization_user(self):
+        """Cached default organization user, looked up once per user instance."""
+        from accountio.context import get_default_organization_user
+
+        if not hasattr(self, "_default_organization_user"):
+            self._default_organization_user = get_default_organization_user(self.pk)
+        return self._default_organization_user
+
     def get_organization(self):
-        return (
-            self.organizationuser_set.filter().get(is_default=True).organization or None
-        )
+        return self.get_merchent_organization_user().organization or None
 
     def get_organization_list(self):
         return (
@@ -72,10 +78,15 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModelwithUID):
         )
 
     def get_my_organization_role(self):
-        return self.organizationuser_set.get(is_default=True).role or None
+        return self.get_merchent_organization_user().role or None
 
     def get_merchent_organization_user(self):
-        return self.organizationuser_set.get(is_default=True) or None
+        organization_user = self.get_default_organization_user()
+        if organization_user is None:
+            raise self.organizationuser_set.model.DoesNotExist(
+                "User has no default organization."
+            )
+        return organization_user
 
     # def get_organization_user(self):
     #     queryset = self.organizationuser_set.select_related(
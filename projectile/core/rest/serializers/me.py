@@ -197,6 +197,54 @@ class PrivateNotificationListSerializer(serializers.ModelSerializer):
         return notification_user_receiver.is_read
 
 
+class PrivateNotificationFeedSerializer(serializers.ModelSerializer):
+    """A notification of the feed, read through the receiver row of the user."""
+
+    uid = serializers.UUIDField(source="notification.uid", read_only=True)
+    changed_data = serializers.JSONField(
+        source="notification.changed_data", read_only=True
+    )
+    created_by = PublicNotificationUserSerializer(
+        source="notification.created_by", read_only=True
+    )
+    is_success = serializers.BooleanField(
+        source="notification.is_success", read_only=True
+    )
+    message = serializers.CharField(source="notification.message", read_only=True)
+    action_type = serializers.CharField(
+        source="notification.action_type", read_only=True
+    )
+    model_type = serializers.CharField(source="notification.model_type", read_only=True)
+    current_model = PrivateNotificationModelConnectorSerializer(
+        read_only=True, source="notification.notificationmodelconnector"
+    )
+    created_at = serializers.DateTimeField(
+        source="notification.created_at", read_only=True
+    )
+    updated_at = serializers.DateTimeField(
+        source="notification.updated_at", read_only=True
+    )
+    received_at = serializers.DateTimeField(source="created_at", read_only=True)
+
+    class Meta:
+        model = NotificationUserReceiver
+        fields = [
+            "uid",
+            "changed_data",
+            "created_by",
+            "is_success",
+            "message",
+            "action_type",
+            "model_type",
+            "is_read",
+            "current_model",
+            "created_at",
+            "updated_at",
+            "received_at",
+        ]
+        read_only_fields = fields
+
+
 class BaseUserSerializer(BaseModelSerializer):
     name = serializers.CharField(max_length=100, source="get_name")
 
@@ -66,7 +66,7 @@ class PublicNotificationTransactionSerializer(serializers.ModelSerializer):
 class PublicNotificationOrderDeliverySerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderDelivery
-        fields = ("uid", "status", "stage", "created_at")
+        fields = ("uid", "previous_status", "status", "created_at")
         read_only_fields = fields
 
 
@@ -69,13 +69,12 @@ class GlobalPasswordForgotSerializer(serializers.Serializer):
             User.objects.filter(),
             phone=validated_data.get("phone"),
         )
-        user_otp = get_object_or_404(
-            UserPhoneOTP.objects.filter(), user=user, otp=validated_data.get("otp")
-        )
-        if user and user_otp:
+        user_otp = UserPhoneOTP.objects.get_latest(validated_data.get("otp"), user=user)
+        if user_otp and not user_otp.is_expired():
             new_password = validated_data.pop("new_password")
             user.set_password(new_password)
             user.save()
+            user_otp.save_if_status_is_consumed()
             return validated_data
         else:
             raise ValidationError({"otp": "Invalid otp"})
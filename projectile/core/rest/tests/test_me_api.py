@@ -1,12 +1,37 @@
+import gzip
+import json
 import logging
+import tempfile
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from django_redis import get_redis_connection
 
 from rest_framework import status
 
 from accountio.choices import OrganizationUserRole
+from accountio.models import Organization
 
 from common.base_test import BaseAPITestCase
 from common.base_orm import BaseOrmCallApi
 
+from core.models import User
+
+from notificationio.choices import (
+    ActivityActionTypeStatusChoices,
+    NotificationModelTypeChoices,
+)
+from notificationio.counters import notification_counts_key
+from notificationio.models import (
+    Notification,
+    NotificationArchive,
+    NotificationRetentionPolicy,
+)
+from notificationio.retention import apply_retention_policies, get_archive_storage
+from notificationio.services import NotificationService
+
 from weapi.rest.tests import payloads as we_payloads
 
 from . import payloads, urlhelpers
@@ -149,3 +174,152 @@ class PrivateMeApiTests(BaseAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Assert that the response is correct which I'm expecting
         self.assertEqual(current_organization.data[0]["domain"], organization_1.domain)
+
+
+class PrivateMeNotificationApiTests(BaseAPITestCase):
+    """Test for private me notification api"""
+
+    def setUp(self):
+        super(PrivateMeNotificationApiTests, self).setUp()
+
+        self.organization = Organization.objects.get(domain="bill-corp")
+        self.user = User.objects.get(phone=payloads.login_info_payload()["phone"])
+        get_redis_connection("default").delete(
+            notification_counts_key(self.user.id, self.organization.id)
+        )
+        self.service = NotificationService(request=None, organization=self.organization)
+
+    def notify(self):
+        notification = Notification.objects.create(
+            created_by=self.user,
+            organization=self.organization,
+            is_success=True,
+            action_type=ActivityActionTypeStatusChoices.ADDITION,
+            model_type=NotificationModelTypeChoices.ORGANIZATION,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.create_notification_user_receivers(
+                notification=notification, user_ids=[self.user.id]
+            )
+        return notification
+
+    def assertCounts(self, read_count, unread_count):
+        response = self.client.get(urlhelpers.me_notification_count_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            (response.data["read_count"], response.data["unread_count"]),
+            (read_count, unread_count),
+        )
+
+    def test_notification_counts(self):
+        # Test the cached counters follow new and seen notifications
+
+        first = self.notify()
+        self.notify()
+        self.assertCounts(0, 2)
+
+        # counted from the cache from now on
+        self.notify()
+        self.assertEqual(
+            get_redis_connection("default").hgetall(
+                notification_counts_key(self.user.id, self.organization.id)
+            ),
+            {b"read": b"0", b"unread": b"3"},
+        )
+        self.assertCounts(0, 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(urlhelpers.me_notification_seen_url(first.uid))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounts(1, 2)
+
+        # seeing it again does not count twice
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(urlhelpers.me_notification_seen_url(first.uid))
+        self.assertCounts(1, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(urlhelpers.me_notification_seen_all_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounts(3, 0)
+
+    def test_notification_feed(self):
+        # Test the feed pages with cursors and fetches the new notifications since the last one
+
+        first, second, third = self.notify(), self.notify(), self.notify()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(urlhelpers.me_notification_seen_url(second.uid))
+
+        response = self.client.get(urlhelpers.me_notification_list_url(), {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            [(item["uid"], item["is_read"]) for item in response.data["results"]],
+            [(str(third.uid), False), (str(second.uid), True)],
+        )
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [item["uid"] for item in response.data["results"]], [str(first.uid)]
+        )
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(
+            urlhelpers.me_notification_list_url(), {"status": "unread"}
+        )
+        self.assertEqual(
+            [item["uid"] for item in response.data["results"]],
+            [str(third.uid), str(first.uid)],
+        )
+
+        since = response.data["results"][0]["received_at"]
+        fourth = self.notify()
+        response = self.client.get(
+            urlhelpers.me_notification_list_url(), {"since": since}
+        )
+        self.assertEqual(
+            [item["uid"] for item in response.data["results"]], [str(fourth.uid)]
+        )
+
+    def test_notification_retention(self):
+        # Test the old read notifications are archived and leave the feed and the counters
+
+        first, second, third = self.notify(), self.notify(), self.notify()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(urlhelpers.me_notification_seen_url(first.uid))
+            self.client.patch(urlhelpers.me_notification_seen_url(second.uid))
+        Notification.objects.filter(id__in=[first.id, third.id]).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+        NotificationRetentionPolicy.objects.create(
+            organization=self.organization, retention_days=30
+        )
+        self.assertCounts(2, 1)
+
+        with tempfile.TemporaryDirectory() as archive_dir, override_settings(
+            NOTIFICATION_ARCHIVE_DIR=archive_dir
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                archives = apply_retention_policies()
+
+            # only the old and read one is due
+            self.assertEqual(len(archives), 1)
+            archive: NotificationArchive = archives[0]
+            self.assertEqual(
+                (archive.notification_count, archive.receiver_count), (1, 1)
+            )
+            with get_archive_storage().open(archive.path) as file:
+                lines = gzip.decompress(file.read()).decode().splitlines()
+            self.assertEqual(
+                archive.archived_bytes, get_archive_storage().size(archive.path)
+            )
+
+        self.assertEqual([json.loads(line)["uid"] for line in lines], [str(first.uid)])
+        self.assertFalse(Notification.objects.filter(id=first.id).exists())
+        self.assertCounts(1, 1)
+
+        response = self.client.get(urlhelpers.me_notification_list_url())
+        self.assertEqual(
+            [item["uid"] for item in response.data["results"]],
+            [str(third.uid), str(second.uid)],
+        )
@@ -1,9 +1,17 @@
+import datetime
+
+from django.utils import timezone
+
 from rest_framework import status
 from rest_framework.test import (
     APIClient,
     APITestCase,
 )
 
+from core.models import User
+
+from otpio.models import UserPhoneOTP
+
 from . import urlhelpers, payloads
 
 
@@ -65,3 +73,32 @@ class GlobalRegistrationApiTest(APITestCase):
 
         # Assert that the response is correct
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_organization_user_password_forget(self):
+        # Test password forget checks the latest otp of the user and consumes it
+
+        user = User.objects.get(
+            phone=payloads.organization_user_login_payload()["phone"]
+        )
+        # an old expired code with the same digits does not get in the way
+        UserPhoneOTP.objects.create(
+            user=user,
+            otp="123456",
+            expired_at=timezone.now() - datetime.timedelta(days=1),
+        )
+        UserPhoneOTP.objects.create(user=user, otp="123456")
+        payload = {
+            "phone": user.phone,
+            "otp": "123456",
+            "new_password": "Pass12345",
+            "confirm_password": "Pass12345",
+        }
+
+        response = self.client.put(urlhelpers.user_password_forget_url(), payload)
+
+        # Assert that the response is correct
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # the otp is consumed
+        response = self.client.put(urlhelpers.user_password_forget_url(), payload)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -9,6 +9,10 @@ def user_password_reset_url():
     return reverse("password_reset")
 
 
+def user_password_forget_url():
+    return reverse("password_forget")
+
+
 def user_token_login_url():
     return reverse("token_obtain_pair")
 
@@ -35,3 +39,19 @@ def me_organization_select_url(uid):
 
 def organization_list_url():
     return reverse("organization-list")
+
+
+def me_notification_list_url():
+    return reverse("me-notifications-list")
+
+
+def me_notification_count_url():
+    return reverse("me-notifications-count-detail")
+
+
+def me_notification_seen_all_url():
+    return reverse("me-notifications-seen-all")
+
+
+def me_notification_seen_url(uid):
+    return reverse("me-notifications-detail", args=[uid])
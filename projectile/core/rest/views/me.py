@@ -1,6 +1,7 @@
 import logging
 
 from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
 
 from rest_framework import filters
 from rest_framework.exceptions import ValidationError
@@ -29,12 +30,16 @@ from core.rest.serializers.me import (
     PublicOrganizationUserSerializer,
     PublicOrganizationPostSerializer,
     PrivateMeSerializer,
+    PrivateNotificationFeedSerializer,
     PrivateNotificationListSerializer,
     PrivateThreadListSerializer,
     PrivateThreadReplySerializer,
 )
 from core.rest.serializers.notifications import PublicNotificationCountSerializer
 
+from common.pagination import BoundedCursorPagination
+
+from notificationio.counters import count_read, get_notification_counts
 from notificationio.models import Notification, NotificationUserReceiver
 
 from threadio.models import Thread, Inbox
@@ -213,16 +218,25 @@ class PrivateOrganizationDefaultDetail(UpdateAPIView):
             OpenApiParameter.QUERY,
             description="Values: read, unread, all",
         ),
+        OpenApiParameter(
+            "since",
+            OpenApiTypes.DATETIME,
+            description="Only notifications received after it, the received_at of the newest one",
+        ),
     ],
 )
 class PrivateNotificationList(ListAPIView):
-    serializer_class = PrivateNotificationListSerializer
+    serializer_class = PrivateNotificationFeedSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BoundedCursorPagination
 
     def get_queryset(self):
+        organization: Organization = get_subdomain(self.request)
+        # the receiver rows of the user are read from their (user, organization, created_at) index
         notification_user_receivers = NotificationUserReceiver.objects.select_related(
-            "notification"
-        ).filter(user=self.request.user)
+            "notification__created_by",
+            "notification__notificationmodelconnector",
+        ).filter(user=self.request.user, organization=organization)
 
         # filter by status
         seen_status = self.request.query_params.get("status", "")
@@ -235,21 +249,17 @@ class PrivateNotificationList(ListAPIView):
                 is_read=False
             )
 
-        # get the all id of notification
-        notification_ids = notification_user_receivers.values_list(
-            "notification", flat=True
-        )
-        organization: Organization = get_subdomain(self.request)
-        # Fetch the corresponding Notification objects
-        notifications = (
-            Notification.objects.prefetch_related(
-                "notificationuserreceiver_set", "notificationmodelconnector"
+        since = self.request.query_params.get("since")
+        if since:
+            # the + of the offset is a space when the parameter is not encoded
+            since = parse_datetime(since.replace(" ", "+"))
+            if since is None:
+                raise ValidationError({"since": "Enter a valid date and time."})
+            notification_user_receivers = notification_user_receivers.filter(
+                created_at__gt=since
             )
-            .filter(pk__in=notification_ids, organization=organization)
-            .order_by("-created_at")
-        )
 
-        return notifications
+        return notification_user_receivers
 
 
 class PrivateNotificationDetail(UpdateAPIView):
@@ -271,9 +281,11 @@ class PrivateNotificationDetail(UpdateAPIView):
         )
 
     def perform_update(self, serializer):
-        self.get_object().notificationuserreceiver_set.filter(
-            user=self.request.user
+        notification = self.get_object()
+        count = notification.notificationuserreceiver_set.filter(
+            user=self.request.user, is_read=False
         ).update(is_read=True)
+        count_read(self.request.user.id, notification.organization_id, count)
 
 
 class PrivateNotificationSeenAllDetail(UpdateAPIView):
@@ -286,11 +298,12 @@ class PrivateNotificationSeenAllDetail(UpdateAPIView):
         organization = get_subdomain(request)
 
         # updating all unread notification to read to a organization
-        NotificationUserReceiver.objects.filter(
+        count = NotificationUserReceiver.objects.filter(
             is_read=False,
             user=request.user,
-            notification__organization=organization,
+            organization=organization,
         ).update(is_read=True)
+        count_read(request.user.id, organization.id if organization else None, count)
 
         return Response(status=200)
 
@@ -302,18 +315,10 @@ class PrivateNotificationCountDetail(RetrieveAPIView):
     def get_object(self):
         organization = get_subdomain(self.request)
 
-        notification_user_receivers = NotificationUserReceiver.objects.select_related(
-            "notification"
-        ).filter(
-            user=self.request.user,
-            notification__organization=organization,
+        return get_notification_counts(
+            self.request.user.id, organization.id if organization else None
         )
 
-        return {
-            "read_count": notification_user_receivers.filter(is_read=True).count(),
-            "unread_count": notification_user_receivers.filter(is_read=False).count(),
-        }
-
 
 class PrivateThreadList(ListCreateAPIView):
     # queryset = Thread.objects.filter()
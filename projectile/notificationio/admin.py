@@ -3,7 +3,10 @@ from django.contrib import admin
 from notificationio.models import (
     NotificationUserPreference,
     Notification,
+    NotificationArchive,
+    NotificationEvent,
     NotificationModelConnector,
+    NotificationRetentionPolicy,
     NotificationUserReceiver,
 )
 
@@ -46,3 +49,37 @@ class NotificationAdmin(admin.ModelAdmin):
 
     # def has_change_permission(self, request, obj=None):
     #     return False
+
+
+@admin.register(NotificationEvent)
+class NotificationEventAdmin(admin.ModelAdmin):
+    model = NotificationEvent
+    list_display = ["uid", "organization", "model_type", "status", "attempts"]
+    readonly_fields = ["uid", "created_at", "updated_at"]
+    list_filter = ["status", "model_type"]
+
+
+@admin.register(NotificationRetentionPolicy)
+class NotificationRetentionPolicyAdmin(admin.ModelAdmin):
+    model = NotificationRetentionPolicy
+    list_display = ["uid", "organization", "retention_days", "archive", "is_active"]
+    readonly_fields = ["uid", "created_at", "updated_at"]
+    list_filter = ["archive", "is_active"]
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    model = NotificationArchive
+    list_display = [
+        "uid",
+        "organization",
+        "notification_count",
+        "receiver_count",
+        "raw_bytes",
+        "archived_bytes",
+        "created_at",
+    ]
+    readonly_fields = ["uid", "created_at", "updated_at"]
+
+    def has_add_permission(self, request):
+        return False
@@ -50,3 +50,10 @@ class NotificationModelTypeChoices(models.TextChoices):
     CART = "CART", "Cart"
     CART_PRODUCT = "CART_PRODUCT", "Cart Product"
     TRANSACTION = "TRANSACTION", "Transaction"
+
+
+class NotificationEventStatusChoices(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    PROCESSING = "PROCESSING", "Processing"
+    DONE = "DONE", "Done"
+    FAILED = "FAILED", "Failed"
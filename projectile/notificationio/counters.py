@@ -0,0 +1,117 @@
+import logging
+from collections import Counter
+from typing import Iterable, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django_redis import get_redis_connection
+
+from notificationio.models import NotificationUserReceiver
+
+logger = logging.getLogger(__name__)
+
+# idle counters are dropped and counted again from the db when polled
+NOTIFICATION_COUNTS_TIMEOUT = 60 * 60 * 24
+
+# only change counters which exist, a missing one is counted from the db when read
+_INCREMENT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HINCRBY', KEYS[1], 'read', ARGV[1])
+    redis.call('HINCRBY', KEYS[1], 'unread', ARGV[2])
+end
+"""
+
+
+def notification_counts_key(user_id, organization_id) -> str:
+    return f"notification-counts:user:{user_id}:organization:{organization_id}"
+
+
+def count_notifications(user_id, organization_id) -> dict:
+    """The read and unread receivers of a user in an organization from the db."""
+    return NotificationUserReceiver.objects.filter(
+        user_id=user_id, organization_id=organization_id
+    ).aggregate(
+        read_count=Count("id", filter=Q(is_read=True)),
+        unread_count=Count("id", filter=Q(is_read=False)),
+    )
+
+
+def reconcile_notification_counts(user_id, organization_id) -> dict:
+    """Overwrite the counters of a user in an organization with the db counts."""
+    counts = count_notifications(user_id, organization_id)
+    key = notification_counts_key(user_id, organization_id)
+    connection = get_redis_connection("default")
+    pipeline = connection.pipeline()
+    pipeline.hset(
+        key,
+        mapping={"read": counts["read_count"], "unread": counts["unread_count"]},
+    )
+    pipeline.expire(key, NOTIFICATION_COUNTS_TIMEOUT)
+    pipeline.execute()
+    return counts
+
+
+def get_notification_counts(user_id, organization_id) -> dict:
+    """Read and unread counts with one HGETALL, counted from the db when missing."""
+    try:
+        counts = get_redis_connection("default").hgetall(
+            notification_counts_key(user_id, organization_id)
+        )
+        if counts:
+            return {
+                "read_count": int(counts[b"read"]),
+                "unread_count": int(counts[b"unread"]),
+            }
+        return reconcile_notification_counts(user_id, organization_id)
+    except Exception:
+        logger.warning("Notification counters are unavailable for %s", user_id)
+        return count_notifications(user_id, organization_id)
+
+
+def _change_counts(changes: Counter, read: int, unread: int):
+    connection = get_redis_connection("default")
+    increment = connection.register_script(_INCREMENT_SCRIPT)
+    pipeline = connection.pipeline()
+    for (user_id, organization_id), count in changes.items():
+        increment(
+            keys=[notification_counts_key(user_id, organization_id)],
+            args=[read * count, unread * count],
+            client=pipeline,
+        )
+    pipeline.execute()
+
+
+def _on_commit(changes: Counter, read: int, unread: int):
+    if not changes:
+        return
+
+    def change():
+        try:
+            _change_counts(changes, read, unread)
+        except Exception:
+            # the counters are dropped so the next read counts from the db
+            logger.warning("Could not change notification counters %s", changes)
+            try:
+                get_redis_connection("default").delete(
+                    *[notification_counts_key(*pair) for pair in changes]
+                )
+            except Exception:
+                logger.warning("Notification counters are unavailable")
+
+    transaction.on_commit(change)
+
+
+def count_new_unread(pairs: Iterable[Tuple[int, int]]):
+    """Count new unread receivers of (user_id, organization_id) after the commit."""
+    _on_commit(Counter(pairs), read=0, unread=1)
+
+
+def count_read(user_id, organization_id, count: int):
+    """Move `count` receivers from unread to read after the commit."""
+    if count:
+        _on_commit(Counter({(user_id, organization_id): count}), read=1, unread=-1)
+
+
+def count_deleted_read(pairs: Iterable[Tuple[int, int]]):
+    """Take deleted read receivers of (user_id, organization_id) off after the commit."""
+    _on_commit(Counter(pairs), read=-1, unread=0)
@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from notificationio.retention import apply_retention_policies
+
+
+class Command(BaseCommand):
+    help = "Archive and delete the old read notifications by the retention policies"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATION_ARCHIVE_BATCH_SIZE,
+            help="Notifications archived and deleted in one transaction",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=100,
+            help="Batches of one run, the rest is left to the next run",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and archive every --interval",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60 * 60,
+            help="Seconds to wait between two runs of --loop",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            archives = apply_retention_policies(
+                options["batch_size"], options["max_batches"]
+            )
+            self.stdout.write(
+                "Archived {} notifications, {} receivers and {} connectors of {} "
+                "organizations in {} batches, {} bytes reclaimed, {} bytes written".format(
+                    sum(archive.notification_count for archive in archives),
+                    sum(archive.receiver_count for archive in archives),
+                    sum(archive.connector_count for archive in archives),
+                    len({archive.organization_id for archive in archives}),
+                    len(archives),
+                    sum(archive.raw_bytes for archive in archives),
+                    sum(archive.archived_bytes for archive in archives),
+                )
+            )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
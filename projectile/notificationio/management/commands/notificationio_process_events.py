@@ -0,0 +1,59 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connection
+
+from notificationio.services import process_notification_events
+
+
+class Command(BaseCommand):
+    help = "Create the notifications of the captured notification events in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=1, help="Threads processing batches"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATION_EVENT_BATCH_SIZE,
+            help="Events claimed at once",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the events every --interval when none is left",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait when no event is left with --loop",
+        )
+
+    def work(self, options, counts, index):
+        try:
+            while True:
+                count = process_notification_events(options["batch_size"])
+                counts[index] += count
+                if count:
+                    continue
+                if not options["loop"]:
+                    return
+                time.sleep(options["interval"])
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        counts = [0] * options["workers"]
+        threads = [
+            threading.Thread(target=self.work, args=(options, counts, index))
+            for index in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stdout.write(f"Processed {sum(counts)} notification events")
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management import BaseCommand
+from django_redis import get_redis_connection
+
+from notificationio.counters import reconcile_notification_counts
+
+
+class Command(BaseCommand):
+    help = "Overwrite the cached read/unread notification counters with the db counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and reconcile every --interval",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60 * 10,
+            help="Seconds to wait between two runs of --loop",
+        )
+
+    def reconcile(self) -> int:
+        count = 0
+        connection = get_redis_connection("default")
+        for key in connection.scan_iter(match="notification-counts:*", count=500):
+            # notification-counts:user:<id>:organization:<id>
+            _, _, user_id, _, organization_id = key.decode().split(":")
+            reconcile_notification_counts(
+                int(user_id),
+                None if organization_id == "None" else int(organization_id),
+            )
+            count += 1
+        return count
+
+    def handle(self, *args, **options):
+        while True:
+            count = self.reconcile()
+            self.stdout.write(f"Reconciled {count} notification counters")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
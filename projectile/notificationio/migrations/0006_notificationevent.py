@@ -0,0 +1,140 @@
+# Generated by Django 4.2.4 on 2026-10-17 23:54
+
+import dirtyfields.dirtyfields
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accountio", "0013_backfill_customerbalance"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("notificationio", "0005_notificationmodelconnector_transaction_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "uid",
+                    models.UUIDField(
+                        db_index=True, default=uuid.uuid4, editable=False, unique=True
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("idempotency_key", models.CharField(max_length=255, unique=True)),
+                (
+                    "model_type",
+                    models.CharField(
+                        choices=[
+                            ("USER", "User"),
+                            ("ORGANIZATION", "Organization"),
+                            ("ORGANIZATION_USER", "Organization User"),
+                            ("PRODUCT", "Product"),
+                            ("ORDER", "Order"),
+                            ("ORDER_DELIVERY", "Order Delivery"),
+                            ("CART", "Cart"),
+                            ("CART_PRODUCT", "Cart Product"),
+                            ("TRANSACTION", "Transaction"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("object_id", models.PositiveBigIntegerField()),
+                (
+                    "action_type",
+                    models.CharField(
+                        choices=[
+                            ("READ", "Read"),
+                            ("ADDITION", "Addition"),
+                            ("CHANGE", "Change"),
+                            ("DELETION", "Deletion"),
+                            ("LOGIN", "Login"),
+                            ("LOGOUT", "Logout"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("is_success", models.BooleanField(default=True)),
+                ("message", models.CharField(blank=True, max_length=500)),
+                ("changed_data", models.JSONField(default=dict)),
+                (
+                    "connections",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Other connector fields and their ids, like order",
+                    ),
+                ),
+                (
+                    "user_ids",
+                    models.JSONField(
+                        default=list,
+                        help_text="Receivers besides the organization users",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("PROCESSING", "Processing"),
+                            ("DONE", "Done"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "notification",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="notificationio.notification",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="accountio.organization",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="notificatio_status_b724e9_idx",
+                    )
+                ],
+            },
+            bases=(dirtyfields.dirtyfields.DirtyFieldsMixin, models.Model),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.4 on 2026-10-18 00:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def copy_notification_organization(apps, schema_editor):
+    Notification = apps.get_model("notificationio", "Notification")
+    NotificationUserReceiver = apps.get_model(
+        "notificationio", "NotificationUserReceiver"
+    )
+    NotificationUserReceiver.objects.update(
+        organization_id=Subquery(
+            Notification.objects.filter(id=OuterRef("notification_id")).values(
+                "organization_id"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accountio", "0013_backfill_customerbalance"),
+        ("notificationio", "0006_notificationevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationuserreceiver",
+            name="organization",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="accountio.organization",
+            ),
+        ),
+        migrations.RunPython(copy_notification_organization, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="notificationuserreceiver",
+            index=models.Index(
+                fields=["user", "organization", "created_at"],
+                name="notificatio_user_id_575194_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 4.2.4 on 2026-10-18 00:03
+
+import dirtyfields.dirtyfields
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accountio", "0013_backfill_customerbalance"),
+        ("notificationio", "0007_notificationuserreceiver_organization"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "uid",
+                    models.UUIDField(
+                        db_index=True, default=uuid.uuid4, editable=False, unique=True
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "path",
+                    models.CharField(
+                        blank=True,
+                        help_text="Compressed JSONL file, blank if deleted only",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "before",
+                    models.DateTimeField(
+                        help_text="Notifications created before it were due"
+                    ),
+                ),
+                ("notification_count", models.PositiveIntegerField(default=0)),
+                ("connector_count", models.PositiveIntegerField(default=0)),
+                ("receiver_count", models.PositiveIntegerField(default=0)),
+                (
+                    "raw_bytes",
+                    models.PositiveBigIntegerField(
+                        default=0,
+                        help_text="Size of the rows as JSON, about the space reclaimed",
+                    ),
+                ),
+                (
+                    "archived_bytes",
+                    models.PositiveBigIntegerField(
+                        default=0, help_text="Size of the compressed file"
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+            bases=(dirtyfields.dirtyfields.DirtyFieldsMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name="NotificationRetentionPolicy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "uid",
+                    models.UUIDField(
+                        db_index=True, default=uuid.uuid4, editable=False, unique=True
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("retention_days", models.PositiveIntegerField(default=180)),
+                (
+                    "archive",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Write the notifications to an archive file before deleting them",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Keep the notifications forever when inactive",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+            bases=(dirtyfields.dirtyfields.DirtyFieldsMixin, models.Model),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["organization", "created_at"],
+                name="notificatio_organiz_8c1afd_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationretentionpolicy",
+            name="organization",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE, to="accountio.organization"
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationarchive",
+            name="organization",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="accountio.organization",
+            ),
+        ),
+    ]
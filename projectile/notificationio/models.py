@@ -5,6 +5,7 @@ from core.utils import BaseModelwithUID
 from notificationio.choices import (
     ActivityActionTypeStatusChoices,
     NotificationEnableStatusChoices,
+    NotificationEventStatusChoices,
     NotificationModelTypeChoices,
 )
 
@@ -89,6 +90,7 @@ class Notification(BaseModelwithUID):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [models.Index(fields=["organization", "created_at"])]
 
 
 class NotificationModelConnector(BaseModelwithUID):
@@ -123,7 +125,106 @@ class NotificationModelConnector(BaseModelwithUID):
 class NotificationUserReceiver(BaseModelwithUID):
     notification = models.ForeignKey(Notification, on_delete=models.CASCADE)
     user = models.ForeignKey("core.User", on_delete=models.CASCADE)
+    # copy of notification.organization, the feed of a user is read from this table
+    organization = models.ForeignKey(
+        "accountio.Organization", models.CASCADE, null=True, blank=True
+    )
     is_read = models.BooleanField(default=False)
 
     class Meta:
         unique_together = ("notification", "user")
+        indexes = [models.Index(fields=["user", "organization", "created_at"])]
+
+
+class NotificationEvent(BaseModelwithUID):
+    """A notification captured by a request, turned into a `Notification` later.
+
+    Written after the request transaction commits and processed in batches by
+    `notificationio.services.process_notification_events`. The `idempotency_key`
+    makes a repeated capture of the same event a no-op.
+    """
+
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    created_by = models.ForeignKey("core.User", on_delete=models.CASCADE)
+    organization = models.ForeignKey(
+        "accountio.Organization", models.CASCADE, null=True, blank=True
+    )
+    model_type = models.CharField(
+        max_length=30, choices=NotificationModelTypeChoices.choices
+    )
+    object_id = models.PositiveBigIntegerField()
+    action_type = models.CharField(
+        choices=ActivityActionTypeStatusChoices.choices, max_length=10
+    )
+    is_success = models.BooleanField(default=True)
+    message = models.CharField(max_length=500, blank=True)
+    changed_data = models.JSONField(default=dict)
+    connections = models.JSONField(
+        default=dict, help_text="Other connector fields and their ids, like order"
+    )
+    user_ids = models.JSONField(
+        default=list, help_text="Receivers besides the organization users"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=NotificationEventStatusChoices.choices,
+        default=NotificationEventStatusChoices.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    notification = models.OneToOneField(
+        Notification, on_delete=models.SET_NULL, null=True, blank=True
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Event: {self.idempotency_key}, Status: {self.status}"
+
+
+class NotificationRetentionPolicy(BaseModelwithUID):
+    """How long the read notifications of an organization are kept.
+
+    Organizations without a policy keep them `NOTIFICATION_RETENTION_DAYS`, see
+    `notificationio.retention`.
+    """
+
+    organization = models.OneToOneField("accountio.Organization", models.CASCADE)
+    retention_days = models.PositiveIntegerField(default=180)
+    archive = models.BooleanField(
+        default=True,
+        help_text="Write the notifications to an archive file before deleting them",
+    )
+    is_active = models.BooleanField(
+        default=True, help_text="Keep the notifications forever when inactive"
+    )
+
+    def __str__(self):
+        return f"Organization: {self.organization_id}, Days: {self.retention_days}"
+
+
+class NotificationArchive(BaseModelwithUID):
+    """A batch of notifications moved out of the tables, with its metrics."""
+
+    organization = models.ForeignKey(
+        "accountio.Organization", models.SET_NULL, null=True, blank=True
+    )
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Compressed JSONL file, blank if deleted only",
+    )
+    before = models.DateTimeField(help_text="Notifications created before it were due")
+    notification_count = models.PositiveIntegerField(default=0)
+    connector_count = models.PositiveIntegerField(default=0)
+    receiver_count = models.PositiveIntegerField(default=0)
+    raw_bytes = models.PositiveBigIntegerField(
+        default=0, help_text="Size of the rows as JSON, about the space reclaimed"
+    )
+    archived_bytes = models.PositiveBigIntegerField(
+        default=0, help_text="Size of the compressed file"
+    )
+
+    def __str__(self):
+        return f"Organization: {self.organization_id}, Notifications: {self.notification_count}"
@@ -0,0 +1,176 @@
+import gzip
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+from accountio.models import Organization
+
+from notificationio.counters import count_deleted_read
+from notificationio.models import (
+    Notification,
+    NotificationArchive,
+    NotificationModelConnector,
+    NotificationRetentionPolicy,
+    NotificationUserReceiver,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_archive_storage() -> FileSystemStorage:
+    return FileSystemStorage(location=settings.NOTIFICATION_ARCHIVE_DIR)
+
+
+def retention_scopes(now=None) -> Iterator[Tuple[Optional[int], object, bool]]:
+    """(organization_id, before, archive) of every organization which has notifications.
+
+    Read notifications of the organization created before `before` are due.
+    """
+    now = now or timezone.now()
+    policies = {
+        policy.organization_id: policy
+        for policy in NotificationRetentionPolicy.objects.all()
+    }
+    organization_ids = [None] + list(
+        Organization.objects.order_by("id").values_list("id", flat=True)
+    )
+    for organization_id in organization_ids:
+        policy = policies.get(organization_id)
+        if policy is None:
+            if settings.NOTIFICATION_RETENTION_DAYS is None:
+                continue
+            days, archive = settings.NOTIFICATION_RETENTION_DAYS, True
+        elif not policy.is_active:
+            continue
+        else:
+            days, archive = policy.retention_days, policy.archive
+        yield organization_id, now - timedelta(days=days), archive
+
+
+def due_notifications(organization_id, before):
+    """Notifications of the organization created before `before` and read by everyone."""
+    return Notification.objects.filter(
+        organization_id=organization_id, created_at__lt=before
+    ).exclude(
+        Exists(
+            NotificationUserReceiver.objects.filter(
+                notification=OuterRef("pk"), is_read=False
+            )
+        )
+    )
+
+
+def _archive_lines(ids: List[int]) -> bytes:
+    """One JSON line per notification with its connector and receivers."""
+    receivers = defaultdict(list)
+    for receiver in NotificationUserReceiver.objects.filter(
+        notification_id__in=ids
+    ).values(
+        "uid", "user_id", "is_read", "created_at", "updated_at", "notification_id"
+    ):
+        receivers[receiver.pop("notification_id")].append(receiver)
+    connectors = {
+        connector.notification_id: model_to_dict(connector, exclude=["notification"])
+        for connector in NotificationModelConnector.objects.filter(
+            notification_id__in=ids
+        )
+    }
+
+    lines = []
+    for notification in Notification.objects.filter(id__in=ids).order_by("id"):
+        record = model_to_dict(notification)
+        record.update(
+            uid=notification.uid,
+            created_at=notification.created_at,
+            updated_at=notification.updated_at,
+            connector=connectors.get(notification.id),
+            receivers=receivers[notification.id],
+        )
+        lines.append(json.dumps(record, cls=DjangoJSONEncoder))
+    return "".join(f"{line}\n" for line in lines).encode()
+
+
+def archive_batch(
+    organization_id, before, archive=True, batch_size=None, storage=None
+) -> Optional[NotificationArchive]:
+    """Move up to `batch_size` due notifications of the organization out of the tables.
+
+    The batch is locked, written to a gzipped JSONL file of the archive storage and
+    deleted with its connector and receivers in one transaction. Batches locked by
+    another worker are skipped.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_ARCHIVE_BATCH_SIZE
+    with transaction.atomic():
+        ids = list(
+            due_notifications(organization_id, before)
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return None
+
+        raw = _archive_lines(ids)
+        path, compressed = "", b""
+        if archive:
+            compressed = gzip.compress(raw)
+            path = (storage or get_archive_storage()).save(
+                f"{organization_id or 'none'}/{timezone.now():%Y/%m/%d}/{ids[0]}-{ids[-1]}.jsonl.gz",
+                ContentFile(compressed),
+            )
+
+        count_deleted_read(
+            NotificationUserReceiver.objects.filter(
+                notification_id__in=ids, is_read=True
+            ).values_list("user_id", "organization_id")
+        )
+        _, deleted = Notification.objects.filter(id__in=ids).delete()
+
+        notification_archive = NotificationArchive.objects.create(
+            organization_id=organization_id,
+            path=path,
+            before=before,
+            notification_count=deleted.get(Notification._meta.label, 0),
+            connector_count=deleted.get(NotificationModelConnector._meta.label, 0),
+            receiver_count=deleted.get(NotificationUserReceiver._meta.label, 0),
+            raw_bytes=len(raw),
+            archived_bytes=len(compressed),
+        )
+
+    logger.info(
+        "Archived %s notifications of organization %s to %s, %s bytes reclaimed",
+        notification_archive.notification_count,
+        organization_id,
+        path or "nowhere",
+        notification_archive.raw_bytes,
+    )
+    return notification_archive
+
+
+def apply_retention_policies(
+    batch_size=None, max_batches=100
+) -> List[NotificationArchive]:
+    """Archive the due notifications of all organizations, at most `max_batches` batches."""
+    archives = []
+    for organization_id, before, archive in retention_scopes():
+        while len(archives) < max_batches:
+            notification_archive = archive_batch(
+                organization_id, before, archive=archive, batch_size=batch_size
+            )
+            if notification_archive is None:
+                break
+            archives.append(notification_archive)
+        if len(archives) >= max_batches:
+            break
+    return archives
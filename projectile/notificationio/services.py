@@ -1,8 +1,13 @@
+import datetime
 from decimal import Decimal
 import logging
+import uuid
 from typing import List
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import FilteredRelation, Q
+from django.utils import timezone
 
 from rest_framework.exceptions import ValidationError
 
@@ -17,12 +22,15 @@ from core.models import User
 from notificationio.choices import (
     ActivityActionTypeStatusChoices,
     NotificationEnableStatusChoices,
+    NotificationEventStatusChoices,
     NotificationModelTypeChoices,
 )
 
+from notificationio.counters import count_new_unread
 from notificationio.models import (
     NotificationUserPreference,
     Notification,
+    NotificationEvent,
     NotificationUserReceiver,
     NotificationModelConnector,
 )
@@ -35,7 +43,7 @@ class NotificationService:
         self._request = request
         self._organization = organization
 
-        if organization is None:
+        if organization is None and request is not None:
             self._organization = get_subdomain(request)
 
     def _get_current_user(self) -> User | None:
@@ -114,25 +122,6 @@ class NotificationService:
     def _get_action_type(self) -> str:
         return self.action_type_mapper().get(f"{self._request.method.upper()}")
 
-    def _check_if_user_has_permission(self, user: User, preference_enable: str) -> bool:
-        try:
-            preference_user_data: dict = (
-                self._get_notification_user_preference(user=user)
-            ).__dict__
-            if preference_user_data[preference_enable] == "ON":
-                return True
-            return False
-        except NotificationUserPreference.DoesNotExist:
-            self.set_user_preference(user=user)
-            return True
-
-    def _get_notification_user_preference(
-        self, user: User
-    ) -> NotificationUserPreference:
-        return NotificationUserPreference.objects.get(
-            organization=self._organization, user=user
-        )
-
     def convert_decimal_to_string(self, data):
         for key, value in data.items():
             if isinstance(value, dict):
@@ -170,10 +159,13 @@ class NotificationService:
         )
 
     def create_notification_model_connector(
-        self, notification: Notification, saved_or_updated_instance
+        self, notification: Notification, saved_or_updated_instance, **connections
     ) -> NotificationModelConnector:
+        """`connections` set other connector fields by id, like `order=1`."""
         notification_model_connector = NotificationModelConnector()
         notification_model_connector.notification = notification
+        for field, value in connections.items():
+            setattr(notification_model_connector, f"{field}_id", value)
         if notification.model_type == NotificationModelTypeChoices.USER:
             notification_model_connector.user = saved_or_updated_instance
         elif notification.model_type == NotificationModelTypeChoices.PRODUCT:
@@ -199,41 +191,99 @@ class NotificationService:
     def create_notification_user_receiver(
         self, notification: Notification, user: User, is_read=False
     ) -> NotificationUserReceiver:
-        instance, _ = NotificationUserReceiver.objects.get_or_create(
-            notification=notification, user=user, defaults={"is_read": is_read}
+        instance, created = NotificationUserReceiver.objects.get_or_create(
+            notification=notification,
+            user=user,
+            defaults={
+                "is_read": is_read,
+                "organization_id": notification.organization_id,
+            },
         )
+        if created and not is_read:
+            count_new_unread([(user.id, notification.organization_id)])
         return instance
 
+    def create_notification_user_receivers(
+        self, notification: Notification, user_ids: List[int], is_read=False
+    ) -> List[NotificationUserReceiver]:
+        """Insert the receivers of `user_ids` at once, existing ones are skipped."""
+        existing_user_ids = set(
+            NotificationUserReceiver.objects.filter(
+                notification=notification, user_id__in=user_ids
+            ).values_list("user_id", flat=True)
+        )
+        user_ids = [
+            user_id
+            for user_id in dict.fromkeys(user_ids)
+            if user_id not in existing_user_ids
+        ]
+        receivers = NotificationUserReceiver.objects.bulk_create(
+            [
+                NotificationUserReceiver(
+                    notification=notification,
+                    user_id=user_id,
+                    organization_id=notification.organization_id,
+                    is_read=is_read,
+                )
+                for user_id in user_ids
+            ],
+            ignore_conflicts=True,
+        )
+        if not is_read:
+            count_new_unread(
+                [(user_id, notification.organization_id) for user_id in user_ids]
+            )
+        return receivers
+
     def connect_notification_with_users(
         self,
         notification: Notification,
         saved_or_updated_instance,
     ):
-        # get all organization users
+        # the preference specific enable of the model
+        (
+            enable_model_notification,
+            model_name,
+        ) = self._get_if_user_has_model_permission(saved_or_updated_instance)
+
+        # all organization users with their preference, in one query
         organization_users = (
-            OrganizationUser.objects.select_related("organization", "user")
-            .filter(organization=self._organization)
+            OrganizationUser.objects.filter(organization=self._organization)
             .exclude(role__in=[OrganizationUserRole.CUSTOMER])
-        )
-
-        # check all organization users have model permission or not
-        for organization_user in organization_users:
-            # get the preference specific enable
-            (
-                enable_model_notification,
-                model_name,
-            ) = self._get_if_user_has_model_permission(saved_or_updated_instance)
-
-            # check the permission
-            has_permission = self._check_if_user_has_permission(
-                user=organization_user.user, preference_enable=enable_model_notification
+            .annotate(
+                preference=FilteredRelation(
+                    "user__notificationuserpreference",
+                    condition=Q(
+                        user__notificationuserpreference__organization=self._organization
+                    ),
+                )
+            )
+            .values_list(
+                "user_id", "preference__id", f"preference__{enable_model_notification}"
             )
+        )
 
-            # save the data to the organization
-            if has_permission:
-                self.create_notification_user_receiver(
-                    notification=notification, user=organization_user.user
+        receiver_ids, missing_preference_ids = [], []
+        for user_id, preference_id, enable in organization_users:
+            # users without a preference get the default one, everything ON
+            if preference_id is None:
+                missing_preference_ids.append(user_id)
+                receiver_ids.append(user_id)
+            elif enable == NotificationEnableStatusChoices.ON:
+                receiver_ids.append(user_id)
+
+        NotificationUserPreference.objects.bulk_create(
+            [
+                NotificationUserPreference(
+                    user_id=user_id, organization=self._organization
                 )
+                for user_id in dict.fromkeys(missing_preference_ids)
+            ],
+            ignore_conflicts=True,
+        )
+        self.create_notification_user_receivers(
+            notification=notification, user_ids=receiver_ids
+        )
 
     def create_notification_with_sending_notification_to_organization_users(
         self,
@@ -266,6 +316,173 @@ class NotificationService:
     def send_notification_to_custom_users(
         self, notification: Notification, user_ids: List[int]
     ):
-        for user_id in user_ids:
-            user = User.objects.get(id=user_id)
-            self.create_notification_user_receiver(notification=notification, user=user)
+        missing_user_ids = set(user_ids) - set(
+            User.objects.filter(id__in=user_ids).values_list("id", flat=True)
+        )
+        if missing_user_ids:
+            raise User.DoesNotExist(f"Users {missing_user_ids} do not exist.")
+        self.create_notification_user_receivers(
+            notification=notification, user_ids=user_ids
+        )
+
+    def notify(
+        self,
+        saved_or_updated_instance,
+        message: str = "",
+        status_code: int = 200,
+        previous_data=None,
+        action_type: ActivityActionTypeStatusChoices = None,
+        user_ids: List[int] = None,
+        connections: dict = None,
+        idempotency_key: str = None,
+    ):
+        """Notify the organization users and `user_ids` after the transaction commits.
+
+        Only the event is captured here, `process_notification_events` creates the
+        notification and its receivers out of the request. `connections` set other
+        connector fields by id, like `{"order": 1}`.
+        """
+        model_type = self._get_model_type(saved_or_updated_instance)
+        if model_type is None:
+            raise ValidationError(
+                {"detail": "Cannot set notification current model instance value."}
+            )
+
+        event = {
+            "idempotency_key": idempotency_key
+            or f"{model_type}:{saved_or_updated_instance.pk}:{uuid.uuid4().hex}",
+            "created_by_id": self._request.user.id,
+            "organization_id": self._organization.id if self._organization else None,
+            "model_type": model_type,
+            "object_id": saved_or_updated_instance.pk,
+            "action_type": action_type if action_type else self._get_action_type(),
+            "is_success": True if status_code < 300 else False,
+            "message": message,
+            "changed_data": (
+                self.convert_decimal_to_string(previous_data) if previous_data else {}
+            ),
+            "connections": connections or {},
+            "user_ids": list(user_ids or []),
+        }
+        transaction.on_commit(lambda: enqueue_notification_event(event))
+
+
+def enqueue_notification_event(event: dict):
+    """Store a captured event once, and process it right away in eager mode."""
+    NotificationEvent.objects.bulk_create(
+        [NotificationEvent(**event)], ignore_conflicts=True
+    )
+    if settings.NOTIFICATIONS_EAGER:
+        process_notification_events(idempotency_keys=[event["idempotency_key"]])
+
+
+def claim_notification_events(batch_size, idempotency_keys=None):
+    """Mark up to `batch_size` events PROCESSING, the rows locked by others are skipped.
+
+    Events left PROCESSING by a worker which died are claimed again after
+    `NOTIFICATION_EVENT_PROCESSING_TIMEOUT_SEC`.
+    """
+    now = timezone.now()
+    stale = now - datetime.timedelta(
+        seconds=settings.NOTIFICATION_EVENT_PROCESSING_TIMEOUT_SEC
+    )
+    events = NotificationEvent.objects.filter(
+        Q(status=NotificationEventStatusChoices.PENDING)
+        | Q(status=NotificationEventStatusChoices.PROCESSING, updated_at__lt=stale)
+    )
+    if idempotency_keys is not None:
+        events = events.filter(idempotency_key__in=idempotency_keys)
+
+    with transaction.atomic():
+        claimed = list(
+            events.select_for_update(skip_locked=True)
+            .select_related("organization")
+            .order_by("created_at")[:batch_size]
+        )
+        NotificationEvent.objects.filter(id__in=[event.id for event in claimed]).update(
+            status=NotificationEventStatusChoices.PROCESSING, updated_at=now
+        )
+    return claimed
+
+
+def _load_instances(events) -> dict:
+    """The notified objects of `events` with one query per model type."""
+    object_ids = {}
+    for event in events:
+        object_ids.setdefault(event.model_type, set()).add(event.object_id)
+
+    instances = {}
+    for model_type, ids in object_ids.items():
+        field = NotificationModelTypeChoices(model_type).name.lower()
+        model = NotificationModelConnector._meta.get_field(field).related_model
+        for pk, instance in model._default_manager.in_bulk(ids).items():
+            instances[(model_type, pk)] = instance
+    return instances
+
+
+def process_notification_event(event: NotificationEvent, instance) -> Notification:
+    service = NotificationService(request=None, organization=event.organization)
+    with transaction.atomic():
+        notification = Notification.objects.create(
+            created_by_id=event.created_by_id,
+            organization=event.organization,
+            changed_data=event.changed_data,
+            is_success=event.is_success,
+            message=event.message,
+            action_type=event.action_type,
+            model_type=event.model_type,
+        )
+        service.create_notification_model_connector(
+            notification=notification,
+            saved_or_updated_instance=instance,
+            **event.connections,
+        )
+        service.connect_notification_with_users(
+            notification=notification, saved_or_updated_instance=instance
+        )
+        if event.user_ids:
+            service.create_notification_user_receivers(
+                notification=notification,
+                user_ids=User.objects.filter(id__in=event.user_ids).values_list(
+                    "id", flat=True
+                ),
+            )
+
+        event.notification = notification
+        event.status = NotificationEventStatusChoices.DONE
+        event.last_error = ""
+        event.save()
+    return notification
+
+
+def process_notification_events(batch_size=None, idempotency_keys=None) -> int:
+    """Turn one batch of pending events into notifications, return its size.
+
+    Every event is written in its own transaction together with its DONE status, so
+    a retried event never creates a second notification.
+    """
+    events = claim_notification_events(
+        batch_size or settings.NOTIFICATION_EVENT_BATCH_SIZE, idempotency_keys
+    )
+    instances = _load_instances(events)
+
+    for event in events:
+        instance = instances.get((event.model_type, event.object_id))
+        try:
+            if instance is None:
+                raise ValueError(
+                    f"{event.model_type} {event.object_id} does not exist."
+                )
+            process_notification_event(event, instance)
+        except Exception as exception:
+            logger.exception("Could not process notification event %s", event.uid)
+            event.attempts += 1
+            event.last_error = str(exception)
+            event.status = (
+                NotificationEventStatusChoices.FAILED
+                if instance is None
+                or event.attempts >= settings.NOTIFICATION_EVENT_MAX_ATTEMPTS
+                else NotificationEventStatusChoices.PENDING
+            )
+            event.save(update_fields=["attempts", "last_error", "status", "updated_at"])
+    return len(events)
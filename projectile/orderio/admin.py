@@ -78,7 +78,9 @@ class OrderDeliveryAdmin(admin.ModelAdmin):
     list_display = [
         "uid",
         "order",
+        "previous_status",
         "status",
-        "stage",
+        "changed_by",
+        "created_at",
     ]
-    list_filter = ["status", "stage"]
+    list_filter = ["status"]
@@ -15,6 +15,14 @@ class OrderDeliveryStatus(models.TextChoices):
     COMPLETED = "COMPLETED", "Completed"
 
 
+# merchant orders are handed over at once and do not go through these
+MERCHANT_ORDER_SKIPPED_STATUSES = (
+    OrderDeliveryStatus.PARTIAL_DELIVERY,
+    OrderDeliveryStatus.RETURNED,
+    OrderDeliveryStatus.CANCELED,
+)
+
+
 class OrderStageChoices(models.TextChoices):
     PENDING = (
         "PENDING",
@@ -22,3 +30,16 @@ class OrderStageChoices(models.TextChoices):
     )
     CURRENT = "CURRENT", "Current"
     COMPLETED = "COMPLETED", "Completed"
+
+
+class SalesPeriod(models.TextChoices):
+    DAY = "DAY", "Day"
+    WEEK = "WEEK", "Week"
+    MONTH = "MONTH", "Month"
+
+
+class StockReservationStatus(models.TextChoices):
+    ACTIVE = "ACTIVE", "Active"
+    CONSUMED = "CONSUMED", "Consumed"
+    RELEASED = "RELEASED", "Released"
+    EXPIRED = "EXPIRED", "Expired"
@@ -0,0 +1,124 @@
+import statistics
+import time
+import uuid
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accountio.choices import OrganizationUserRole, OrganizationUserStatus
+from accountio.models import Organization, OrganizationUser
+from catalogio.models import BaseProduct, Product
+from core.models import User
+from orderio.models import Cart, CartProduct
+from orderio.pricing import CartPricingService
+from orderio.services import OrderPlacementService
+from paymentio.models import PaymentMethod
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the customer checkout of carts with a growing number of lines. "
+        "Creates throwaway rows and deletes them afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1, 10, 50, 200],
+            help="Cart lines of each measured checkout",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Checkouts of every size"
+        )
+
+    def setup(self, options):
+        name = self.name
+        self.organization = Organization.objects.create(name=name)
+        self.customer = User.objects.create(phone=self.phone)
+        OrganizationUser.objects.create(
+            organization=self.organization,
+            user=self.customer,
+            role=OrganizationUserRole.CUSTOMER,
+            status=OrganizationUserStatus.ACTIVE,
+            discount_offset=5,
+        )
+        self.payment_method = PaymentMethod.objects.create(name=name)
+
+        size = max(options["sizes"])
+        self.base_products = BaseProduct.objects.bulk_create(
+            [BaseProduct(name=f"{name}-{index}") for index in range(size)]
+        )
+        self.products = Product.objects.bulk_create(
+            [
+                Product(
+                    base_product=base_product,
+                    organization=self.organization,
+                    stock=size * options["repeat"],
+                    selling_price=10,
+                    discount_price=2,
+                )
+                for base_product in self.base_products
+            ]
+        )
+
+    def teardown(self):
+        # by name and phone, so a setup which failed halfway is cleaned up too,
+        # the orders, carts and memberships cascade
+        User.objects.filter(phone=self.phone).delete()
+        Organization.objects.filter(name=self.name).delete()
+        BaseProduct.objects.filter(name__startswith=f"{self.name}-").delete()
+        PaymentMethod.objects.filter(name=self.name).delete()
+
+    def fill_cart(self, size):
+        cart = Cart.objects.create(
+            organization=self.organization, customer=self.customer
+        )
+        CartProduct.objects.bulk_create(
+            [
+                CartProduct(
+                    cart=cart,
+                    product=product,
+                    organization=self.organization,
+                    quantity=1,
+                )
+                for product in self.products[:size]
+            ]
+        )
+
+    def checkout(self):
+        return OrderPlacementService(
+            self.organization, self.customer, self.customer, discount_offset=5
+        ).place_cart(
+            CartPricingService(self.organization, self.customer, discount_offset=5),
+            delivery_charge=60,
+            address={},
+            payment_method=self.payment_method,
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1 or min(options["sizes"]) < 1:
+            raise CommandError("--sizes and --repeat must be at least 1")
+
+        suffix = uuid.uuid4()
+        self.name = f"checkout-benchmark-{suffix.hex[:8]}"
+        self.phone = f"+88019{suffix.int % 10**8:08d}"
+        try:
+            self.setup(options)
+            for size in options["sizes"]:
+                timings, queries = [], []
+                for _ in range(options["repeat"]):
+                    self.fill_cart(size)
+                    with CaptureQueriesContext(connection) as context:
+                        started_at = time.perf_counter()
+                        self.checkout()
+                        timings.append((time.perf_counter() - started_at) * 1000)
+                    queries.append(len(context))
+                self.stdout.write(
+                    f"{size:>4} lines: median {statistics.median(timings):.1f}ms, "
+                    f"max {max(timings):.1f}ms, {max(queries)} queries"
+                )
+        finally:
+            self.teardown()
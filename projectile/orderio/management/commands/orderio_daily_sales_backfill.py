@@ -0,0 +1,52 @@
+import datetime
+import time
+
+from django.core.management import BaseCommand
+from tqdm import tqdm
+
+from orderio.models import Order
+from orderio.utils import rebuild_daily_sales
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily organization and customer sales rollups from the orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=datetime.date.fromisoformat,
+            help="First day to rebuild, e.g. 2023-01-30. Default is the first order",
+        )
+        parser.add_argument(
+            "--end",
+            type=datetime.date.fromisoformat,
+            help="Last day to rebuild, e.g. 2023-12-31. Default is today",
+        )
+        parser.add_argument(
+            "--organization",
+            action="append",
+            default=[],
+            help="Uid of an organization to rebuild, can be repeated. Default is all",
+        )
+
+    def handle(self, *args, **options):
+        orders = Order.objects.all()
+        if options["organization"]:
+            orders = orders.filter(organization__uid__in=options["organization"])
+        organization_ids = list(
+            orders.order_by("organization_id")
+            .values_list("organization_id", flat=True)
+            .distinct()
+        )
+
+        started_at = time.monotonic()
+        rows = 0
+        for organization_id in tqdm(organization_ids, unit="organization"):
+            rows += rebuild_daily_sales(
+                organization_id, start=options["start"], end=options["end"]
+            )
+
+        self.stdout.write(
+            f"Rebuilt {rows} customer days of {len(organization_ids)} organizations "
+            f"in {time.monotonic() - started_at:.2f}s"
+        )
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management import BaseCommand
+
+from orderio.services import StockReservationService
+
+
+class Command(BaseCommand):
+    help = "Give the stock of expired cart reservations back to the products"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Reservations expired per transaction",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and release the expired reservations every --interval",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30,
+            help="Seconds to wait between two runs of --loop",
+        )
+
+    def release(self, batch_size) -> int:
+        released = 0
+        while True:
+            count = StockReservationService.release_expired(batch_size)
+            released += count
+            if count < batch_size:
+                return released
+
+    def handle(self, *args, **options):
+        while True:
+            released = self.release(options["batch_size"])
+            if released or not options["loop"]:
+                self.stdout.write(f"Released {released} expired stock reservations")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,158 @@
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.core.management import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.db.models import Sum
+from rest_framework.exceptions import ValidationError
+
+from accountio.choices import OrganizationUserRole, OrganizationUserStatus
+from accountio.models import Organization, OrganizationUser
+from catalogio.models import BaseProduct, Product
+from core.models import User
+from orderio.choices import StockReservationStatus
+from orderio.models import OrderProduct, StockReservation
+from orderio.services import OrderPlacementService, StockReservationService
+from paymentio.models import PaymentMethod
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire parallel checkouts and orders at one product and check that no more "
+        "than its stock is sold. Creates throwaway rows and deletes them afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stock", type=int, default=100)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--orders", type=int, default=25, help="Orders placed by each thread"
+        )
+        parser.add_argument("--quantity", type=int, default=1)
+        parser.add_argument(
+            "--no-reserve",
+            action="store_true",
+            help="Place the orders directly instead of reserving at checkout first",
+        )
+
+    def setup(self, options):
+        name = self.name
+        self.organization = Organization.objects.create(name=name)
+        self.base_product = BaseProduct.objects.create(name=name)
+        self.product = Product.objects.create(
+            base_product=self.base_product,
+            organization=self.organization,
+            stock=options["stock"],
+            selling_price=10,
+        )
+        self.payment_method = PaymentMethod.objects.create(name=name)
+        self.customers = []
+        for phone in self.phones:
+            customer = User.objects.create(phone=phone)
+            OrganizationUser.objects.create(
+                organization=self.organization,
+                user=customer,
+                role=OrganizationUserRole.CUSTOMER,
+                status=OrganizationUserStatus.ACTIVE,
+            )
+            self.customers.append(customer)
+
+    def teardown(self):
+        # by name and phones, so a setup which failed halfway is cleaned up too,
+        # the orders, reservations, products and memberships cascade
+        User.objects.filter(phone__in=self.phones).delete()
+        Organization.objects.filter(name=self.name).delete()
+        BaseProduct.objects.filter(name=self.name).delete()
+        PaymentMethod.objects.filter(name=self.name).delete()
+
+    def order(self, customer, quantity, reserve):
+        lines = [(self.product, quantity)]
+        reservations = None
+        if reserve:
+            reservations = StockReservationService(self.organization, customer)
+            reservations.reserve(lines)
+        OrderPlacementService(self.organization, customer, customer).place(
+            lines,
+            reservations=reservations,
+            address={},
+            payment_method=self.payment_method,
+            total_price=quantity * 10,
+            payable_amount=quantity * 10,
+            order_price=quantity * 10,
+        )
+
+    def worker(self, customer, options, results, barrier):
+        try:
+            barrier.wait()
+            for _ in range(options["orders"]):
+                try:
+                    self.order(customer, options["quantity"], not options["no_reserve"])
+                    results["placed"] += 1
+                except ValidationError:
+                    results["stocked_out"] += 1
+                except DatabaseError as error:
+                    # e.g. "database is locked" on sqlite, the transaction is rolled back
+                    results["errors"] += 1
+                    self.errors[str(error)] += 1
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1 or options["orders"] < 1:
+            raise CommandError("--threads and --orders must be at least 1")
+        if options["threads"] > 10**4:
+            raise CommandError("--threads must be at most 10000")
+
+        suffix = uuid.uuid4()
+        self.name = f"stock-benchmark-{suffix.hex[:8]}"
+        prefix = suffix.int % 10**4
+        self.phones = [
+            f"+88019{prefix:04d}{index:04d}" for index in range(options["threads"])
+        ]
+        try:
+            self.setup(options)
+            results = Counter()
+            self.errors = Counter()
+            barrier = threading.Barrier(options["threads"])
+            threads = [
+                threading.Thread(
+                    target=self.worker, args=(customer, options, results, barrier)
+                )
+                for customer in self.customers
+            ]
+            started_at = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started_at
+
+            stock = Product.objects.values_list("stock", flat=True).get(
+                id=self.product.id
+            )
+            sold = OrderProduct.objects.filter(product=self.product).aggregate(
+                sold=Sum("quantity", default=0)
+            )["sold"]
+            # held by the checkouts whose order failed, until they expire
+            reserved = StockReservation.objects.filter(
+                product=self.product, status=StockReservationStatus.ACTIVE
+            ).aggregate(reserved=Sum("quantity", default=0))["reserved"]
+            attempts = options["threads"] * options["orders"]
+            self.stdout.write(
+                f"{attempts} attempts on {options['threads']} threads in {elapsed:.2f}s "
+                f"({attempts / elapsed:.1f}/s): {results['placed']} placed, "
+                f"{results['stocked_out']} stocked out, {results['errors']} errors"
+            )
+            for error, count in self.errors.most_common(3):
+                self.stdout.write(f"  {count} x {error}")
+            self.stdout.write(
+                f"stock {options['stock']}, sold {sold}, reserved {reserved}, "
+                f"remaining {stock}"
+            )
+            if stock < 0 or sold + reserved + stock != options["stock"]:
+                raise CommandError("Oversold: sold and remaining stock do not add up")
+            self.stdout.write(self.style.SUCCESS("No oversell"))
+        finally:
+            self.teardown()
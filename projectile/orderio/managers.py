@@ -0,0 +1,78 @@
+from datetime import datetime, time, timedelta
+
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .choices import SalesPeriod
+
+PERIOD_FUNCTIONS = {
+    SalesPeriod.DAY: TruncDay,
+    SalesPeriod.WEEK: TruncWeek,
+    SalesPeriod.MONTH: TruncMonth,
+}
+
+
+def day_range(day):
+    """The [start, end) datetimes of `day` in the current time zone."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+class DailySalesQuerySet(models.QuerySet):
+    def series(self, period=SalesPeriod.MONTH):
+        """Group the daily rows into `period` buckets, oldest first."""
+        return (
+            self.annotate(period=PERIOD_FUNCTIONS[period]("date"))
+            .values("period")
+            .annotate(
+                order_count=Sum("order_count"),
+                gross=Sum("gross"),
+                net=Sum("net"),
+                returned_quantity=Sum("returned_quantity"),
+            )
+            .order_by("period")
+        )
+
+    def refresh(self, day, **bucket):
+        """Recalculate the row of `day` for `bucket` (organization_id, customer_id).
+
+        The row is locked before the orders are aggregated, so concurrent writers of
+        one day are serialized and the later one sees the rows of the earlier one.
+        """
+        from .models import Order, OrderProduct, ReturnOrderProduct
+
+        start, end = day_range(day)
+        orders = Order.objects.filter(
+            organization_id=bucket["organization_id"],
+            created_at__gte=start,
+            created_at__lt=end,
+        )
+        returns = ReturnOrderProduct.objects.filter(
+            organization_id=bucket["organization_id"],
+            created_at__gte=start,
+            created_at__lt=end,
+        )
+        if "customer_id" in bucket:
+            orders = orders.filter(customer_id=bucket["customer_id"])
+            returns = returns.filter(order__customer_id=bucket["customer_id"])
+
+        with transaction.atomic():
+            self.get_or_create(date=day, **bucket)
+            daily_sales = self.select_for_update().get(date=day, **bucket)
+
+            totals = orders.aggregate(
+                order_count=Count("id"), net=Sum("total_price", default=0)
+            )
+            daily_sales.order_count = totals["order_count"]
+            daily_sales.net = totals["net"]
+            daily_sales.gross = OrderProduct.objects.filter(order__in=orders).aggregate(
+                gross=Sum(F("selling_price") * F("quantity"), default=0)
+            )["gross"]
+            daily_sales.returned_quantity = returns.aggregate(
+                returned_quantity=Sum("returned_quantity", default=0)
+            )["returned_quantity"]
+            daily_sales.save()
+
+        return daily_sales
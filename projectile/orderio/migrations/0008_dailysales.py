@@ -0,0 +1,104 @@
+# Generated by Django 4.2.4 on 2026-10-17 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("accountio", "0013_backfill_customerbalance"),
+        (
+            "orderio",
+            "0007_historicalreturnorderproduct_historicalorderdelivery_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrganizationDailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("order_count", models.PositiveIntegerField(default=0)),
+                (
+                    "gross",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "net",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("returned_quantity", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="accountio.organization",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "abstract": False,
+                "unique_together": {("organization", "date")},
+            },
+        ),
+        migrations.CreateModel(
+            name="CustomerDailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("order_count", models.PositiveIntegerField(default=0)),
+                (
+                    "gross",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "net",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("returned_quantity", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="accountio.organization",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "abstract": False,
+                "unique_together": {("organization", "customer", "date")},
+            },
+        ),
+    ]
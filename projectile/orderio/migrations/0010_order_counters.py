@@ -0,0 +1,134 @@
+# Generated by Django 4.2.4 on 2026-10-18 00:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_counters(apps, schema_editor):
+    Order = apps.get_model("orderio", "Order")
+    OrderDelivery = apps.get_model("orderio", "OrderDelivery")
+    OrderProduct = apps.get_model("orderio", "OrderProduct")
+    ReturnOrderProduct = apps.get_model("orderio", "ReturnOrderProduct")
+
+    Order.objects.update(
+        total_products=Coalesce(
+            Subquery(
+                OrderProduct.objects.filter(order=OuterRef("pk"))
+                .order_by()
+                .values("order")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        ),
+        returned_total_quantity=Coalesce(
+            Subquery(
+                ReturnOrderProduct.objects.filter(order=OuterRef("pk"))
+                .order_by()
+                .values("order")
+                .annotate(quantity=Sum("returned_quantity"))
+                .values("quantity")
+            ),
+            0,
+        ),
+        current_status=Coalesce(
+            Subquery(
+                OrderDelivery.objects.filter(
+                    order=OuterRef("pk"), stage="CURRENT"
+                ).values("status")[:1]
+            ),
+            Value("ORDER_PLACED"),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orderio", "0009_stockreservation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="historicalorder",
+            name="current_status",
+            field=models.CharField(
+                choices=[
+                    ("ORDER_PLACED", "Order Placed"),
+                    ("ACCEPTED", "Accepted"),
+                    ("PROCESSING", "Processing"),
+                    ("PACKAGING", "Packaging"),
+                    ("PARTIAL_DELIVERY", "Partial Delivery"),
+                    ("WAITING_FOR_DELIVERER", "Waiting For Deliverer"),
+                    ("ON_THE_WAY", "On The Way"),
+                    ("PARTIAL_RETURNED", "Partial Returned"),
+                    ("RETURNED", "Returned"),
+                    ("CANCELED", "Canceled"),
+                    ("COMPLETED", "Completed"),
+                ],
+                default="ORDER_PLACED",
+                editable=False,
+                help_text="Status of the CURRENT delivery stage",
+                max_length=50,
+            ),
+        ),
+        migrations.AddField(
+            model_name="historicalorder",
+            name="returned_total_quantity",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="historicalorder",
+            name="total_products",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="current_status",
+            field=models.CharField(
+                choices=[
+                    ("ORDER_PLACED", "Order Placed"),
+                    ("ACCEPTED", "Accepted"),
+                    ("PROCESSING", "Processing"),
+                    ("PACKAGING", "Packaging"),
+                    ("PARTIAL_DELIVERY", "Partial Delivery"),
+                    ("WAITING_FOR_DELIVERER", "Waiting For Deliverer"),
+                    ("ON_THE_WAY", "On The Way"),
+                    ("PARTIAL_RETURNED", "Partial Returned"),
+                    ("RETURNED", "Returned"),
+                    ("CANCELED", "Canceled"),
+                    ("COMPLETED", "Completed"),
+                ],
+                default="ORDER_PLACED",
+                editable=False,
+                help_text="Status of the CURRENT delivery stage",
+                max_length=50,
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="returned_total_quantity",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="total_products",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_order_counters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["organization", "created_at"],
+                name="orderio_ord_organiz_991707_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["organization", "current_status", "created_at"],
+                name="orderio_ord_organiz_fcd598_idx",
+            ),
+        ),
+    ]
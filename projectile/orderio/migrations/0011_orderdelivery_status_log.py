@@ -0,0 +1,177 @@
+# Generated by Django 4.2.4 on 2026-10-18 00:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+import django.db.models.deletion
+
+
+def drop_pending_deliveries(apps, schema_editor):
+    # the log keeps the statuses which were reached, rows created ahead for the
+    # later statuses go unless a notification points at them
+    OrderDelivery = apps.get_model("orderio", "OrderDelivery")
+    NotificationModelConnector = apps.get_model(
+        "notificationio", "NotificationModelConnector"
+    )
+    OrderDelivery.objects.filter(stage="PENDING").exclude(
+        id__in=NotificationModelConnector.objects.filter(
+            order_delivery__isnull=False
+        ).values("order_delivery")
+    ).delete()
+
+
+def backfill_status_log(apps, schema_editor):
+    # the rows were all created with the order, a status was reached when its row
+    # was last updated, the previous status is the one reached before it
+    OrderDelivery = apps.get_model("orderio", "OrderDelivery")
+    reached = OrderDelivery.objects.exclude(stage="PENDING")
+    reached.update(created_at=F("updated_at"))
+
+    changed, previous = [], {}
+    for delivery in reached.order_by("order_id", "created_at", "id").iterator():
+        if delivery.order_id in previous:
+            delivery.previous_status = previous[delivery.order_id]
+            changed.append(delivery)
+        previous[delivery.order_id] = delivery.status
+    OrderDelivery.objects.bulk_update(changed, ["previous_status"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("notificationio", "0008_notification_retention"),
+        ("orderio", "0010_order_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_pending_deliveries, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name="orderdelivery",
+            options={"ordering": ["created_at"]},
+        ),
+        migrations.AlterUniqueTogether(
+            name="orderdelivery",
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name="historicalorderdelivery",
+            name="stage",
+        ),
+        migrations.AddField(
+            model_name="historicalorderdelivery",
+            name="changed_by",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="historicalorderdelivery",
+            name="previous_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("ORDER_PLACED", "Order Placed"),
+                    ("ACCEPTED", "Accepted"),
+                    ("PROCESSING", "Processing"),
+                    ("PACKAGING", "Packaging"),
+                    ("PARTIAL_DELIVERY", "Partial Delivery"),
+                    ("WAITING_FOR_DELIVERER", "Waiting For Deliverer"),
+                    ("ON_THE_WAY", "On The Way"),
+                    ("PARTIAL_RETURNED", "Partial Returned"),
+                    ("RETURNED", "Returned"),
+                    ("CANCELED", "Canceled"),
+                    ("COMPLETED", "Completed"),
+                ],
+                max_length=50,
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderdelivery",
+            name="changed_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderdelivery",
+            name="previous_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("ORDER_PLACED", "Order Placed"),
+                    ("ACCEPTED", "Accepted"),
+                    ("PROCESSING", "Processing"),
+                    ("PACKAGING", "Packaging"),
+                    ("PARTIAL_DELIVERY", "Partial Delivery"),
+                    ("WAITING_FOR_DELIVERER", "Waiting For Deliverer"),
+                    ("ON_THE_WAY", "On The Way"),
+                    ("PARTIAL_RETURNED", "Partial Returned"),
+                    ("RETURNED", "Returned"),
+                    ("CANCELED", "Canceled"),
+                    ("COMPLETED", "Completed"),
+                ],
+                max_length=50,
+            ),
+        ),
+        migrations.RunPython(backfill_status_log, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="historicalorder",
+            name="current_status",
+            field=models.CharField(
+                choices=[
+                    ("ORDER_PLACED", "Order Placed"),
+                    ("ACCEPTED", "Accepted"),
+                    ("PROCESSING", "Processing"),
+                    ("PACKAGING", "Packaging"),
+                    ("PARTIAL_DELIVERY", "Partial Delivery"),
+                    ("WAITING_FOR_DELIVERER", "Waiting For Deliverer"),
+                    ("ON_THE_WAY", "On The Way"),
+                    ("PARTIAL_RETURNED", "Partial Returned"),
+                    ("RETURNED", "Returned"),
+                    ("CANCELED", "Canceled"),
+                    ("COMPLETED", "Completed"),
+                ],
+                default="ORDER_PLACED",
+                editable=False,
+                help_text="Status of the latest change in the delivery status log",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="current_status",
+            field=models.CharField(
+                choices=[
+                    ("ORDER_PLACED", "Order Placed"),
+                    ("ACCEPTED", "Accepted"),
+                    ("PROCESSING", "Processing"),
+                    ("PACKAGING", "Packaging"),
+                    ("PARTIAL_DELIVERY", "Partial Delivery"),
+                    ("WAITING_FOR_DELIVERER", "Waiting For Deliverer"),
+                    ("ON_THE_WAY", "On The Way"),
+                    ("PARTIAL_RETURNED", "Partial Returned"),
+                    ("RETURNED", "Returned"),
+                    ("CANCELED", "Canceled"),
+                    ("COMPLETED", "Completed"),
+                ],
+                default="ORDER_PLACED",
+                editable=False,
+                help_text="Status of the latest change in the delivery status log",
+                max_length=50,
+            ),
+        ),
+        migrations.RemoveField(
+            model_name="orderdelivery",
+            name="stage",
+        ),
+    ]
@@ -1,9 +1,10 @@
 import decimal
+from typing import List
 
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
-from django.db.models import Sum, F, Case, When, Value, QuerySet
+from django.db.models import Sum, F, QuerySet
 
 from phonenumber_field.modelfields import PhoneNumberField
 from rest_framework.exceptions import NotFound
@@ -18,7 +19,13 @@ from common.utils import unique_number_generator
 
 from core.utils import BaseModelwithUID
 
-from orderio.choices import OrderDeliveryStatus, OrderStageChoices
+from orderio.choices import (
+    MERCHANT_ORDER_SKIPPED_STATUSES,
+    OrderDeliveryStatus,
+    OrderStageChoices,
+    StockReservationStatus,
+)
+from orderio.managers import DailySalesQuerySet
 
 User = get_user_model()
 
@@ -31,14 +38,9 @@ class Cart(BaseModelwithUID):
         unique_together = ("customer", "organization")
 
     def total_price(self) -> decimal.Decimal:
-        total_price = decimal.Decimal(0)
-        if self.products.exists():
-            for cart_product in self.products.all():
-                total_price += cart_product.total_price()
+        from orderio.pricing import CartPricingService
 
-            return total_price
-        else:
-            return decimal.Decimal(0)
+        return CartPricingService(self.organization, self.customer).price().total_price
 
     def __str__(self):
         return f"Customer: {self.customer}, Total price: {self.total_price()}"
@@ -58,37 +60,18 @@ class CartProduct(BaseModelwithUID):
         "accountio.Organization", on_delete=models.CASCADE, blank=True
     )
 
-    def single_discounted_price(self):
-        try:
-            main_product = self.product
-        except Product.DoesNotExist:
-            self.delete()
-            return decimal.Decimal(0)
-
-        product_price = main_product.selling_price
-        # get the all discounted percents
-        product_discount_percent = main_product.discount_price
-        customer_discount_offset_percent = self.organization.organizationuser_set.get(
-            user=self.cart.customer
-        ).discount_offset
-
-        # sum the product discount and customer offset discount
-        total_discount_percent = (
-            product_discount_percent + customer_discount_offset_percent
-        )
+    def single_discounted_price(self, discount_offset=None):
+        from orderio.pricing import LinePrice
 
-        # get the single product discounted price
-        single_product_discounted_price = product_price * (
-            1 - (total_discount_percent / decimal.Decimal(100))
-        )
-        return single_product_discounted_price
+        if discount_offset is None:
+            discount_offset = self.organization.organizationuser_set.get(
+                user_id=self.cart.customer_id
+            ).discount_offset
+        return LinePrice(self.product, self.quantity, discount_offset).unit_price
 
-    def total_price(self) -> decimal.Decimal:
-        single_product_discounted_price = self.single_discounted_price()
+    def total_price(self, discount_offset=None) -> decimal.Decimal:
         # multiply the final product price with the quantity
-        final_price = single_product_discounted_price * self.quantity
-
-        return final_price
+        return self.single_discounted_price(discount_offset) * self.quantity
 
     class Meta:
         unique_together = ("cart", "product")
@@ -152,6 +135,17 @@ class Order(BaseModelwithUID):
     payment_method = models.ForeignKey(
         "paymentio.PaymentMethod", on_delete=models.CASCADE
     )
+    # counters of the lines and returns kept by orderio.signals, the current status
+    # is set with orderio.services.change_order_status
+    total_products = models.PositiveIntegerField(default=0, editable=False)
+    returned_total_quantity = models.PositiveIntegerField(default=0, editable=False)
+    current_status = models.CharField(
+        max_length=50,
+        default=OrderDeliveryStatus.ORDER_PLACED,
+        choices=OrderDeliveryStatus.choices,
+        editable=False,
+        help_text="Status of the latest change in the delivery status log",
+    )
 
     # history
     history = HistoricalRecords()
@@ -175,6 +169,55 @@ class Order(BaseModelwithUID):
     def calculate_due(self):
         return self.total_price - self.payable_amount
 
+    def delivery_stages(self) -> List[dict]:
+        """The delivery stages of the order derived from `current_status` and the log.
+
+        Statuses before the current one are COMPLETED and the ones after it PENDING,
+        like the rows which were created for every status before. A completed stage
+        has the time it was last reached, or the order time when it was skipped.
+        """
+        reached_at = {
+            delivery.status: delivery.created_at
+            for delivery in sorted(
+                self.delivery_statuses.all(), key=lambda delivery: delivery.created_at
+            )
+        }
+        skipped = (
+            MERCHANT_ORDER_SKIPPED_STATUSES
+            if self.order_by_id != self.customer_id
+            else ()
+        )
+        statuses = [
+            status
+            for status in OrderDeliveryStatus.values
+            if status not in skipped
+            or status in reached_at
+            or status == self.current_status
+        ]
+        current_index = statuses.index(self.current_status)
+
+        stages = []
+        for index, status in enumerate(statuses):
+            stage = OrderStageChoices.PENDING
+            if index < current_index:
+                stage = OrderStageChoices.COMPLETED
+            elif index == current_index:
+                stage = OrderStageChoices.CURRENT
+            completed = stage == OrderStageChoices.COMPLETED or (
+                stage == OrderStageChoices.CURRENT
+                and status == OrderDeliveryStatus.COMPLETED
+            )
+            stages.append(
+                {
+                    "status": status,
+                    "stage": stage,
+                    "created_at": (
+                        reached_at.get(status, self.created_at) if completed else ""
+                    ),
+                }
+            )
+        return stages
+
     def save(self, *args, **kwargs):
         if self.pk is None:
             self.serial_number = unique_number_generator(self)
@@ -182,6 +225,10 @@ class Order(BaseModelwithUID):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["organization", "created_at"]),
+            models.Index(fields=["organization", "current_status", "created_at"]),
+        ]
 
 
 class OrderProduct(BaseModelwithUID):
@@ -265,6 +312,12 @@ class ReturnOrderProduct(BaseModelwithUID):
 
 
 class OrderDelivery(BaseModelwithUID):
+    """Append-only log of the delivery status changes of an order.
+
+    A row is added for every change, `Order.current_status` is the status of the
+    latest one and `Order.delivery_stages` derives the stages shown by the api.
+    """
+
     order = models.ForeignKey(
         Order, on_delete=models.CASCADE, related_name="delivery_statuses", blank=True
     )
@@ -273,41 +326,109 @@ class OrderDelivery(BaseModelwithUID):
         default=OrderDeliveryStatus.ORDER_PLACED,
         choices=OrderDeliveryStatus.choices,
     )
-    stage = models.CharField(max_length=15, choices=OrderStageChoices.choices)
+    previous_status = models.CharField(
+        max_length=50, blank=True, choices=OrderDeliveryStatus.choices
+    )
+    changed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
 
     # history
     history = HistoricalRecords()
 
     class Meta:
-        unique_together = (
-            "order",
-            "status",
-        )
+        ordering = ["created_at"]
 
     def __str__(self):
         return f"Order ID: {self.order.serial_number}, Status: {self.status}"
 
-    def save(self, *args, **kwargs):
-        if self.pk is not None and self.stage == OrderStageChoices.CURRENT:
-            up_to_status = OrderDeliveryStatus.choices.index(
-                (self.status, dict(OrderDeliveryStatus.choices)[self.status])
-            )
-            status_by_name = [
-                choice[0] for choice in OrderDeliveryStatus.choices[:up_to_status]
-            ]
-            OrderDelivery.objects.filter(order=self.order).exclude(pk=self.pk).update(
-                stage=Case(
-                    When(
-                        status__in=status_by_name,
-                        then=Value(OrderStageChoices.COMPLETED),
-                    ),
-                    default=Value(OrderStageChoices.PENDING),
-                )
-            )
-        super().save(*args, **kwargs)
-
     """
     In signal (orderio.signals):
     1. we added a instance of TransactionOrganizationUser with amount after creating a instance of Order instance.
 
     """
+
+
+class DailySales(models.Model):
+    """Sales of one day, refreshed by the order signals (see orderio.signals).
+
+    `gross` is the line price before any discount, `net` the order total after the
+    product, customer and order discounts.
+    """
+
+    date = models.DateField()
+    order_count = models.PositiveIntegerField(default=0)
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    net = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    returned_quantity = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # custom managers use
+    objects = DailySalesQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        ordering = ["date"]
+
+
+class OrganizationDailySales(DailySales):
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
+
+    class Meta(DailySales.Meta):
+        unique_together = ("organization", "date")
+
+    def __str__(self):
+        return f"Org: {self.organization_id}, Date: {self.date}, Net: {self.net}"
+
+
+class CustomerDailySales(DailySales):
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
+    customer = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="daily_sales"
+    )
+
+    class Meta(DailySales.Meta):
+        unique_together = ("organization", "customer", "date")
+
+    def __str__(self):
+        return f"Org: {self.organization_id}, Customer: {self.customer_id}, Date: {self.date}"
+
+
+class StockReservation(BaseModelwithUID):
+    """Stock held for a customer between the cart checkout and the order.
+
+    The quantity is taken from `Product.stock` when the reservation is made. An
+    order consumes it, otherwise it is given back when released or expired
+    (see orderio.services.StockReservationService).
+    """
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
+    customer = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="stock_reservations"
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_reservations"
+    )
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    status = models.CharField(
+        max_length=20,
+        choices=StockReservationStatus.choices,
+        default=StockReservationStatus.ACTIVE,
+    )
+    expires_at = models.DateTimeField()
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="stock_reservations",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "expires_at"]),
+            models.Index(fields=["organization", "customer", "status"]),
+        ]
+
+    def __str__(self):
+        return f"Product: {self.product_id}, Quantity: {self.quantity}, Status: {self.status}"
@@ -0,0 +1,122 @@
+import decimal
+from typing import Iterable, List, Tuple
+
+from accountio.models import Organization, OrganizationUser
+
+from catalogio.models import Product
+
+from core.models import User
+
+from orderio.models import CartProduct
+
+HUNDRED = decimal.Decimal(100)
+
+
+class LinePrice:
+    """The price of `quantity` of `product` for a customer with `discount_offset`."""
+
+    __slots__ = (
+        "product",
+        "quantity",
+        "total_discount",
+        "unit_price",
+        "gross_price",
+        "total_price",
+    )
+
+    def __init__(self, product: Product, quantity: int, discount_offset):
+        self.product = product
+        self.quantity = quantity
+        self.total_discount = product.discount_price + discount_offset
+        self.unit_price = product.selling_price * (1 - self.total_discount / HUNDRED)
+        self.gross_price = product.selling_price * quantity
+        self.total_price = self.unit_price * quantity
+
+
+class CartPrice:
+    """The priced lines of a cart and their totals.
+
+    `gross_price` is the total before any discount, `total_price` after the product
+    discounts and the customer offset.
+    """
+
+    def __init__(self, lines: List[LinePrice], discount_offset):
+        self.lines = lines
+        self.discount_offset = discount_offset
+        self.gross_price = sum((line.gross_price for line in lines), decimal.Decimal(0))
+        self.total_price = sum((line.total_price for line in lines), decimal.Decimal(0))
+
+    @property
+    def discount(self) -> decimal.Decimal:
+        return self.gross_price - self.total_price
+
+    def as_order_lines(self) -> List[Tuple[Product, int]]:
+        """(product, quantity) of the lines for `OrderPlacementService.place`."""
+        return [(line.product, line.quantity) for line in self.lines]
+
+
+def price_lines(lines: Iterable[Tuple[Product, int]], discount_offset=0) -> CartPrice:
+    """Price (product, quantity) lines of a customer with `discount_offset`."""
+    return CartPrice(
+        [
+            LinePrice(product, quantity, discount_offset)
+            for product, quantity in lines
+            if product is not None
+        ],
+        discount_offset,
+    )
+
+
+class CartPricingService:
+    """Price the cart of a customer in an organization.
+
+    The discount offset of the customer is read once and all lines are loaded with
+    their products in one query, so the price of a cart costs two queries however
+    many lines it has.
+    """
+
+    def __init__(
+        self, organization: Organization, customer: User, discount_offset=None
+    ):
+        self._organization = organization
+        self._customer = customer
+        self._discount_offset = discount_offset
+
+    def get_discount_offset(self):
+        if self._discount_offset is None:
+            self._discount_offset = (
+                OrganizationUser.objects.filter(
+                    organization=self._organization, user=self._customer
+                )
+                .values_list("discount_offset", flat=True)
+                .first()
+                or 0
+            )
+        return self._discount_offset
+
+    def get_queryset(self, lock=False):
+        queryset = CartProduct.objects.select_related("product__base_product").filter(
+            cart__organization=self._organization, cart__customer=self._customer
+        )
+        if lock:
+            # in product order, checkouts of the same products queue up instead of
+            # deadlocking
+            queryset = queryset.select_for_update(of=("self", "product")).order_by(
+                "product_id"
+            )
+        return queryset
+
+    def price(self, cart_products=None, lock=False) -> CartPrice:
+        """Price `cart_products`, loaded with their products, or the whole cart.
+
+        `lock` locks the lines and their products until the end of the transaction.
+        """
+        if cart_products is None:
+            cart_products = self.get_queryset(lock=lock)
+        return price_lines(
+            (
+                (cart_product.product, cart_product.quantity)
+                for cart_product in cart_products
+            ),
+            self.get_discount_offset(),
+        )
@@ -0,0 +1,333 @@
+from collections import Counter, OrderedDict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from rest_framework.exceptions import ValidationError
+
+from accountio.models import Organization, TransactionOrganizationUser
+
+from catalogio.models import Product
+
+from core.models import User
+
+from orderio.choices import OrderDeliveryStatus, StockReservationStatus
+from orderio.models import (
+    Cart,
+    Order,
+    OrderDelivery,
+    OrderProduct,
+    StockReservation,
+)
+from orderio.pricing import CartPricingService
+from orderio.utils import refresh_daily_sales
+
+
+def merge_lines(lines: Iterable[Tuple[Product, int]]) -> "OrderedDict":
+    """Sum the quantities of repeated products, an order has one line per product."""
+    merged = OrderedDict()
+    for product, quantity in lines:
+        if product.id in merged:
+            merged[product.id] = (product, merged[product.id][1] + quantity)
+        else:
+            merged[product.id] = (product, quantity)
+    return merged
+
+
+def _quantity_case(quantities: Dict[int, int]) -> Case:
+    return Case(
+        *[
+            When(id=product_id, then=Value(quantity))
+            for product_id, quantity in quantities.items()
+        ],
+        output_field=IntegerField(),
+    )
+
+
+def record_stock_history(product_ids: Iterable[int], reason: str):
+    """Write the history of products changed with `update()` with one INSERT."""
+    Product.history.bulk_history_create(
+        Product.objects.filter(id__in=product_ids),
+        update=True,
+        default_change_reason=reason,
+    )
+
+
+def take_stock(lines: "OrderedDict"):
+    """Decrement the stock of all `merge_lines` lines with a single UPDATE or raise.
+
+    The stock check is part of the UPDATE, concurrent writers cannot take more than
+    the stock.
+    """
+    quantity = _quantity_case(
+        {product_id: quantity for product_id, (_, quantity) in lines.items()}
+    )
+    updated = Product.objects.filter(id__in=lines.keys(), stock__gte=quantity).update(
+        stock=F("stock") - quantity
+    )
+    if updated == len(lines):
+        record_stock_history(lines.keys(), "Stock taken")
+        return
+
+    stocks = dict(
+        Product.objects.filter(id__in=lines.keys()).values_list("id", "stock")
+    )
+    stocked_out: List[str] = [
+        product.base_product.name
+        for product_id, (product, quantity) in lines.items()
+        if stocks.get(product_id, 0) < quantity
+    ]
+    raise ValidationError(
+        {
+            "detail": f"{', '.join(stocked_out)} {'products are' if len(stocked_out) > 1 else 'product is'} stocked out"
+        }
+    )
+
+
+def return_stock(quantities: Dict[int, int]):
+    """Give `quantities` {product_id: quantity} back to the stock with one UPDATE."""
+    if not quantities:
+        return
+    Product.objects.filter(id__in=quantities.keys()).update(
+        stock=F("stock") + _quantity_case(quantities)
+    )
+    record_stock_history(quantities.keys(), "Stock returned")
+
+
+def change_order_status(
+    order: Order, status: str, changed_by: User = None
+) -> OrderDelivery:
+    """Append the change of `order` to `status` to its log and make it current.
+
+    The earlier changes are kept as they are, a change costs one INSERT and one
+    UPDATE of the order.
+    """
+    with transaction.atomic():
+        delivery = OrderDelivery.objects.create(
+            order=order,
+            status=status,
+            previous_status=order.current_status,
+            changed_by=changed_by,
+        )
+        Order.objects.filter(pk=order.pk).update(current_status=status)
+    order.current_status = status
+    return delivery
+
+
+class OrderPlacementService:
+    """Place an order with its lines, delivery status and stock in one transaction.
+
+    The lines are written with `bulk_create` and the stock of every product is taken
+    with one conditional UPDATE, so an order costs the same number of queries for 1
+    or 200 lines. The stock check is part of the UPDATE,
+    concurrent orders cannot sell more than the stock.
+    """
+
+    def __init__(
+        self,
+        organization: Organization,
+        customer: User,
+        order_by: User,
+        discount_offset=0,
+    ):
+        self._organization = organization
+        self._customer = customer
+        self._order_by = order_by
+        self._discount_offset = discount_offset
+
+    def place(
+        self,
+        lines: Iterable[Tuple[Product, int]],
+        current_status=OrderDeliveryStatus.ORDER_PLACED,
+        reservations: "StockReservationService" = None,
+        **order_fields,
+    ) -> Order:
+        """Create the order of `lines` (product, quantity) with `order_fields`.
+
+        The order starts at `current_status`, the first row of its status log. The
+        stock held by `reservations` is used first.
+        """
+        lines = merge_lines(lines)
+        if not lines:
+            raise ValidationError({"detail": "An order needs at least one product."})
+
+        with transaction.atomic():
+            reserved = reservations.consume() if reservations else []
+            take_stock(lines)
+
+            order = Order.objects.create(
+                organization=self._organization,
+                customer=self._customer,
+                order_by=self._order_by,
+                discount_offset=self._discount_offset,
+                total_products=len(lines),
+                current_status=current_status,
+                **order_fields,
+            )
+            if reserved:
+                StockReservation.objects.filter(id__in=reserved).update(order=order)
+            OrderProduct.objects.bulk_create(
+                [
+                    OrderProduct(
+                        order=order,
+                        product=product,
+                        selling_price=product.selling_price,
+                        discount_price=product.discount_price + self._discount_offset,
+                        quantity=quantity,
+                        updated_quantity=quantity,
+                        delivery_quantity=quantity,
+                    )
+                    for product, quantity in lines.values()
+                ]
+            )
+            OrderDelivery.objects.create(
+                order=order, status=current_status, changed_by=self._order_by
+            )
+
+            # bulk_create skips the signals which keep the gross of the day
+            refresh_daily_sales(
+                order.organization_id, order.customer_id, order.created_at
+            )
+
+        return order
+
+    def place_cart(
+        self, pricing: CartPricingService, delivery_charge=0, **order_fields
+    ) -> Order:
+        """Order the cart priced by `pricing` and empty it, in one transaction.
+
+        The cart lines and their products are read once, locked, and priced in
+        memory. The stock held at checkout is used before the unreserved one.
+        """
+        with transaction.atomic():
+            price = pricing.price(lock=True)
+            if not price.lines:
+                raise ValidationError("Please add some products to cart first.")
+
+            total_price = price.total_price + delivery_charge
+            order = self.place(
+                price.as_order_lines(),
+                reservations=StockReservationService(
+                    self._organization, self._customer
+                ),
+                total_price=total_price,
+                payable_amount=total_price,
+                order_price=total_price,
+                delivery_charge=delivery_charge,
+                **order_fields,
+            )
+            Cart.objects.filter(
+                organization=self._organization, customer=self._customer
+            ).delete()
+        return order
+
+    def record_payment(self, order: Order) -> TransactionOrganizationUser:
+        """Record the payable amount of `order` paid at placement."""
+        return TransactionOrganizationUser.objects.create(
+            organization=self._organization,
+            user=self._customer,
+            total_money=order.total_price,
+            payable_money=order.payable_amount,
+            order=order,
+        )
+
+
+class StockReservationService:
+    """Hold stock for the cart of a customer until it is ordered.
+
+    `reserve` takes the stock right away with the same conditional UPDATE as an
+    order, so the stock of a product never goes below zero however many customers
+    check out at once. A reservation is consumed by the order, released by the
+    customer or expired by `release_expired` after `timeout` seconds.
+    """
+
+    def __init__(self, organization: Organization, customer: User, timeout=None):
+        self._organization = organization
+        self._customer = customer
+        self._timeout = timeout or settings.STOCK_RESERVATION_TIMEOUT_SEC
+
+    def get_queryset(self):
+        return StockReservation.objects.filter(
+            organization=self._organization,
+            customer=self._customer,
+            status=StockReservationStatus.ACTIVE,
+        )
+
+    @staticmethod
+    def _close(reservations, status) -> List[int]:
+        """Return the stock of the locked `reservations` and set their status."""
+        with transaction.atomic():
+            rows = list(
+                reservations.select_for_update().values_list(
+                    "id", "product_id", "quantity"
+                )
+            )
+            if not rows:
+                return []
+
+            quantities = Counter()
+            for _, product_id, quantity in rows:
+                quantities[product_id] += quantity
+            return_stock(quantities)
+
+            ids = [row[0] for row in rows]
+            StockReservation.objects.filter(id__in=ids).update(
+                status=status, updated_at=timezone.now()
+            )
+        return ids
+
+    def reserve(self, lines: Iterable[Tuple[Product, int]]) -> List[StockReservation]:
+        """Replace the active reservations of the customer with `lines`."""
+        lines = merge_lines(lines)
+        if not lines:
+            raise ValidationError({"detail": "Please add some products to cart first."})
+
+        expires_at = timezone.now() + timedelta(seconds=self._timeout)
+        with transaction.atomic():
+            self.release()
+            take_stock(lines)
+            return StockReservation.objects.bulk_create(
+                [
+                    StockReservation(
+                        organization=self._organization,
+                        customer=self._customer,
+                        product=product,
+                        quantity=quantity,
+                        expires_at=expires_at,
+                    )
+                    for product, quantity in lines.values()
+                ]
+            )
+
+    def release(self) -> List[int]:
+        return self._close(self.get_queryset(), StockReservationStatus.RELEASED)
+
+    def consume(self) -> List[int]:
+        """Give the reserved stock back to be taken by the order in the same transaction."""
+        return self._close(self.get_queryset(), StockReservationStatus.CONSUMED)
+
+    @classmethod
+    def release_expired(cls, batch_size=500) -> int:
+        """Expire up to `batch_size` overdue reservations, skipping the locked ones."""
+        with transaction.atomic():
+            ids = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status=StockReservationStatus.ACTIVE,
+                    expires_at__lte=timezone.now(),
+                )
+                .order_by("expires_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            return len(
+                cls._close(
+                    StockReservation.objects.filter(
+                        id__in=ids, status=StockReservationStatus.ACTIVE
+                    ),
+                    StockReservationStatus.EXPIRED,
+                )
+            )
@@ -1,7 +1,21 @@
-from django.db.models.signals import pre_save, post_save
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
-from orderio.models import CartProduct, ReturnOrderProduct, OrderDelivery
+from accountio.models import Organization
+
+from common.utils import is_deleted_with
+
+from orderio.models import (
+    CartProduct,
+    Order,
+    OrderProduct,
+    ReturnOrderProduct,
+    OrderDelivery,
+)
+from orderio.utils import refresh_daily_sales, refresh_order_counters
+
+User = get_user_model()
 
 
 @receiver(pre_save, sender=CartProduct)
@@ -9,6 +23,44 @@ def add_organization_to_cartproduct(sender, instance, **kwargs):
     instance.organization = instance.product.organization
 
 
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_refresh_daily_sales(sender, instance, **kwargs):
+    # the sales rows go away with their organization or customer
+    if "origin" in kwargs and is_deleted_with(kwargs["origin"], Organization, User):
+        return
+    refresh_daily_sales(
+        instance.organization_id, instance.customer_id, instance.created_at
+    )
+
+
+@receiver(post_save, sender=OrderProduct)
+@receiver(post_delete, sender=OrderProduct)
+def orderproduct_refresh_daily_sales(sender, instance, **kwargs):
+    # an order refreshes its day itself when it is deleted
+    if "origin" in kwargs and is_deleted_with(
+        kwargs["origin"], Organization, User, Order
+    ):
+        return
+    order = instance.order
+    refresh_daily_sales(order.organization_id, order.customer_id, order.created_at)
+    refresh_order_counters(order.id)
+
+
+@receiver(post_save, sender=ReturnOrderProduct)
+@receiver(post_delete, sender=ReturnOrderProduct)
+def returnorderproduct_refresh_daily_sales(sender, instance, **kwargs):
+    # counted on the day of the return, which is not always the order day
+    if "origin" in kwargs and is_deleted_with(kwargs["origin"], Organization, User):
+        return
+    refresh_daily_sales(
+        instance.organization_id, instance.order.customer_id, instance.created_at
+    )
+    if "origin" in kwargs and is_deleted_with(kwargs["origin"], Order, OrderProduct):
+        return
+    refresh_order_counters(instance.order_id)
+
+
 # @receiver(post_save, sender=OrderDelivery)
 # def save_an_paid_order_to_a_transaction(sender, instance: Order, created, **kwargs):
 #     if (
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+
+class OrderDeliveryStatusLogMigrationTest(TransactionTestCase):
+    """Test the legacy delivery stages are turned into the status log"""
+
+    migrate_from = [
+        ("orderio", "0010_order_counters"),
+        ("notificationio", "0008_notification_retention"),
+    ]
+    migrate_to = [("orderio", "0011_orderdelivery_status_log")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        # the other tests run against the latest schema
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_reached_statuses_keep_their_time(self):
+        apps = self.migrate(self.migrate_from)
+        User = apps.get_model("core", "User")
+        Organization = apps.get_model("accountio", "Organization")
+        PaymentMethod = apps.get_model("paymentio", "PaymentMethod")
+        Order = apps.get_model("orderio", "Order")
+        OrderDelivery = apps.get_model("orderio", "OrderDelivery")
+
+        customer = User.objects.create(phone="+8801722222277")
+        order = Order.objects.create(
+            serial_number=1,
+            customer=customer,
+            order_by=customer,
+            organization=Organization.objects.create(name="Legacy", domain="legacy"),
+            payment_method=PaymentMethod.objects.create(name="Cash"),
+            address={},
+        )
+
+        # every row was created with the order and updated when it was reached
+        placed_at = timezone.now() - timedelta(days=2)
+        stages = [
+            ("ORDER_PLACED", "COMPLETED", placed_at),
+            ("ACCEPTED", "COMPLETED", placed_at + timedelta(hours=1)),
+            ("PROCESSING", "CURRENT", placed_at + timedelta(hours=5)),
+            ("PACKAGING", "PENDING", placed_at),
+            ("COMPLETED", "PENDING", placed_at),
+        ]
+        for status, stage, updated_at in stages:
+            delivery = OrderDelivery.objects.create(
+                order=order, status=status, stage=stage
+            )
+            OrderDelivery.objects.filter(id=delivery.id).update(
+                created_at=placed_at, updated_at=updated_at
+            )
+
+        apps = self.migrate(self.migrate_to)
+        OrderDelivery = apps.get_model("orderio", "OrderDelivery")
+
+        deliveries = OrderDelivery.objects.filter(order_id=order.id).order_by(
+            "created_at"
+        )
+        self.assertEqual(
+            [
+                (delivery.status, delivery.previous_status, delivery.created_at)
+                for delivery in deliveries
+            ],
+            [
+                ("ORDER_PLACED", "", stages[0][2]),
+                ("ACCEPTED", "ORDER_PLACED", stages[1][2]),
+                ("PROCESSING", "ACCEPTED", stages[2][2]),
+            ],
+        )
@@ -1 +1,136 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
 
+from orderio.models import (
+    CustomerDailySales,
+    Order,
+    OrderProduct,
+    OrganizationDailySales,
+    ReturnOrderProduct,
+)
+
+
+def refresh_daily_sales(organization_id, customer_id, created_at):
+    """Refresh the organization and customer sales rows of the day of `created_at`."""
+    day = timezone.localdate(created_at)
+    OrganizationDailySales.objects.refresh(day, organization_id=organization_id)
+    CustomerDailySales.objects.refresh(
+        day, organization_id=organization_id, customer_id=customer_id
+    )
+
+
+def refresh_order_counters(order_id):
+    """Recount the lines and returned quantity of an order with one UPDATE."""
+    Order.objects.filter(pk=order_id).update(
+        total_products=Coalesce(
+            Subquery(
+                OrderProduct.objects.filter(order=OuterRef("pk"))
+                .order_by()
+                .values("order")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        ),
+        returned_total_quantity=Coalesce(
+            Subquery(
+                ReturnOrderProduct.objects.filter(order=OuterRef("pk"))
+                .order_by()
+                .values("order")
+                .annotate(quantity=Sum("returned_quantity"))
+                .values("quantity")
+            ),
+            0,
+        ),
+    )
+
+
+def _created_between(queryset, field, start, end):
+    if start:
+        queryset = queryset.filter(**{f"{field}__date__gte": start})
+    if end:
+        queryset = queryset.filter(**{f"{field}__date__lte": end})
+    return queryset
+
+
+def rebuild_daily_sales(organization_id, start=None, end=None) -> int:
+    """Replace the sales rows of an organization between `start` and `end`.
+
+    Three grouped queries (orders, order lines, returns) are folded into the
+    customer rows, the organization rows are their sums. Returns the number of
+    customer rows written.
+    """
+    customer_rows = {}
+
+    def row(customer_id, day):
+        key = (customer_id, day)
+        if key not in customer_rows:
+            customer_rows[key] = CustomerDailySales(
+                organization_id=organization_id, customer_id=customer_id, date=day
+            )
+        return customer_rows[key]
+
+    orders = _created_between(
+        Order.objects.filter(organization_id=organization_id), "created_at", start, end
+    )
+    for totals in (
+        orders.values("customer_id", day=TruncDate("created_at"))
+        .order_by()
+        .annotate(order_count=Count("id"), net=Sum("total_price", default=0))
+    ):
+        daily_sales = row(totals["customer_id"], totals["day"])
+        daily_sales.order_count = totals["order_count"]
+        daily_sales.net = totals["net"]
+
+    for totals in (
+        OrderProduct.objects.filter(order__in=orders)
+        .values(customer_id=F("order__customer_id"), day=TruncDate("order__created_at"))
+        .order_by()
+        .annotate(gross=Sum(F("selling_price") * F("quantity"), default=0))
+    ):
+        row(totals["customer_id"], totals["day"]).gross = totals["gross"]
+
+    returns = _created_between(
+        ReturnOrderProduct.objects.filter(organization_id=organization_id),
+        "created_at",
+        start,
+        end,
+    )
+    for totals in (
+        returns.values(customer_id=F("order__customer_id"), day=TruncDate("created_at"))
+        .order_by()
+        .annotate(returned_quantity=Sum("returned_quantity", default=0))
+    ):
+        daily_sales = row(totals["customer_id"], totals["day"])
+        daily_sales.returned_quantity = totals["returned_quantity"]
+
+    organization_rows = {}
+    for daily_sales in customer_rows.values():
+        if daily_sales.date not in organization_rows:
+            organization_rows[daily_sales.date] = OrganizationDailySales(
+                organization_id=organization_id, date=daily_sales.date
+            )
+        organization_row = organization_rows[daily_sales.date]
+        for field in ("order_count", "gross", "net", "returned_quantity"):
+            setattr(
+                organization_row,
+                field,
+                getattr(organization_row, field) + getattr(daily_sales, field),
+            )
+
+    with transaction.atomic():
+        for model in (CustomerDailySales, OrganizationDailySales):
+            rows = model.objects.filter(organization_id=organization_id)
+            if start:
+                rows = rows.filter(date__gte=start)
+            if end:
+                rows = rows.filter(date__lte=end)
+            rows.delete()
+        CustomerDailySales.objects.bulk_create(customer_rows.values(), batch_size=1000)
+        OrganizationDailySales.objects.bulk_create(
+            organization_rows.values(), batch_size=1000
+        )
+
+    return len(customer_rows)
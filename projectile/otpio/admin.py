@@ -1,5 +1,13 @@
 from django.contrib import admin
 
-from .models import UserPhoneOTP
+from .models import OutboundSMS, UserPhoneOTP
 
 admin.site.register(UserPhoneOTP)
+
+
+@admin.register(OutboundSMS)
+class OutboundSMSAdmin(admin.ModelAdmin):
+    model = OutboundSMS
+    list_display = ["uid", "recipient", "status", "attempts", "sent_at", "created_at"]
+    list_filter = ["status"]
+    search_fields = ["recipient"]
@@ -4,3 +4,10 @@ from django.db import models
 class UserPhoneOTPStatus(models.TextChoices):
     PENDING = "PENDING", "Pending"
     CONSUMED = "CONSUMED", "Consumed"
+
+
+class OutboundSMSStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    SENDING = "SENDING", "Sending"
+    SENT = "SENT", "Sent"
+    FAILED = "FAILED", "Failed"
@@ -0,0 +1,62 @@
+import time
+import uuid
+
+from django.core.management import BaseCommand
+
+from core.models import User
+from otpio.models import UserPhoneOTP
+from otpio.utils.otp import OTP
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how many OTPs are issued and verified per second. Creates throwaway "
+        "users and OTPs and deletes them afterwards, no SMS is sent"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument(
+            "--otps", type=int, default=20, help="OTPs issued to every user"
+        )
+
+    def handle(self, *args, **options):
+        prefix = uuid.uuid4().int % 10**6
+        users = [
+            User.objects.create(phone=f"+88019{prefix:06d}{index:04d}")
+            for index in range(options["users"])
+        ]
+        try:
+            otp = OTP()
+            issued = []
+            started_at = time.monotonic()
+            for _ in range(options["otps"]):
+                for user in users:
+                    issued.append(
+                        UserPhoneOTP.objects.create(user=user, otp=otp.generate_otp())
+                    )
+            issue_elapsed = time.monotonic() - started_at
+
+            # the last OTP of every user is the one which is verified
+            last = {user_otp.user_id: user_otp for user_otp in issued}
+            verified = 0
+            started_at = time.monotonic()
+            for user_otp in last.values():
+                found = UserPhoneOTP.objects.get_latest(
+                    user_otp.otp, user_id=user_otp.user_id
+                )
+                if found and not found.is_expired():
+                    found.save_if_status_is_consumed()
+                    verified += 1
+            verify_elapsed = time.monotonic() - started_at
+
+            self.stdout.write(
+                f"issued {len(issued)} OTPs in {issue_elapsed:.2f}s "
+                f"({len(issued) / issue_elapsed:.0f}/s)"
+            )
+            self.stdout.write(
+                f"verified {verified}/{len(last)} OTPs in {verify_elapsed:.2f}s "
+                f"({len(last) / verify_elapsed:.0f}/s)"
+            )
+        finally:
+            User.objects.filter(id__in=[user.id for user in users]).delete()
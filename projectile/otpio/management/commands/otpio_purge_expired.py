@@ -0,0 +1,58 @@
+import datetime
+import time
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from otpio.models import UserPhoneOTP
+
+
+class Command(BaseCommand):
+    help = "Delete the expired user phone OTPs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=60 * 60,
+            help="Keep the OTPs for this many seconds after they expired",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="OTPs deleted per query",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and purge every --interval",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60 * 10,
+            help="Seconds to wait between two runs of --loop",
+        )
+
+    def purge(self, before, batch_size) -> int:
+        purged = 0
+        while True:
+            ids = list(
+                UserPhoneOTP.objects.purgeable(before).values_list("id", flat=True)[
+                    :batch_size
+                ]
+            )
+            if not ids:
+                return purged
+            purged += UserPhoneOTP.objects.filter(id__in=ids).delete()[0]
+
+    def handle(self, *args, **options):
+        while True:
+            before = timezone.now() - datetime.timedelta(seconds=options["grace"])
+            purged = self.purge(before, options["batch_size"])
+            if purged or not options["loop"]:
+                self.stdout.write(f"Purged {purged} expired OTPs")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
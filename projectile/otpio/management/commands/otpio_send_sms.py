@@ -0,0 +1,60 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connection
+
+from weapi.rest.utils.sms import dispatch_pending, get_sms_provider
+
+
+class Command(BaseCommand):
+    help = "Send the queued SMS in batches, failed ones are retried with a backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=1, help="Threads sending batches"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SMS_BATCH_SIZE,
+            help="Messages sent with one provider call",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the queue every --interval when it is empty",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait when the queue is empty with --loop",
+        )
+
+    def work(self, options, counts, index):
+        provider = get_sms_provider()
+        try:
+            while True:
+                count = dispatch_pending(options["batch_size"], provider)
+                counts[index] += count
+                if count:
+                    continue
+                if not options["loop"]:
+                    return
+                time.sleep(options["interval"])
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        counts = [0] * options["workers"]
+        threads = [
+            threading.Thread(target=self.work, args=(options, counts, index))
+            for index in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stdout.write(f"Dispatched {sum(counts)} SMS")
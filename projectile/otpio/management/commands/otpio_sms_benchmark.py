@@ -0,0 +1,88 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from otpio.choices import OutboundSMSStatus
+from otpio.models import OutboundSMS
+from weapi.rest.utils.sms import SMS, FakeSMSProvider, dispatch_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue SMS and send them through the fake provider, once one by one and "
+        "once in batches, and print the rates. Only the queued rows are sent, they "
+        "are deleted afterwards. Runs only with the fake SMS_PROVIDER"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Seconds the fake provider takes per call",
+        )
+
+    def enqueue(self, count, ids):
+        # appended one by one, so a failed run still deletes what it queued
+        prefix = uuid.uuid4().int % 10**4
+        started_at = time.monotonic()
+        queued = []
+        for index in range(count):
+            message = SMS.enqueue_otp(f"88019{prefix:04d}{index:04d}", f"{index:06d}")
+            ids.append(message.id)
+            queued.append(message.id)
+        return queued, time.monotonic() - started_at
+
+    def drain(self, ids, workers, batch_size, provider):
+        def work():
+            try:
+                while dispatch_pending(batch_size, provider, ids=ids):
+                    pass
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work) for _ in range(workers)]
+        started_at = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started_at
+
+    def handle(self, *args, **options):
+        # a worker of the real provider could claim the benchmark rows meanwhile
+        if not issubclass(import_string(settings.SMS_PROVIDER), FakeSMSProvider):
+            raise CommandError("SMS_PROVIDER must be the FakeSMSProvider")
+        if options["messages"] > 10**4:
+            raise CommandError("--messages must be at most 10000")
+
+        provider = FakeSMSProvider()
+        provider.latency = options["latency"]
+        messages = options["messages"]
+        ids = []
+        try:
+            for label, workers, batch_size in (
+                ("one by one", 1, 1),
+                ("batched", options["workers"], options["batch_size"]),
+            ):
+                queued, enqueue_elapsed = self.enqueue(messages, ids)
+                elapsed = self.drain(queued, workers, batch_size, provider)
+                sent = OutboundSMS.objects.filter(
+                    id__in=queued, status=OutboundSMSStatus.SENT
+                ).count()
+                self.stdout.write(
+                    f"{label}: queued {messages} in {enqueue_elapsed:.2f}s "
+                    f"({messages / enqueue_elapsed:.0f}/s), sent {sent} in "
+                    f"{elapsed:.2f}s ({sent / elapsed:.0f}/s) with {workers} workers "
+                    f"and batches of {batch_size}"
+                )
+        finally:
+            OutboundSMS.objects.filter(id__in=ids).delete()
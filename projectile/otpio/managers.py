@@ -0,0 +1,20 @@
+from django.db import models
+from django.utils import timezone
+
+
+class UserPhoneOTPQuerySet(models.QuerySet):
+    def get_latest(self, otp, **filters):
+        """The newest unconsumed row of `otp` matching `filters`, or None.
+
+        Codes are not unique, an old row can hold the same digits, so only the newest
+        one of a user is the one which was sent last.
+        """
+        return (
+            self.filter(otp=otp, is_consumed=False, **filters)
+            .order_by("-expired_at")
+            .first()
+        )
+
+    def purgeable(self, before=None):
+        """Rows expired before `before`, default now."""
+        return self.filter(expired_at__lt=before or timezone.now())
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.4 on 2026-10-17 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("otpio", "0002_remove_userphoneotp_status_userphoneotp_is_consumed_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="userphoneotp",
+            name="expired_at",
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="userphoneotp",
+            name="otp",
+            field=models.CharField(max_length=6),
+        ),
+        migrations.AddIndex(
+            model_name="userphoneotp",
+            index=models.Index(
+                fields=["user", "otp"], name="otpio_userp_user_id_7e9024_idx"
+            ),
+        ),
+    ]
@@ -8,14 +8,24 @@ from django.utils import timezone
 from dirtyfields import DirtyFieldsMixin
 from rest_framework.exceptions import ValidationError
 
+from core.utils import BaseModelwithUID
+
+from .choices import OutboundSMSStatus
+from .managers import UserPhoneOTPQuerySet
+
 User = get_user_model()
 
 
 class UserPhoneOTP(DirtyFieldsMixin, models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    otp = models.CharField(max_length=6, unique=True)
+    otp = models.CharField(max_length=6)
     is_consumed = models.BooleanField(default=False)
-    expired_at = models.DateTimeField()
+    expired_at = models.DateTimeField(db_index=True)
+
+    objects = UserPhoneOTPQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "otp"])]
 
     def __str__(self):
         return f"User: {self.user.phone}, Otp: {self.otp}"
@@ -52,7 +62,7 @@ class UserPhoneOTP(DirtyFieldsMixin, models.Model):
                 from otpio.utils.otp import OTP
 
                 otp = OTP()
-                self.otp = otp.generate_unique_otp()
+                self.otp = otp.generate_otp()
             # if self.has_previous_request():
             #     raise ValidationError(
             #         {
@@ -61,3 +71,29 @@ class UserPhoneOTP(DirtyFieldsMixin, models.Model):
             #     )
 
         super().save(*args, **kwargs)
+
+
+class OutboundSMS(BaseModelwithUID):
+    """An SMS waiting in the outbound queue and its delivery status.
+
+    Requests only create the row, `weapi.rest.utils.sms.dispatch_pending` sends them
+    in batches and retries the failed ones with a backoff.
+    """
+
+    recipient = models.CharField(max_length=20)
+    text = models.TextField()
+    status = models.CharField(
+        max_length=20,
+        choices=OutboundSMSStatus.choices,
+        default=OutboundSMSStatus.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"Recipient: {self.recipient}, Status: {self.status}"
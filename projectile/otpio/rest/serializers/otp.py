@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from phonenumber_field.serializerfields import PhoneNumberField
 
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import get_object_or_404
 
 from core.utils import create_token
@@ -37,32 +37,44 @@ class CreateOTPSerializer(serializers.Serializer):
     def create(self, validated_data):
         user = self.context["request"].user
         otp = OTP()
-        user_otp = otp.generate_unique_otp()
+        user_otp = otp.generate_otp()
         UserPhoneOTP.objects.create(user=user, otp=user_otp)
         return validated_data
 
 
 class VerifyOTPSerializer(serializers.Serializer):
+    phone = PhoneNumberField()
     otp = serializers.CharField()
 
     def create(self, validated_data):
-        user_phone_otp = get_object_or_404(
-            UserPhoneOTP.objects.filter(), otp=validated_data.get("otp")
+        # codes are not unique, the code is only looked up for the user of the phone
+        user = get_object_or_404(
+            User.objects.filter(), phone=validated_data.get("phone")
         )
+        user_phone_otp = UserPhoneOTP.objects.get_latest(
+            validated_data.get("otp"), user=user
+        )
+        if user_phone_otp is None:
+            raise NotFound()
         if not user_phone_otp.is_expired():
-            user_phone_otp.is_status_consumed()
+            user_phone_otp.save_if_status_is_consumed()
             return validated_data
         else:
             raise ValidationError("OTP Expired.")
 
 
 class VerifyOTPWithTokenSerializer(serializers.Serializer):
+    phone = PhoneNumberField(write_only=True)
     otp = serializers.CharField(write_only=True)
 
-    def validate_otp(self, value):
-        user_phone_otp = get_object_or_404(UserPhoneOTP.objects.filter(), otp=value)
+    def validate(self, attrs):
+        # codes are not unique, the code is only looked up for the user of the phone
+        user = get_object_or_404(User.objects.filter(), phone=attrs.get("phone"))
+        user_phone_otp = UserPhoneOTP.objects.get_latest(attrs.get("otp"), user=user)
+        if user_phone_otp is None:
+            raise ValidationError({"otp": "Invalid otp"})
         if not user_phone_otp.is_expired():
-            user_phone_otp.is_status_consumed()
+            user_phone_otp.save_if_status_is_consumed()
             access_token, refresh_token = create_token(user_phone_otp.user)
             return {"access": access_token, "refresh": refresh_token}
         else:
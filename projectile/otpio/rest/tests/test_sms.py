@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from otpio.choices import OutboundSMSStatus
+from otpio.models import OutboundSMS, UserPhoneOTP
+from otpio.rest.serializers.otp import VerifyOTPWithTokenSerializer
+from weapi.rest.utils.sms import FakeSMSProvider, dispatch_pending
+
+from .urlhelpers import resend_otp_url
+
+User = get_user_model()
+
+
+@override_settings(
+    SMS_PROVIDER="weapi.rest.utils.sms.FakeSMSProvider", SMS_MAX_ATTEMPTS=2
+)
+class PublicSendOTPTestCase(APITestCase):
+    """Public Test Case for the queued OTP sms"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(phone="+8801722222299")
+        FakeSMSProvider.outbox = []
+
+    def tearDown(self):
+        FakeSMSProvider.fail = False
+
+    def test_send_otp_is_queued(self):
+        # Test send otp queues the sms and the worker sends it
+
+        response = self.client.post(resend_otp_url(), {"phone": "+8801722222299"})
+
+        # Assert that the response is correct
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        sms = OutboundSMS.objects.get()
+        self.assertEqual(sms.status, OutboundSMSStatus.PENDING)
+        self.assertEqual(FakeSMSProvider.outbox, [])
+
+        self.assertEqual(dispatch_pending(), 1)
+
+        sms.refresh_from_db()
+        self.assertEqual(sms.status, OutboundSMSStatus.SENT)
+        self.assertEqual(FakeSMSProvider.outbox[0]["recipients"], ["8801722222299"])
+        self.assertIn(
+            UserPhoneOTP.objects.get(user=self.user).otp,
+            FakeSMSProvider.outbox[0]["text"],
+        )
+
+    def test_send_otp_retry(self):
+        # Test a failed sms is retried after a backoff and then given up
+
+        self.client.post(resend_otp_url(), {"phone": "+8801722222299"})
+        FakeSMSProvider.fail = True
+
+        dispatch_pending()
+
+        sms = OutboundSMS.objects.get()
+        self.assertEqual(sms.status, OutboundSMSStatus.PENDING)
+        self.assertEqual(sms.attempts, 1)
+        self.assertGreater(sms.next_attempt_at, timezone.now())
+
+        # not due yet
+        self.assertEqual(dispatch_pending(), 0)
+
+        OutboundSMS.objects.update(next_attempt_at=timezone.now())
+        dispatch_pending()
+
+        sms.refresh_from_db()
+        self.assertEqual(sms.status, OutboundSMSStatus.FAILED)
+        self.assertEqual(sms.attempts, 2)
+
+    def test_verify_otp_is_scoped_to_the_phone(self):
+        # Test a code shared by two users only gives tokens to the user of the phone
+
+        other = User.objects.create(phone="+8801722222298")
+        UserPhoneOTP.objects.create(user=self.user, otp="123456")
+        UserPhoneOTP.objects.create(user=other, otp="123456")
+
+        serializer = VerifyOTPWithTokenSerializer(
+            data={"phone": "+8801722222299", "otp": "123456"}
+        )
+
+        self.assertTrue(serializer.is_valid())
+        self.assertTrue(UserPhoneOTP.objects.get(user=self.user).is_consumed)
+        self.assertFalse(UserPhoneOTP.objects.get(user=other).is_consumed)
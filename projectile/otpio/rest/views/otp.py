@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 
 from rest_framework import status
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, NotFound
 from rest_framework.generics import get_object_or_404, CreateAPIView, UpdateAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -20,12 +20,13 @@ User = get_user_model()
 
 class VerifyUserOTP(APIView):
     def put(self, request):
-        user_phone_otp = get_object_or_404(
-            UserPhoneOTP.objects.filter(), otp=request.data["otp"]
-        )
+        # codes are not unique, the code is only looked up for the user of the phone
+        user = get_object_or_404(User.objects.filter(), phone=request.data["phone"])
+        user_phone_otp = UserPhoneOTP.objects.get_latest(request.data["otp"], user=user)
+        if user_phone_otp is None:
+            raise NotFound()
         if not user_phone_otp.is_expired():
-            user_phone_otp.is_status_consumed()
-            user_phone_otp.save()
+            user_phone_otp.save_if_status_is_consumed()
             access_token, refresh_token = create_token(user_phone_otp.user)
             return Response(
                 {"access": access_token, "refresh": refresh_token},
@@ -1,7 +1,9 @@
-import random
+import secrets
+import string
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 from rest_framework.generics import get_object_or_404
 
@@ -13,31 +15,24 @@ User = get_user_model()
 
 
 class OTP:
-    def generate_unique_otp(self, length=settings.OTP_CHARACTER_LENGTH) -> str:
-        otp = "".join(random.choices("0123456789", k=length))
-        unique_otp = self.check_otp_unique(otp)
-        return unique_otp
-
-    def check_otp_unique(self, otp: str):
-        exists = UserPhoneOTP.objects.filter(otp=otp).exists()
-        if exists:
-            otp = self.generate_unique_otp()
-        return otp
+    def generate_otp(self, length=settings.OTP_CHARACTER_LENGTH) -> str:
+        """Random digits, they are checked together with the user so need not be unique."""
+        return "".join(secrets.choice(string.digits) for _ in range(length))
 
     def save_otp_and_send_sms(
         self, phone: str, user: User = None, otp: str = None
     ) -> (UserPhoneOTP, bool):
         if otp is None:
-            otp = self.generate_unique_otp()
+            otp = self.generate_otp()
 
         if user is None:
             user = get_object_or_404(User.objects.filter(), phone=phone)
 
-        user_otp = UserPhoneOTP.objects.create(user=user, otp=otp, is_consumed=False)
-
-        sms = SMS()
-        response_sms = sms.send_otp_to_one(recipient=phone, otp=otp)
-        if not response_sms:
-            user_otp.delete()
+        # the sms is sent by the `otpio_send_sms` worker, the request only queues it
+        with transaction.atomic():
+            user_otp = UserPhoneOTP.objects.create(
+                user=user, otp=otp, is_consumed=False
+            )
+            SMS.enqueue_otp(recipient=str(phone), otp=otp)
 
-        return user_otp, response_sms
+        return user_otp, True
@@ -16,6 +16,8 @@ STATIC_DIR = os.path.realpath(os.path.join(HOME_DIR, "staticfiles"))
 # The directory where different applications uploads media files to
 # This can/should be located at ~/media, preferrably outside the git repo
 MEDIA_DIR = os.path.realpath(os.path.join(HOME_DIR, "media"))
+# The directory where old rows are archived to, outside the git repo and not served
+ARCHIVE_DIR = os.path.realpath(os.path.join(HOME_DIR, "archives"))
 
 
 # Static files (CSS, JavaScript, Images)
@@ -97,6 +99,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "axes.middleware.AxesMiddleware",
     "simple_history.middleware.HistoryRequestMiddleware",
+    "accountio.middleware.OrganizationContextMiddleware",
 ]
 
 
@@ -257,6 +260,30 @@ AXES_ENABLED = False
 OTP_EXPIRATION_TIME_SEC = 120
 OTP_CHARACTER_LENGTH = 6
 
+# sms, see weapi.rest.utils.sms
+SMS_PROVIDER = "weapi.rest.utils.sms.InfobipSMSProvider"
+SMS_BATCH_SIZE = 50
+SMS_MAX_ATTEMPTS = 5
+SMS_RETRY_BACKOFF_SEC = 30
+SMS_RETRY_BACKOFF_MAX_SEC = 60 * 30
+SMS_SENDING_TIMEOUT_SEC = 60 * 5
+
+# notifications, see notificationio.services.process_notification_events
+# eager processes the events in the request process right after the commit
+NOTIFICATIONS_EAGER = False
+NOTIFICATION_EVENT_BATCH_SIZE = 100
+NOTIFICATION_EVENT_MAX_ATTEMPTS = 3
+NOTIFICATION_EVENT_PROCESSING_TIMEOUT_SEC = 60 * 5
+
+# notification retention, see notificationio.retention
+# read notifications of organizations without a policy are kept this many days
+NOTIFICATION_RETENTION_DAYS = 180
+NOTIFICATION_ARCHIVE_DIR = os.path.join(ARCHIVE_DIR, "notifications")
+NOTIFICATION_ARCHIVE_BATCH_SIZE = 500
+
+# stock held for a checked out cart
+STOCK_RESERVATION_TIMEOUT_SEC = 60 * 15
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -3,6 +3,7 @@ from typing import List
 from redis_om import JsonModel, Field
 
 from redisio.pydantic.images import ImagePy
+from redisio.services import redis_connection
 
 
 class BaseProductPy(JsonModel):
@@ -19,3 +20,6 @@ class BaseProductPy(JsonModel):
     medicine_physical_state: str = Field(index=False)
     image = ImagePy
     mrp: str
+
+    class Meta:
+        database = redis_connection
@@ -18,22 +18,27 @@ class TagsPy(EmbeddedJsonModel):
 class ProductPy(JsonModel):
     slug: str = Field(index=False)
     uid: str = Field(index=False)
-    name: str = Field(index=True, full_text_search=True)
-    stock: int = Field(index=False)
-    unit: str = Field(index=False)
-    strength: str = Field(index=False)
+    organization: str = Field(index=True)
+    name: str = Field(index=True, full_text_search=True, sortable=True)
+    stock: int = Field(index=True)
+    unit: str = Field(index=True, full_text_search=True)
+    strength: str = Field(index=True, full_text_search=True)
     buying_price: str = Field(index=False)
     selling_price: str = Field(index=False)
     fraction_mrp: int = Field(index=False)
     discount_price: str = Field(index=False)
     final_price: str = Field(index=False)
-    status: str = Field(index=False)
-    manufacturer: str = Field(index=False)
-    brand: str = Field(index=False)
-    dosage_form: str = Field(index=False)
-    description: str = Field(index=False)
-    category: str = Field(index=False)
-    active_ingredients: List[str] = Field(index=False)
+    status: str = Field(index=True)
+    manufacturer: str = Field(index=True, full_text_search=True)
+    manufacturer_slug: str = Field(index=True)
+    brand: str = Field(index=True, full_text_search=True)
+    dosage_form: str = Field(index=True, full_text_search=True)
+    dosage_form_slug: str = Field(index=True)
+    description: str = Field(index=True, full_text_search=True)
+    category: str = Field(index=True, full_text_search=True)
+    category_slug: str = Field(index=True)
+    active_ingredients: List[str] = Field(index=True)
+    ingredient_slugs: List[str] = Field(index=True)
     primary_image = ImagePy
     total_images: List[ImageThroughPy] = ImageThroughPy
     tags: List[TagsPy] = TagsPy
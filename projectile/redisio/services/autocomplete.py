@@ -0,0 +1,92 @@
+import re
+
+from redisio.services import redis_connection
+
+AUTOCOMPLETE_KEY = "redisio:autocomplete:base_products"
+AUTOCOMPLETE_MEMBERS_KEY = "redisio:autocomplete:base_products:members"
+
+# member layout: "<normalized name strength>\x00<uid>\x00<name>\x00<strength>\x00<unit>"
+SEPARATOR = "\x00"
+
+_non_word_re = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(_non_word_re.sub(" ", text.lower()).split())
+
+
+class BaseProductAutocomplete:
+    """Typeahead over base products names kept in a lexicographic sorted set.
+
+    Every member starts with the normalized `name strength` and carries the payload
+    the picker needs, so a suggestion is a single ZRANGEBYLEX. The uid -> member hash
+    lets a changed base product replace its old member.
+    """
+
+    def __init__(self, connection=None):
+        self._redis_connection = connection or redis_connection
+
+    @staticmethod
+    def build_member(uid, name, strength, unit) -> str:
+        return SEPARATOR.join(
+            [normalize(f"{name} {strength}"), str(uid), name, strength, unit]
+        )
+
+    @staticmethod
+    def parse_member(member: str) -> dict:
+        _, uid, name, strength, unit = member.split(SEPARATOR)
+        return {"uid": uid, "name": name, "strength": strength, "unit": unit}
+
+    def get_members(self, uids) -> list:
+        uids = [str(uid) for uid in uids]
+        if not uids:
+            return []
+        return self._redis_connection.hmget(AUTOCOMPLETE_MEMBERS_KEY, uids)
+
+    def add(self, pipeline, base_products, previous_members=()):
+        """Queue `base_products` on `pipeline`, replacing their `previous_members`."""
+        stale = [member for member in previous_members if member]
+        if stale:
+            pipeline.zrem(AUTOCOMPLETE_KEY, *stale)
+
+        members = {
+            str(base_product.uid): self.build_member(
+                base_product.uid,
+                base_product.name,
+                base_product.strength,
+                base_product.unit,
+            )
+            for base_product in base_products
+        }
+        if members:
+            pipeline.zadd(AUTOCOMPLETE_KEY, dict.fromkeys(members.values(), 0))
+            pipeline.hset(AUTOCOMPLETE_MEMBERS_KEY, mapping=members)
+
+    def remove(self, pipeline, uids, previous_members):
+        stale = [member for member in previous_members if member]
+        if stale:
+            pipeline.zrem(AUTOCOMPLETE_KEY, *stale)
+        if uids:
+            pipeline.hdel(AUTOCOMPLETE_MEMBERS_KEY, *[str(uid) for uid in uids])
+
+    def index(self, base_products):
+        base_products = list(base_products)
+        pipeline = self._redis_connection.pipeline(transaction=False)
+        self.add(
+            pipeline,
+            base_products,
+            self.get_members([base_product.uid for base_product in base_products]),
+        )
+        pipeline.execute()
+
+    def suggest(self, prefix: str, limit=10) -> list:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        # compared as utf-8 bytes, \xff is above every byte of an encoded character
+        prefix = prefix.encode()
+        members = self._redis_connection.zrangebylex(
+            AUTOCOMPLETE_KEY, b"[" + prefix, b"[" + prefix + b"\xff", start=0, num=limit
+        )
+        return [self.parse_member(member) for member in members]
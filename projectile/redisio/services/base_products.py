@@ -1,36 +1,208 @@
-from collections import deque
+import json
+import logging
+import time
+
+from redis.commands.search.query import Query
 
 from redis_om import Migrator
+from redis_om.model.token_escaper import TokenEscaper
 
 from rest_framework.exceptions import ValidationError
 
-from catalogio.models import Product, BaseProduct
+from catalogio.models import BaseProduct
 
 from redisio.pydantic.baseproducts import BaseProductPy
 from redisio.services import redis_connection
+from redisio.services.autocomplete import BaseProductAutocomplete
 
 from weapi.rest.serializers.search import PrivateBaseProductSearchSerializer
 
+logger = logging.getLogger(__name__)
+
+# img_link = "https://devapi.pharmik.co"
+# img_link = "https://testapi.pharmik.co"
+IMAGE_HOST = "http://127.0.0.1:8000"
+
+BASE_PRODUCT_INDEX_CHECKPOINT_KEY = "redisio:base_products:index:last_id"
+
+# fields the base product picker shows, everything else stays in redis
+SEARCH_RETURN_FIELDS = (
+    "uid",
+    "name",
+    "strength",
+    "unit",
+    "dosage_form",
+    "manufacturer",
+    "brand",
+    "mrp",
+    "image",
+)
+# document fields stored as json values, with their empty value
+SEARCH_JSON_FIELDS = {"image": {}, "active_ingredients": []}
+
+escaper = TokenEscaper()
+
+_index_migrated = False
+
+
+def ensure_search_index():
+    """Create the RediSearch indexes once per process instead of per service."""
+    global _index_migrated
+    if not _index_migrated:
+        Migrator().run()
+        _index_migrated = True
+
+
+def get_related_name(instance) -> str:
+    return instance.name if instance else ""
+
+
+def build_image_urls(image) -> dict:
+    if not image:
+        return {}
+
+    urls = {
+        "original": image.url,
+        "at512": image.crop["512x512"].url,
+        "at256": image.crop["256x256"].url,
+    }
+    return {
+        size: url if url.startswith("http") else f"{IMAGE_HOST}{url}"
+        for size, url in urls.items()
+    }
+
+
+def build_base_product_document(base_product: BaseProduct) -> dict:
+    """Build the redis json document straight from the model instance.
+
+    Expects the related objects to be loaded already (see `base_product_index_queryset`),
+    the document keeps the `BaseProductPy` shape and uses the uid as primary key so
+    re-indexing overwrites the old document.
+    """
+    uid = str(base_product.uid)
+    return {
+        "pk": uid,
+        "uid": uid,
+        "name": base_product.name,
+        "description": base_product.description,
+        "active_ingredients": [
+            ingredient.name for ingredient in base_product.active_ingredients.all()
+        ],
+        "dosage_form": get_related_name(base_product.dosage_form),
+        "manufacturer": get_related_name(base_product.manufacturer),
+        "unit": base_product.unit,
+        "strength": base_product.strength,
+        "brand": get_related_name(base_product.brand),
+        "route_of_administration": get_related_name(
+            base_product.route_of_administration
+        ),
+        "medicine_physical_state": get_related_name(
+            base_product.medicine_physical_state
+        ),
+        "image": build_image_urls(base_product.image),
+        "mrp": f"{base_product.mrp:.2f}",
+    }
+
+
+def base_product_index_queryset():
+    return (
+        BaseProduct.objects.select_related(
+            "dosage_form",
+            "manufacturer",
+            "brand",
+            "route_of_administration",
+            "medicine_physical_state",
+        )
+        .prefetch_related("active_ingredients")
+        .filter(merchant_product__isnull=True)
+    )
+
+
+class BaseProductRedisIndexer:
+    """Stream base products into redis in id ordered chunks.
+
+    Every chunk costs one query for the rows, one prefetch query for the ingredients
+    and one pipeline round trip to redis. The last indexed id is stored after each
+    chunk so an interrupted run can be resumed.
+    """
+
+    def __init__(self, chunk_size=500, connection=None):
+        self.chunk_size = chunk_size
+        self._redis_connection = connection or redis_connection
+        self.autocomplete = BaseProductAutocomplete(connection=self._redis_connection)
+
+    def get_checkpoint(self) -> int:
+        return int(self._redis_connection.get(BASE_PRODUCT_INDEX_CHECKPOINT_KEY) or 0)
+
+    def reset_checkpoint(self):
+        self._redis_connection.delete(BASE_PRODUCT_INDEX_CHECKPOINT_KEY)
+
+    def iter_chunks(self, start_id=0, queryset=None):
+        queryset = queryset if queryset is not None else base_product_index_queryset()
+        last_id = start_id
+        while True:
+            chunk = list(
+                queryset.filter(id__gt=last_id).order_by("id")[: self.chunk_size]
+            )
+            if not chunk:
+                return
+            last_id = chunk[-1].id
+            yield chunk
+
+    def write_chunk(self, base_products) -> int:
+        previous_members = self.autocomplete.get_members(
+            [base_product.uid for base_product in base_products]
+        )
+        pipeline = self._redis_connection.pipeline(transaction=False)
+        self.autocomplete.add(pipeline, base_products, previous_members)
+        for base_product in base_products:
+            pipeline.json().set(
+                BaseProductPy.make_primary_key(base_product.uid),
+                ".",
+                build_base_product_document(base_product),
+            )
+        pipeline.set(BASE_PRODUCT_INDEX_CHECKPOINT_KEY, base_products[-1].id)
+        pipeline.execute()
+        return len(base_products)
+
+    def run(self, start_id=0, queryset=None, on_chunk=None) -> dict:
+        stats = {"indexed": 0, "chunks": 0, "last_id": start_id, "seconds": 0.0}
+        started_at = time.monotonic()
+
+        for chunk in self.iter_chunks(start_id=start_id, queryset=queryset):
+            stats["indexed"] += self.write_chunk(chunk)
+            stats["chunks"] += 1
+            stats["last_id"] = chunk[-1].id
+            stats["seconds"] = time.monotonic() - started_at
+            if on_chunk:
+                on_chunk(stats)
+
+        stats["seconds"] = time.monotonic() - started_at
+        logger.info(
+            "Indexed %s base products in %s chunks (%.2fs)",
+            stats["indexed"],
+            stats["chunks"],
+            stats["seconds"],
+        )
+        return stats
+
 
 class BaseProductRedisServices:
     def __init__(self):
         self._redis_connection = redis_connection
-        Migrator().run()
+        ensure_search_index()
 
     def _save_to_redis(self, serialize_data):
-        # img_link = "https://devapi.pharmik.co"
-        # img_link = "https://testapi.pharmik.co"
-        img_link = "http://127.0.0.1:8000"
-
         image = serialize_data.get("image", {})
 
         if image:
             if not image["original"].startswith("http"):
-                image["original"] = f'{img_link}{image["original"]}'
-                image["at512"] = f'{img_link}{image["at512"]}'
-                image["at256"] = f'{img_link}{image["at256"]}'
+                image["original"] = f'{IMAGE_HOST}{image["original"]}'
+                image["at512"] = f'{IMAGE_HOST}{image["at512"]}'
+                image["at256"] = f'{IMAGE_HOST}{image["at256"]}'
 
         base_product = BaseProductPy(
+            pk=str(serialize_data.get("uid", "")),
             uid=serialize_data.get("uid", ""),
             name=serialize_data.get("name", ""),
             description=serialize_data.get("description", ""),
@@ -56,18 +228,7 @@ class BaseProductRedisServices:
 
     def _get_a_base_product(self, pk=None, uid=None) -> BaseProduct:
         try:
-            product = (
-                BaseProduct.objects.select_related(
-                    "category",
-                    "manufacturer",
-                    "brand",
-                    "route_of_administration",
-                    "medicine_physical_state",
-                )
-                .prefetch_related("active_ingredients")
-                .filter(merchant_product__isnull=True)
-                .order_by("brand__name", "-strength")
-            )
+            product = base_product_index_queryset().select_related("category")
             if pk:
                 product = product.get(pk=pk)
             elif uid:
@@ -76,7 +237,7 @@ class BaseProductRedisServices:
                 raise ValueError("You have to provide product ID or UID")
             return product
 
-        except Product.DoesNotExist:
+        except BaseProduct.DoesNotExist:
             raise ValidationError({"detail": "Product cannot find in redis."})
 
     def save(self, request=None, pk=None, uid=None):
@@ -87,11 +248,45 @@ class BaseProductRedisServices:
         # save the serialize_data to redis as json
         self._save_to_redis(serialize_data)
 
-    def search_by_base_product_name(self, name: str):
-        search_products = BaseProductPy.find(BaseProductPy.name % f"{name}*")
+    def _build_search_query(self, term: str) -> str:
+        """Exact name first, then name prefix, then typo tolerant matches."""
+        tokens = [escaper.escape(token) for token in term.lower().split()]
+        clauses = [f"(@name:{{{escaper.escape(term.lower())}}}) => {{$weight: 100.0;}}"]
+
+        prefix_tokens = " ".join(tokens[:-1] + [f"{tokens[-1]}*"])
+        if len(tokens[-1]) >= 2:
+            clauses.append(f"(@name_fts:({prefix_tokens})) => {{$weight: 10.0;}}")
+        else:
+            clauses.append(f"(@name_fts:({' '.join(tokens)})) => {{$weight: 10.0;}}")
+
+        fuzzy_tokens = [f"%{token}%" for token in tokens if len(token) >= 3]
+        if fuzzy_tokens:
+            clauses.append(f"(@name_fts:({' '.join(fuzzy_tokens)}))")
+
+        return " | ".join(clauses)
+
+    def search(self, term: str, offset=0, limit=20, fields=SEARCH_RETURN_FIELDS):
+        """Ranked, paged search returning `(total, documents)`.
+
+        Only `fields` are read from the json documents, the caller is responsible
+        for bounding `limit`.
+        """
+        query = Query(self._build_search_query(term)).paging(offset, limit).dialect(2)
+        for field in fields:
+            query.return_field(f"$.{field}", as_field=field)
+
+        result = self._redis_connection.ft(BaseProductPy._meta.index_name).search(query)
 
-        response_data = deque(maxlen=search_products.count())
-        for product in search_products.all():
-            response_data.appendleft(product.dict(exclude={"pk"}))
+        documents = []
+        for doc in result.docs:
+            document = {}
+            for field in fields:
+                value = getattr(doc, field, None)
+                if field in SEARCH_JSON_FIELDS:
+                    value = json.loads(value) if value else SEARCH_JSON_FIELDS[field]
+                document[field] = value if value is not None else ""
+            documents.append(document)
+        return result.total, documents
 
-        return list(response_data)
+    def search_by_base_product_name(self, name: str, offset=0, limit=20):
+        return self.search(name, offset=offset, limit=limit)[1]
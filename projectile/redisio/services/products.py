@@ -1,77 +1,208 @@
-from django.db.models import Q, Case, When, Value, CharField
+from django.db.models import Q, Prefetch
+
+from redis.commands.search.query import Query
 
 from rest_framework.exceptions import ValidationError
 
+from catalogio.choices import ProductStatus
 from catalogio.models import Product
 
+from mediaroomio.models import MediaImageConnector
+
 from redisio.pydantic.products import ProductPy
-from redisio.serializers.products import RedisProductsSerializer
 from redisio.services import redis_connection
+from redisio.services.base_products import (
+    build_image_urls,
+    ensure_search_index,
+    escaper,
+    get_related_name,
+)
+
+from tagio.models import TagConnector
+
+
+def get_related_slug(instance) -> str:
+    return instance.slug if instance else ""
+
+
+def product_index_queryset():
+    images = MediaImageConnector.objects.select_related("image")
+    return Product.objects.select_related(
+        "base_product__category",
+        "base_product__dosage_form",
+        "base_product__manufacturer",
+        "base_product__brand",
+    ).prefetch_related(
+        "base_product__active_ingredients",
+        Prefetch("mediaimageconnector_set", queryset=images),
+        Prefetch("base_product__mediaimageconnector_set", queryset=images),
+        Prefetch(
+            "tagconnector_set", queryset=TagConnector.objects.select_related("tag")
+        ),
+    )
+
+
+def build_product_document(product: Product) -> dict:
+    """Build the `ProductPy` json document from a product of `product_index_queryset`."""
+    base_product = product.base_product
+    uid = str(product.uid)
+    image_connectors = list(product.mediaimageconnector_set.all()) + list(
+        base_product.mediaimageconnector_set.all()
+    )
+    return {
+        "pk": uid,
+        "uid": uid,
+        "organization": str(product.organization_id),
+        "slug": product.slug or "",
+        "name": base_product.name,
+        "stock": product.stock,
+        "unit": base_product.unit,
+        "strength": base_product.strength,
+        "buying_price": f"{product.buying_price:.2f}",
+        "selling_price": f"{product.selling_price:.2f}",
+        "fraction_mrp": product.fraction_mrp,
+        "discount_price": f"{product.discount_price:.2f}",
+        "final_price": f"{product.final_price:.2f}",
+        "status": product.status,
+        "manufacturer": get_related_name(base_product.manufacturer),
+        "manufacturer_slug": get_related_slug(base_product.manufacturer),
+        "brand": get_related_name(base_product.brand),
+        "dosage_form": get_related_name(base_product.dosage_form),
+        "dosage_form_slug": get_related_slug(base_product.dosage_form),
+        "description": base_product.description,
+        "category": get_related_name(base_product.category),
+        "category_slug": get_related_slug(base_product.category),
+        "active_ingredients": [
+            ingredient.name for ingredient in base_product.active_ingredients.all()
+        ],
+        "ingredient_slugs": [
+            ingredient.slug for ingredient in base_product.active_ingredients.all()
+        ],
+        "primary_image": build_image_urls(product.primary_image()),
+        "total_images": [
+            {"image": build_image_urls(connector.image.image)}
+            for connector in image_connectors
+        ],
+        "tags": [
+            {
+                "uid": str(connector.tag.uid),
+                "category": connector.tag.category,
+                "name": connector.tag.name,
+                "i18n": connector.tag.i18n,
+                "slug": connector.tag.slug,
+                "status": connector.tag.status,
+            }
+            for connector in product.tagconnector_set.all()
+        ],
+        "damage_stock": product.damage_stock,
+        "box_type": product.box_type,
+    }
+
+
+class ProductSearchResult:
+    """Lazy sequence over a redis product search for django's paginator.
+
+    `count()` reads only the number of hits, slicing fetches the uids of that
+    window and loads just those products from the database, in index order.
+    """
+
+    def __init__(self, services, queryset, **search_kwargs):
+        self._services = services
+        self._queryset = queryset
+        self._search_kwargs = search_kwargs
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count, _ = self._services.search_products(
+                offset=0, limit=0, **self._search_kwargs
+            )
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, window):
+        if not isinstance(window, slice):
+            return self[window : window + 1][0]
+
+        offset = window.start or 0
+        limit = (window.stop or self.count()) - offset
+        self._count, uids = self._services.search_products(
+            offset=offset, limit=limit, **self._search_kwargs
+        )
+        products = {
+            str(product.uid): product for product in self._queryset.filter(uid__in=uids)
+        }
+        return [products[uid] for uid in uids if uid in products]
 
 
 class ProductRedisServices:
     def __init__(self):
         self.redis_connection = redis_connection
-        Migrator().run()
-
-    def _save_to_redis(self, serialize_data):
-        product = ProductPy(
-            slug=serialize_data.get("slug", ""),
-            uid=str(serialize_data.get("uid", "")),
-            name=serialize_data.get("name", ""),
-            stock=serialize_data.get("stock", 0),
-            unit=serialize_data.get("unit", ""),
-            strength=serialize_data.get("strength", ""),
-            buying_price=str(serialize_data.get("buying_price", "")),
-            selling_price=str(serialize_data.get("selling_price", "")),
-            fraction_mrp=serialize_data.get("fraction_mrp", 0),
-            discount_price=str(serialize_data.get("discount_price", "")),
-            final_price=str(serialize_data.get("final_price", "")),
-            status=serialize_data.get("status", ""),
-            manufacturer=serialize_data.get("manufacturer", ""),
-            brand=serialize_data.get("brand", ""),
-            dosage_form=serialize_data.get("dosage_form", ""),
-            description=serialize_data.get("description", ""),
-            category=serialize_data.get("category", ""),
-            active_ingredients=serialize_data.get("active_ingredients", []),
-            primary_image=serialize_data.get("primary_image", {}),
-            total_images=serialize_data.get("total_images", []),
-            tags=serialize_data.get("tags", []),
-            damage_stock=serialize_data.get("damage_stock", 0),
-            box_type=serialize_data.get("box_type", ""),
-        )
-        product.save()
-
-    def _convert_to_serializer(self, request, instance):
-        return RedisProductsSerializer(instance, context={"request": request}).data
+        ensure_search_index()
 
     def _get_a_product(self, pk=None, slug=None, uid=None) -> Product:
         try:
-            return (
-                Product.objects.prefetch_related(
-                    "tagconnector_set", "mediaimageconnector_set"
-                )
-                .select_related("base_product")
-                .annotate(
-                    stock_status=Case(
-                        When(stock__gte=10, then=Value("In_Stock")),
-                        When(stock__gt=0, then=Value("Low")),
-                        default=Value("Out_Of_Stock"),
-                        output_field=CharField(),
-                    )
-                )
-                .get(Q(pk=pk) | Q(slug=slug) | Q(uid=uid))
-            )
+            return product_index_queryset().get(Q(pk=pk) | Q(slug=slug) | Q(uid=uid))
         except Product.DoesNotExist:
             raise ValidationError({"detail": "Product cannot find in redis."})
 
-    def save(self, request, pk=None, slug=None, uid=None):
+    def save(self, request=None, pk=None, slug=None, uid=None):
         product = self._get_a_product(pk=pk, slug=slug, uid=uid)
-        # serialize the data as dict
-        serialize_data = self._convert_to_serializer(request=request, instance=product)
+        self.redis_connection.json().set(
+            ProductPy.make_primary_key(product.uid),
+            ".",
+            build_product_document(product),
+        )
+
+    def _build_search_query(
+        self,
+        organization_id,
+        search="",
+        category="",
+        dosage_form="",
+        manufacturer="",
+        active_ingredients=(),
+    ) -> str:
+        clauses = [
+            f"@organization:{{{organization_id}}}",
+            f"-@status:{{{ProductStatus.REMOVED}}}",
+        ]
+        if category:
+            clauses.append(f"@category_slug:{{{escaper.escape(category)}}}")
+        if dosage_form:
+            clauses.append(f"@dosage_form_slug:{{{escaper.escape(dosage_form)}}}")
+        if manufacturer:
+            clauses.append(f"@manufacturer_slug:{{{escaper.escape(manufacturer)}}}")
+        if active_ingredients:
+            slugs = " | ".join(escaper.escape(slug) for slug in active_ingredients)
+            clauses.append(f"@ingredient_slugs:{{{slugs}}}")
+
+        # free text over every TEXT field: name, brand, manufacturer, category, ...
+        tokens = [escaper.escape(token) for token in search.lower().split()]
+        if tokens:
+            clauses.append(
+                "("
+                + " ".join(
+                    f"{token}*" if len(token) >= 2 else token for token in tokens
+                )
+                + ")"
+            )
+        return " ".join(clauses)
+
+    def search_products(self, organization_id, offset=0, limit=40, **filters):
+        """Return `(total, uids)` of the organization products matching `filters`."""
+        query = (
+            Query(self._build_search_query(organization_id, **filters))
+            .no_content()
+            .paging(offset, limit)
+        )
+        if not filters.get("search"):
+            query.sort_by("name_fts")
 
-        # save the serialize_data to redis as json
-        self._save_to_redis(serialize_data)
+        result = self.redis_connection.ft(ProductPy._meta.index_name).search(query)
+        return result.total, [doc.id.rsplit(":", 1)[-1] for doc in result.docs]
 
     def search_by_product_name(self, name: str):
         return ProductPy.find(ProductPy.name % f"{name}*").all()
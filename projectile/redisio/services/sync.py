@@ -0,0 +1,234 @@
+import logging
+import time
+
+from django.db import transaction
+
+from redis.exceptions import RedisError
+
+from redisio.services import redis_connection
+from redisio.services.autocomplete import BaseProductAutocomplete
+
+logger = logging.getLogger(__name__)
+
+PRODUCT = "products"
+BASE_PRODUCT = "base_products"
+
+DIRTY_KEY = "redisio:sync:dirty:{entity}"
+DELETED_KEY = "redisio:sync:deleted:{entity}"
+
+
+def _record(key, members):
+    members = [str(member) for member in members if member]
+    if not members:
+        return
+
+    def add_to_change_log():
+        try:
+            redis_connection.sadd(key, *members)
+        except RedisError:
+            # the nightly full rebuild picks them up again
+            logger.warning("Could not record %s changes for %s", len(members), key)
+
+    # only record committed rows, a rollback must not reach the index
+    transaction.on_commit(add_to_change_log)
+
+
+def mark_dirty(entity, ids):
+    """Queue database ids of `entity` to be re-indexed."""
+    _record(DIRTY_KEY.format(entity=entity), ids)
+
+
+def mark_deleted(entity, uids):
+    """Queue uids of `entity` whose redis documents have to be removed."""
+    _record(DELETED_KEY.format(entity=entity), uids)
+
+
+class SearchIndexSyncService:
+    """Drain the change log written by `mark_dirty`/`mark_deleted` into redis.
+
+    Each batch pops at most `batch_size` ids per set, loads them with one chunk query
+    and writes them back with a single pipeline. Ids of a failed batch are put back
+    into the change log.
+    """
+
+    def __init__(self, batch_size=500, connection=None):
+        self.batch_size = batch_size
+        self._redis_connection = connection or redis_connection
+        self.autocomplete = BaseProductAutocomplete(connection=self._redis_connection)
+
+    def pending(self) -> dict:
+        pipeline = self._redis_connection.pipeline(transaction=False)
+        for entity in (PRODUCT, BASE_PRODUCT):
+            pipeline.scard(DIRTY_KEY.format(entity=entity))
+            pipeline.scard(DELETED_KEY.format(entity=entity))
+        (
+            dirty_products,
+            deleted_products,
+            dirty_base_products,
+            deleted_base_products,
+        ) = pipeline.execute()
+        return {
+            "products": dirty_products,
+            "deleted_products": deleted_products,
+            "base_products": dirty_base_products,
+            "deleted_base_products": deleted_base_products,
+        }
+
+    def enqueue_all(self, entity, chunk_size=5000) -> int:
+        """Put every row of `entity` into the change log, e.g. after a schema change."""
+        from catalogio.models import BaseProduct, Product
+
+        model = Product if entity == PRODUCT else BaseProduct
+        ids = model.objects.order_by("id").values_list("id", flat=True)
+
+        total, last_id = 0, 0
+        while True:
+            chunk = list(ids.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                return total
+            self._redis_connection.sadd(DIRTY_KEY.format(entity=entity), *chunk)
+            total += len(chunk)
+            last_id = chunk[-1]
+
+    def _pop(self, key) -> list:
+        return self._redis_connection.spop(key, self.batch_size) or []
+
+    def _restore(self, key, members):
+        if members:
+            self._redis_connection.sadd(key, *members)
+
+    def _sync_base_products(self, pipeline, ids) -> int:
+        from catalogio.models import BaseProduct, Product
+
+        from redisio.pydantic.baseproducts import BaseProductPy
+        from redisio.services.base_products import (
+            base_product_index_queryset,
+            build_base_product_document,
+        )
+
+        base_products = list(base_product_index_queryset().filter(id__in=ids))
+        for base_product in base_products:
+            pipeline.json().set(
+                BaseProductPy.make_primary_key(base_product.uid),
+                ".",
+                build_base_product_document(base_product),
+            )
+        self.autocomplete.add(
+            pipeline,
+            base_products,
+            self.autocomplete.get_members(
+                [base_product.uid for base_product in base_products]
+            ),
+        )
+
+        # merchant owned base products are not part of the suggestion index
+        indexed_ids = {base_product.id for base_product in base_products}
+        excluded_uids = list(
+            BaseProduct.objects.filter(id__in=ids)
+            .exclude(id__in=indexed_ids)
+            .values_list("uid", flat=True)
+        )
+        self._delete_base_product_documents(pipeline, excluded_uids)
+
+        # products copy the base product name, brand, etc. into their documents
+        product_ids = list(
+            Product.objects.filter(base_product_id__in=ids).values_list("id", flat=True)
+        )
+        if product_ids:
+            pipeline.sadd(DIRTY_KEY.format(entity=PRODUCT), *product_ids)
+
+        return len(base_products)
+
+    def _sync_products(self, pipeline, ids) -> int:
+        from redisio.pydantic.products import ProductPy
+        from redisio.services.products import (
+            build_product_document,
+            product_index_queryset,
+        )
+
+        products = list(product_index_queryset().filter(id__in=ids))
+        for product in products:
+            pipeline.json().set(
+                ProductPy.make_primary_key(product.uid),
+                ".",
+                build_product_document(product),
+            )
+        return len(products)
+
+    def _delete_documents(self, pipeline, model_py, uids) -> int:
+        if uids:
+            pipeline.delete(*[model_py.make_primary_key(uid) for uid in uids])
+        return len(uids)
+
+    def _delete_base_product_documents(self, pipeline, uids) -> int:
+        from redisio.pydantic.baseproducts import BaseProductPy
+
+        self.autocomplete.remove(pipeline, uids, self.autocomplete.get_members(uids))
+        return self._delete_documents(pipeline, BaseProductPy, uids)
+
+    def flush_once(self) -> dict:
+        from redisio.pydantic.products import ProductPy
+
+        popped = {
+            key: self._pop(key)
+            for key in (
+                DELETED_KEY.format(entity=BASE_PRODUCT),
+                DELETED_KEY.format(entity=PRODUCT),
+                DIRTY_KEY.format(entity=BASE_PRODUCT),
+                DIRTY_KEY.format(entity=PRODUCT),
+            )
+        }
+        stats = {
+            "popped": sum(len(members) for members in popped.values()),
+            "products": 0,
+            "base_products": 0,
+            "deleted": 0,
+        }
+        if not stats["popped"]:
+            return stats
+
+        pipeline = self._redis_connection.pipeline(transaction=False)
+        try:
+            stats["deleted"] += self._delete_base_product_documents(
+                pipeline, popped[DELETED_KEY.format(entity=BASE_PRODUCT)]
+            )
+            stats["deleted"] += self._delete_documents(
+                pipeline, ProductPy, popped[DELETED_KEY.format(entity=PRODUCT)]
+            )
+            if popped[DIRTY_KEY.format(entity=BASE_PRODUCT)]:
+                stats["base_products"] = self._sync_base_products(
+                    pipeline, popped[DIRTY_KEY.format(entity=BASE_PRODUCT)]
+                )
+            if popped[DIRTY_KEY.format(entity=PRODUCT)]:
+                stats["products"] = self._sync_products(
+                    pipeline, popped[DIRTY_KEY.format(entity=PRODUCT)]
+                )
+            pipeline.execute()
+        except Exception:
+            for key, members in popped.items():
+                self._restore(key, members)
+            raise
+
+        return stats
+
+    def flush(self, max_batches=None) -> dict:
+        """Flush batches until the change log is empty or `max_batches` is reached."""
+        totals = {
+            "popped": 0,
+            "products": 0,
+            "base_products": 0,
+            "deleted": 0,
+            "batches": 0,
+        }
+        started_at = time.monotonic()
+
+        while max_batches is None or totals["batches"] < max_batches:
+            stats = self.flush_once()
+            if not stats["popped"]:
+                break
+            totals["batches"] += 1
+            for key, value in stats.items():
+                totals[key] += value
+
+        totals["seconds"] = time.monotonic() - started_at
+        return totals
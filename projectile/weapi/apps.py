@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class WeapiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "weapi"
+
+    def ready(self):
+        from . import signals
@@ -2,9 +2,9 @@ import logging
 
 from rest_framework.permissions import BasePermission
 
+from accountio.context import get_organization_context
 from accountio.models import Organization, OrganizationUser
 from accountio.choices import OrganizationUserStatus, OrganizationUserRole
-from core.models import User
 
 logger = logging.getLogger(__name__)
 
@@ -26,20 +26,15 @@ class IsOrganizationCustomer(BasePermission):
         if not request.user.is_authenticated:
             return False
 
-        subdomain = request.headers.get("X-DOMAIN", "")
-        if len(subdomain) == 0:
+        context = get_organization_context(request)
+        if not context.domain:
             return False
 
-        current_user: User = request.user
-
-        try:
-            organization_user = current_user.organizationuser_set.get(
-                organization__domain=subdomain
-            )
-            return organization_user.role == OrganizationUserRole.CUSTOMER
-        except OrganizationUser.DoesNotExist:
-            logger.warning(f"Cannot find the organizationuser for {current_user}")
+        organization_user = context.domain_organization_user
+        if organization_user is None:
+            logger.warning(f"Cannot find the organizationuser for {request.user}")
             return False
+        return organization_user.role == OrganizationUserRole.CUSTOMER
 
 
 class IsOrganizationOwner(BasePermission):
@@ -52,12 +47,9 @@ class IsOrganizationOwner(BasePermission):
             return False
 
         try:
-            domain = request.headers.get("X-DOMAIN", None)
-            organization_user: OrganizationUser = (
-                request.user.organizationuser_set.select_related("organization").get(
-                    is_default=True
-                )
-            )
+            context = get_organization_context(request)
+            domain = context.domain
+            organization_user: OrganizationUser = context.organization_user
             return (
                 organization_user.role == OrganizationUserRole.OWNER
                 and organization_user.status in permitted_statuses
@@ -77,7 +69,7 @@ class IsOrganizationAdmin(BasePermission):
             return False
 
         try:
-            organization_user = request.user.get_merchent_organization_user()
+            organization_user = get_organization_context(request).organization_user
             return (
                 organization_user.role
                 in [
@@ -100,12 +92,9 @@ class IsOrganizationStaff(BasePermission):
             return False
 
         try:
-            domain = request.headers.get("X-DOMAIN", None)
-            organization_user: OrganizationUser = (
-                request.user.organizationuser_set.select_related("organization").get(
-                    is_default=True
-                )
-            )
+            context = get_organization_context(request)
+            domain = context.domain
+            organization_user: OrganizationUser = context.organization_user
             return (
                 organization_user.role
                 in [
@@ -131,7 +120,7 @@ class IsOrganizationManager(BasePermission):
             return False
 
         try:
-            organization_user = request.user.get_merchent_organization_user()
+            organization_user = get_organization_context(request).organization_user
             return (
                 organization_user.role
                 in [
@@ -1,4 +1,5 @@
 from django.core.validators import MinValueValidator
+from django.db.models import Sum
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
@@ -10,9 +11,11 @@ from catalogio.choices import ProductBoxType
 
 from catalogio.models import Product
 
+from orderio.choices import StockReservationStatus
 from orderio.models import (
     Cart,
     CartProduct,
+    StockReservation,
 )
 
 from weapi.rest.serializers.basic import PrivateBasicIngredientSerializer
@@ -45,14 +48,13 @@ class PrivateCartProductSerializer(serializers.Serializer):
         read_only=True,
         max_digits=10,
         decimal_places=2,
-        source="product.total_discount",
         help_text="Total customer offset and product individual discount.",
     )
     final_price_with_offset = serializers.DecimalField(
         read_only=True,
         max_digits=10,
         decimal_places=2,
-        source="product.final_price_with_offset",
+        source="unit_price",
         help_text="Product price with customer offset and product discount",
     )
     discount_price = serializers.DecimalField(
@@ -115,12 +117,14 @@ class PrivateCartProductSerializer(serializers.Serializer):
 class PrivateCartsSerializer(serializers.Serializer):
     uid = serializers.UUIDField(read_only=True)
     discount_offset = serializers.DecimalField(
-        read_only=True, max_digits=10, decimal_places=2
+        read_only=True, max_digits=10, decimal_places=2, source="price.discount_offset"
     )
     total_price = serializers.DecimalField(
-        read_only=True, decimal_places=2, max_digits=10
+        read_only=True, decimal_places=2, max_digits=10, source="price.total_price"
+    )
+    products = PrivateCartProductSerializer(
+        many=True, read_only=True, source="price.lines"
     )
-    products = PrivateCartProductSerializer(many=True, read_only=True)
 
     product = serializers.SlugRelatedField(
         queryset=Product.objects.get_status_active(),
@@ -147,7 +151,17 @@ class PrivateCartsSerializer(serializers.Serializer):
                     "product": f"This product is not {organization.name} organization's product"
                 }
             )
-        if product.stock < quantity:
+        # the stock held by the checkout of this customer is theirs to order
+        reserved = (
+            StockReservation.objects.filter(
+                organization=organization,
+                customer=attrs.get("customer"),
+                product=product,
+                status=StockReservationStatus.ACTIVE,
+            ).aggregate(total=Sum("quantity"))["total"]
+            or 0
+        )
+        if product.stock + reserved < quantity:
             raise ValidationError(
                 {"quantity": f"Insufficient stock for {product.base_product.name}"}
             )
@@ -173,3 +187,13 @@ class PrivateCartsSerializer(serializers.Serializer):
             cart=cart, product=product, defaults={"quantity": quantity}
         )
         return validated_data
+
+
+class PrivateStockReservationSerializer(serializers.ModelSerializer):
+    slug = serializers.SlugField(source="product.slug", read_only=True)
+    name = serializers.CharField(source="product.base_product.name", read_only=True)
+
+    class Meta:
+        model = StockReservation
+        fields = ("uid", "slug", "name", "quantity", "status", "expires_at")
+        read_only_fields = fields
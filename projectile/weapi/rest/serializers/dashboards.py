@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from orderio.choices import SalesPeriod
+
 
 class StatusSerializer(serializers.Serializer):
     count = serializers.IntegerField()
@@ -42,19 +44,32 @@ class PrivateDashboardDetailSerializer(serializers.Serializer):
     categories_product = CategorySerializer(many=True)
     count_customer_with_advance_payment = serializers.IntegerField(read_only=True)
     count_customer_with_due_amount = serializers.IntegerField(read_only=True)
-    customer_total_advance_payment = serializers.SerializerMethodField()
-    customer_total_due_amount = serializers.SerializerMethodField()
+    customer_total_advance_payment = serializers.DecimalField(
+        max_digits=12, decimal_places=2, coerce_to_string=False, read_only=True
+    )
+    customer_total_due_amount = serializers.DecimalField(
+        max_digits=12, decimal_places=2, coerce_to_string=False, read_only=True
+    )
 
-    def get_customer_total_advance_payment(self, instance):
-        customer_total_advance_payment = 0
-        for advance in instance["advance"]:
-            customer_total_advance_payment += advance.balance
-        return customer_total_advance_payment
 
-    def get_customer_total_due_amount(self, instance):
-        customer_total_due_amount = 0
+class PrivateSalesSeriesQuerySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(
+        choices=SalesPeriod.choices, default=SalesPeriod.MONTH
+    )
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get("start") and attrs.get("end") and attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError(
+                {"start": "The start date must be before the end date."}
+            )
+        return attrs
 
-        for due in instance["due"]:
-            customer_total_due_amount += due.balance
 
-        return customer_total_due_amount
+class PrivateSalesSeriesSerializer(serializers.Serializer):
+    period = serializers.DateField()
+    order_count = serializers.IntegerField()
+    gross = serializers.DecimalField(max_digits=14, decimal_places=2)
+    net = serializers.DecimalField(max_digits=14, decimal_places=2)
+    returned_quantity = serializers.IntegerField()
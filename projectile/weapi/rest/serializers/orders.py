@@ -28,7 +28,6 @@ from catalogio.models import (
     Product,
 )
 from notificationio.choices import ActivityActionTypeStatusChoices
-from notificationio.models import Notification
 from notificationio.services import NotificationService
 from notificationio.utils import changed_fields_with_values
 
@@ -36,10 +35,11 @@ from orderio.choices import OrderDeliveryStatus, OrderStageChoices
 from orderio.models import (
     Order,
     OrderProduct,
-    Cart,
     OrderDelivery,
     ReturnOrderProduct,
 )
+from orderio.pricing import CartPricingService, price_lines
+from orderio.services import OrderPlacementService, change_order_status
 
 from paymentio.models import PaymentMethod
 
@@ -91,20 +91,17 @@ class PrivateOrderDeliverySerializer(serializers.ModelSerializer):
         fields = ("status", "created_at")
 
 
-class PrivateDeliveryStatusSerializer(serializers.ModelSerializer):
-    created_at = serializers.SerializerMethodField()
+class PrivateDeliveryStatusSerializer(serializers.Serializer):
+    """A stage of `Order.delivery_stages`, derived from the delivery status log."""
 
-    class Meta:
-        model = OrderDelivery
-        fields = ("status", "stage", "created_at")
+    status = serializers.ChoiceField(
+        choices=OrderDeliveryStatus.choices, read_only=True
+    )
+    stage = serializers.ChoiceField(choices=OrderStageChoices.choices, read_only=True)
+    created_at = serializers.SerializerMethodField()
 
-    def get_created_at(self, instance: OrderDelivery) -> datetime:
-        if (
-            instance.status == OrderDeliveryStatus.COMPLETED
-            and instance.stage == OrderStageChoices.CURRENT
-        ):
-            return instance.updated_at
-        return instance.updated_at if instance.stage.lower() == "completed" else ""
+    def get_created_at(self, stage: dict) -> datetime:
+        return stage["created_at"]
 
 
 class MerchantOrderCreateUserSerializer(serializers.Serializer):
@@ -122,7 +119,9 @@ class PrivateOrderListSerializers(serializers.ModelSerializer):
         default=0, decimal_places=2, max_digits=10
     )
     discount = serializers.DecimalField(default=0, decimal_places=2, max_digits=10)
-    delivery_statuses = PrivateDeliveryStatusSerializer(read_only=True, many=True)
+    delivery_statuses = PrivateDeliveryStatusSerializer(
+        source="delivery_stages", read_only=True, many=True
+    )
     # write only fields
     products = MerchantOrderCreateUserSerializer(many=True, write_only=True)
     logged_user = serializers.HiddenField(default=serializers.CurrentUserDefault())
@@ -199,6 +198,7 @@ class PrivateOrderListSerializers(serializers.ModelSerializer):
 
         return values
 
+    @transaction.atomic
     def create(self, validated_data):
         customer_phone = validated_data.pop("customer_phone")
         first_name = validated_data.pop("first_name", " ")
@@ -211,8 +211,6 @@ class PrivateOrderListSerializers(serializers.ModelSerializer):
         products: List[MerchantOrderCreateUserSerializer] = validated_data.pop(
             "products"
         )
-        total_discounted_price = 0
-        total_price = 0
 
         customer, created = User.objects.get_or_create(
             phone=customer_phone,
@@ -226,18 +224,15 @@ class PrivateOrderListSerializers(serializers.ModelSerializer):
         )
 
         offset_price = organization_user.discount_offset
-        for order_product in products:
-            product: Product = order_product["uid"]
-            total_discount = offset_price + product.discount_price
-            total_price += product.selling_price * order_product["quantity"]
-            single_discounted_price = product.selling_price * (
-                1 - (total_discount / decimal.Decimal(100))
-            )
-            total_discounted_price += (
-                single_discounted_price * order_product["quantity"]
-            )
-
-            order_product.single_discounted_price = single_discounted_price
+        price = price_lines(
+            [
+                (order_product["uid"], order_product["quantity"])
+                for order_product in products
+            ],
+            offset_price,
+        )
+        total_price = price.gross_price
+        total_discounted_price = price.total_price
 
         discount = validated_data.get(
             "discount",
@@ -246,10 +241,20 @@ class PrivateOrderListSerializers(serializers.ModelSerializer):
         )
 
         payable_amount = validated_data.pop("payable_amount", total_discounted_price)
-        order = Order.objects.create(
+
+        # merchant orders are handed over at once, so they start completed
+        order_placement_service = OrderPlacementService(
+            organization=organization,
             customer=customer,
             order_by=logged_user,
-            organization=organization,
+            discount_offset=offset_price,
+        )
+        order = order_placement_service.place(
+            [
+                (order_product["uid"], order_product["quantity"])
+                for order_product in products
+            ],
+            current_status=OrderDeliveryStatus.COMPLETED,
             order_price=total_discounted_price,
             total_price=total_discounted_price,
             payable_amount=payable_amount,
@@ -258,62 +263,18 @@ class PrivateOrderListSerializers(serializers.ModelSerializer):
             payment_method=payment_method,
             completed=True,
             discount=discount,
-            discount_offset=organization_user.discount_offset,
-        )
-        for order_product in products:
-            product: Product = order_product["uid"]
-
-            OrderProduct.objects.create(
-                order=order,
-                product=product,
-                selling_price=product.selling_price,
-                discount_price=product.discount_price + offset_price,
-                quantity=order_product["quantity"],
-                updated_quantity=order_product["quantity"],
-                delivery_quantity=order_product["quantity"],
-            )
-            product.stock -= order_product["quantity"]
-            product.save_dirty_fields()
-
-        # adding delivery status
-        for key, value in OrderDeliveryStatus.choices:
-            if (
-                key != OrderDeliveryStatus.RETURNED
-                and key != OrderDeliveryStatus.CANCELED
-                and key != OrderDeliveryStatus.PARTIAL_DELIVERY
-            ):
-                if key == "COMPLETED":
-                    OrderDelivery.objects.create(
-                        status=key,
-                        stage=OrderStageChoices.CURRENT,
-                        order=order,
-                    )
-                else:
-                    OrderDelivery.objects.create(
-                        status=key,
-                        stage=OrderStageChoices.COMPLETED,
-                        order=order,
-                    )
-
-        transaction_organization_user = TransactionOrganizationUser.objects.create(
-            organization=order.organization,
-            user=order.customer,
-            total_money=order.total_price,
-            payable_money=order.payable_amount,
-            order=order,
         )
+        transaction_organization_user = order_placement_service.record_payment(order)
 
         # sending notification for order
         notification_service = NotificationService(
             request=self.context["request"],
             organization=organization,
         )
-        notification: Notification = notification_service.create_notification_with_sending_notification_to_organization_users(
+        notification_service.notify(
             previous_data={},
             saved_or_updated_instance=order,
-        )
-        notification_service.send_notification_to_custom_users(
-            notification=notification, user_ids=[order.customer.id]
+            user_ids=[order.customer_id],
         )
 
         # sending notification for transaction
@@ -321,7 +282,7 @@ class PrivateOrderListSerializers(serializers.ModelSerializer):
             request=self.context["request"],
             organization=organization,
         )
-        notification_service.create_notification_with_sending_notification_to_organization_users(
+        notification_service.notify(
             previous_data={},
             saved_or_updated_instance=transaction_organization_user,
         )
@@ -426,7 +387,9 @@ class PrivateOrderDetailSerializer(serializers.ModelSerializer):
     delivery_status_name = serializers.ChoiceField(
         choices=OrderDeliveryStatus.choices, write_only=True
     )
-    delivery_statuses = PrivateDeliveryStatusSerializer(read_only=True, many=True)
+    delivery_statuses = PrivateDeliveryStatusSerializer(
+        source="delivery_stages", read_only=True, many=True
+    )
     payable_amount = serializers.DecimalField(
         default=0, max_digits=10, decimal_places=2
     )
@@ -490,18 +453,7 @@ class PrivateOrderDetailSerializer(serializers.ModelSerializer):
         )
 
         delivery_name = validated_data.get("delivery_status_name", "")
-
-        try:
-            current_delivery_status: str = instance.delivery_statuses.get(
-                stage=OrderStageChoices.CURRENT
-            ).status
-        except OrderDelivery.MultipleObjectsReturned:
-            logger.warning("Multiple objects return for order_delivery")
-            raise ValidationError({"detail": "Multiple objects have returned."})
-        except OrderDelivery.DoesNotExist:
-            raise ValidationError(
-                {"detail": f"Cannot found the order-delivery current stage."}
-            )
+        current_delivery_status: str = instance.current_status
 
         if len(delivery_name) > 0:
             up_to_status = OrderDeliveryStatus.choices.index(
@@ -524,51 +476,29 @@ class PrivateOrderDetailSerializer(serializers.ModelSerializer):
                             ]
                         }
                     )
-            # order delivery previous name
-            previous_delivery_status: OrderDelivery = instance.delivery_statuses.get(
-                stage=OrderStageChoices.CURRENT
-            )
-
-            # create the order delivery new status if in DB not available
-            order_delivery_current: OrderDelivery = instance.delivery_statuses.get(
-                status=delivery_name
-            )
-            order_delivery_current.stage = OrderStageChoices.CURRENT
-            order_delivery_current.save()
-
-            # send notification
 
+            # append the change to the status log and send notification
             if current_delivery_status != delivery_name:
+                order_delivery_current = change_order_status(
+                    instance, delivery_name, changed_by=self.context["request"].user
+                )
                 notification_service = NotificationService(
                     request=self.context["request"],
                     organization=self.context["request"].user.get_organization(),
                 )
-                notification: Notification = notification_service.create_notification_with_sending_notification_to_organization_users(
+                notification_service.notify(
                     previous_data=changed_fields_with_values(
                         "status",
-                        previous_delivery_status.status,
+                        current_delivery_status,
                         order_delivery_current.status,
                     ),
                     saved_or_updated_instance=order_delivery_current,
-                )
-                notification.notificationmodelconnector.order = instance
-                notification.notificationmodelconnector.save_dirty_fields()
-
-                notification_service.send_notification_to_custom_users(
-                    notification=notification, user_ids=[instance.customer.id]
+                    user_ids=[instance.customer_id],
+                    connections={"order": instance.id},
                 )
 
         # updating the related fields
-        try:
-            current_set_status = instance.delivery_statuses.get(
-                stage=OrderStageChoices.CURRENT
-            )
-        except OrderDelivery.DoesNotExist:
-            raise ValidationError(
-                {"detail": f"Cannot found the {delivery_name} status for this order."}
-            )
-
-        if current_set_status.status == OrderDeliveryStatus.COMPLETED:
+        if instance.current_status == OrderDeliveryStatus.COMPLETED:
             instance.completed = True
             instance.save_dirty_fields()
             # Added to transaction when the order is completed
@@ -585,13 +515,11 @@ class PrivateOrderDetailSerializer(serializers.ModelSerializer):
                 request=self.context["request"],
                 organization=instance.organization,
             )
-            notification: Notification = notification_service.create_notification_with_sending_notification_to_organization_users(
+            notification_service.notify(
                 previous_data={},
                 saved_or_updated_instance=transaction_user,
                 action_type=ActivityActionTypeStatusChoices.ADDITION,
-            )
-            notification_service.send_notification_to_custom_users(
-                notification=notification, user_ids=[transaction_user.user.id]
+                user_ids=[transaction_user.user_id],
             )
         else:
             if instance.completed:
@@ -760,7 +688,9 @@ class PrivateCustomerOrderSerializer(serializers.ModelSerializer):
         read_only=True,
     )
 
-    delivery_statuses = PrivateDeliveryStatusSerializer(read_only=True, many=True)
+    delivery_statuses = PrivateDeliveryStatusSerializer(
+        source="delivery_stages", read_only=True, many=True
+    )
 
     customer = serializers.HiddenField(default=serializers.CurrentUserDefault())
     address = serializers.JSONField(read_only=True)
@@ -835,30 +765,6 @@ class PrivateCustomerOrderSerializer(serializers.ModelSerializer):
             try:
                 customer = validated_data.get("customer")
                 organization_user = organization.organizationuser_set.get(user=customer)
-                try:
-                    cart = Cart.objects.prefetch_related("products__product").get(
-                        organization=organization, customer=customer
-                    )
-                except Cart.DoesNotExist:
-                    raise ValidationError("Please add some products to cart first.")
-                cart_total = cart.total_price()
-                cartproducts = cart.products.all()
-
-                # checking insufficient stock products
-                insufficient_stock_products = []
-                for cart_product in cartproducts:
-                    if cart_product.product.stock < cart_product.quantity:
-                        insufficient_stock_products.append(
-                            cart_product.product.base_product.name
-                        )
-
-                if len(insufficient_stock_products) > 0:
-                    products_names = ", ".join(insufficient_stock_products)
-                    raise ValidationError(
-                        {
-                            "detail": f"{products_names} {'products are' if len(insufficient_stock_products) > 1 else 'product is'} stocked out"
-                        }
-                    )
 
                 try:
                     delivery_charge_set = DeliveryCharge.objects.get(
@@ -880,72 +786,33 @@ class PrivateCustomerOrderSerializer(serializers.ModelSerializer):
                     "division": address.division.name if address.division else "",
                     "country": address.country,
                 }
-                order = Order.objects.create(
-                    customer=validated_data.get("customer"),
-                    total_price=cart_total + delivery_charge_set,
-                    payable_amount=cart_total + delivery_charge_set,
-                    order_price=cart_total + delivery_charge_set,
+                order = OrderPlacementService(
+                    organization=organization,
+                    customer=customer,
+                    order_by=customer,
+                    discount_offset=organization_user.discount_offset,
+                ).place_cart(
+                    CartPricingService(
+                        organization,
+                        customer,
+                        discount_offset=organization_user.discount_offset,
+                    ),
+                    delivery_charge=delivery_charge_set,
                     address=address_json,
                     payment_method=validated_data.get("payment_method_uid"),
-                    delivery_charge=delivery_charge_set,
-                    organization=organization,
                     receiver_name=validated_data.get("receiver_name", ""),
                     receiver_phone=validated_data.get("receiver_phone", ""),
-                    order_by=customer,
-                    discount_offset=organization_user.discount_offset,
                 )
-                for cartproduct in cartproducts:
-                    print(
-                        f"product discount {cartproduct.product.name()} -> {cartproduct.product.discount_price}"
-                    )
-                    OrderProduct.objects.create(
-                        order=order,
-                        product=cartproduct.product,
-                        selling_price=cartproduct.product.selling_price,
-                        discount_price=cartproduct.product.discount_price
-                        + organization_user.discount_offset,
-                        quantity=cartproduct.quantity,
-                        updated_quantity=cartproduct.quantity,
-                        delivery_quantity=cartproduct.quantity,
-                    )
-                    cartproduct.product.stock = (
-                        cartproduct.product.stock - cartproduct.quantity
-                    )
-                    cartproduct.product.save()
-                statuses = []
-                for key, value in OrderDeliveryStatus.choices:
-                    if key == OrderDeliveryStatus.ORDER_PLACED:
-                        statuses.append(
-                            OrderDelivery(
-                                status=key,
-                                stage=OrderStageChoices.CURRENT,
-                                order=order,
-                            )
-                        )
-                    else:
-                        statuses.append(
-                            OrderDelivery(
-                                status=key,
-                                stage=OrderStageChoices.PENDING,
-                                order=order,
-                            )
-                        )
-
-                OrderDelivery.objects.bulk_create(statuses)
-
-                cart.delete()
 
                 # sending notification
                 notification_service = NotificationService(
                     request=self.context["request"],
                     organization=organization,
                 )
-                notification: Notification = notification_service.create_notification_with_sending_notification_to_organization_users(
+                notification_service.notify(
                     previous_data={},
                     saved_or_updated_instance=order,
-                )
-                notification_service.send_notification_to_custom_users(
-                    notification=notification, user_ids=[order.customer.id]
+                    user_ids=[order.customer_id],
                 )
             except IntegrityError as e:
                 raise ValidationError(e)
@@ -1038,7 +905,7 @@ class PrivateReturnProductHoldSerializer(serializers.Serializer):
 
     def update(self, instance: Order, validated_data):
         return_products = validated_data.pop("return_products", [])
-        delivery_status = instance.delivery_statuses.get(stage="CURRENT").status
+        delivery_status = instance.current_status
 
         if (
             delivery_status == OrderDeliveryStatus.PARTIAL_RETURNED
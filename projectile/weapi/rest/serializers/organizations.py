@@ -270,7 +270,7 @@ class PrivateOrganizationDetailSerializer(serializers.ModelSerializer):
             request=self.context["request"],
             organization=instance,
         )
-        notification_service.create_notification_with_sending_notification_to_organization_users(
+        notification_service.notify(
             previous_data=changed_data,
             saved_or_updated_instance=instance,
         )
@@ -498,16 +498,11 @@ class OrganizationSerializer(serializers.ModelSerializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    total_products = serializers.SerializerMethodField()
-
     class Meta:
         model = Order
         fields = ["serial_number", "total_price", "payable_amount", "total_products"]
         read_only_fields = ("__all__",)
 
-    def get_total_products(self, obj: Order) -> int:
-        return obj.order_products.count()
-
 
 class PrivateCustomerTransactionHistoryListSerializer(serializers.ModelSerializer):
     organization = OrganizationSerializer()
@@ -382,15 +382,11 @@ class PrivateProductSerializer(serializers.ModelSerializer):
 
             # sending notification
             notification_service = NotificationService(request=self.context["request"])
-            notification_service.create_notification_with_sending_notification_to_organization_users(
+            notification_service.notify(
                 previous_data={},
                 saved_or_updated_instance=instance,
             )
 
-            # adding current product to redis cache
-            # product_redis = ProductRedisServices()
-            # product_redis.save(pk=instance.pk, request=self.context["request"])
-
             # return the instance for response instance data
             return instance
 
@@ -950,7 +946,7 @@ class PrivateProductDetailSerializer(serializers.ModelSerializer):
             request=self.context["request"],
             organization=instance.organization,
         )
-        notification_service.create_notification_with_sending_notification_to_organization_users(
+        notification_service.notify(
             previous_data=changed_data,
             saved_or_updated_instance=instance,
         )
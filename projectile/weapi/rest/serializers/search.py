@@ -43,3 +43,10 @@ class PrivateBaseProductSearchSerializer(serializers.ModelSerializer):
             "mrp",
         )
         read_only_fields = ("__all__",)
+
+
+class PrivateBaseProductAutocompleteSerializer(serializers.Serializer):
+    uid = serializers.UUIDField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    strength = serializers.CharField(read_only=True)
+    unit = serializers.CharField(read_only=True)
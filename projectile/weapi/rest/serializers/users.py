@@ -13,7 +13,6 @@ from accountio.utils import get_subdomain
 
 from core.rest.serializers.auth import GlobalUserSlimSerializer
 
-from notificationio.models import Notification
 from notificationio.services import NotificationService
 
 from orderio.models import Order
@@ -57,17 +56,15 @@ class PrivateOrganizationUserSerializer(serializers.ModelSerializer):
                 request=self.context["request"],
                 organization=organization,
             )
-            notification: Notification = notification_service.create_notification_with_sending_notification_to_organization_users(
+            is_customer = (
+                organization.organizationuser_set.get(user=instance.user).role
+                == "CUSTOMER"
+            )
+            notification_service.notify(
                 previous_data=changed_data,
                 saved_or_updated_instance=instance,
+                user_ids=[instance.user.id] if is_customer else [],
             )
-            if (
-                organization.organizationuser_set.get(user=instance.user).role
-                == "CUSTOMER"
-            ):
-                notification_service.send_notification_to_custom_users(
-                    notification=notification, user_ids=[instance.user.id]
-                )
 
         return instance
 
@@ -116,8 +113,6 @@ class PrivateOrganizationPostSerializer(serializers.Serializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    total_products = serializers.SerializerMethodField()
-
     class Meta:
         model = Order
 
@@ -125,9 +120,6 @@ class OrderSerializer(serializers.ModelSerializer):
 
         read_only_fields = ("__all__",)
 
-    def get_total_products(self, obj):
-        return obj.order_products.count()
-
 
 class PrivateCustomerTransactionListSerializer(serializers.ModelSerializer):
     amount = serializers.DecimalField(
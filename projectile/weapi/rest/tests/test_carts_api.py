@@ -1,5 +1,17 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 
+from accountio.choices import OrganizationUserRole
+from accountio.models import Organization, OrganizationUser
+
+from catalogio.models import Product
 from catalogio.rest.tests import urlhelpers as catalogio_urlhelpers
 
 from common.base_orm import BaseOrmCallApi
@@ -7,6 +19,11 @@ from common.base_test import BaseAPITestCase
 
 from core.rest.tests import urlhelpers as core_urlhelpers
 
+from orderio.choices import StockReservationStatus
+from orderio.models import Cart, CartProduct, StockReservation
+from orderio.pricing import CartPricingService
+from orderio.services import OrderPlacementService, StockReservationService
+
 from . import payloads, urlhelpers
 
 
@@ -109,3 +126,183 @@ class PrivateCartsApiTests(BaseAPITestCase):
 
         # Assert that the response is correct
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class PrivateCartCheckoutApiTests(BaseAPITestCase):
+    """Test cart checkout stock reservation api"""
+
+    def setUp(self):
+        super(PrivateCartCheckoutApiTests, self).setUp()
+
+        self.base_orm = BaseOrmCallApi()
+
+        self.organization = Organization.objects.get(domain="bill-corp")
+        self.product = Product.objects.create(
+            base_product=self.base_orm.baseproduct(payloads.base_product_payload()),
+            organization=self.organization,
+            stock=10,
+            selling_price=100,
+        )
+
+        # Customer with 4 pieces of the product in cart
+        self.customer = self.base_orm.create_user(phone="+8801722222255")
+        self.base_orm.create_organization_user(
+            self.organization, self.customer, OrganizationUserRole.CUSTOMER
+        )
+        cart = Cart.objects.create(
+            organization=self.organization, customer=self.customer
+        )
+        CartProduct.objects.create(cart=cart, product=self.product, quantity=4)
+
+        self.client.force_authenticate(user=self.customer)
+
+    def assertStock(self, stock):
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, stock)
+
+    def test_checkout_reserves_and_releases_stock(self):
+        # Test checkout holds the cart stock until it is released
+
+        response = self.client.post(urlhelpers.cart_checkout_url())
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[0]["quantity"], 4)
+        self.assertStock(6)
+
+        # checking out again replaces the reservation instead of adding to it
+        self.client.post(urlhelpers.cart_checkout_url())
+        self.assertStock(6)
+
+        response = self.client.delete(urlhelpers.cart_checkout_url())
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertStock(10)
+        self.assertFalse(
+            StockReservation.objects.filter(
+                status=StockReservationStatus.ACTIVE
+            ).exists()
+        )
+
+    def test_checkout_stock_out(self):
+        # Test checkout cannot reserve more than the stock
+
+        Product.objects.filter(pk=self.product.pk).update(stock=3)
+
+        response = self.client.post(urlhelpers.cart_checkout_url())
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertStock(3)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_reservation_is_consumed_or_expired(self):
+        # Test the order uses the reserved stock and overdue reservations expire
+
+        service = StockReservationService(self.organization, self.customer)
+        service.reserve([(self.product, 4)])
+        order = OrderPlacementService(
+            self.organization, self.customer, self.customer
+        ).place(
+            [(self.product, 5)],
+            reservations=service,
+            address={},
+            payment_method=self.base_orm.payment_method(),
+        )
+
+        self.assertStock(5)
+        reservation = StockReservation.objects.get()
+        self.assertEqual(reservation.status, StockReservationStatus.CONSUMED)
+        self.assertEqual(reservation.order, order)
+
+        service.reserve([(self.product, 2)])
+        StockReservation.objects.filter(status=StockReservationStatus.ACTIVE).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(StockReservationService.release_expired(), 1)
+        self.assertStock(5)
+
+    def test_cart_price(self):
+        # Test the cart is priced with the customer offset in the same queries for any size
+
+        OrganizationUser.objects.filter(
+            organization=self.organization, user=self.customer
+        ).update(discount_offset=5)
+        Product.objects.filter(pk=self.product.pk).update(discount_price=10)
+
+        response = self.client.get(urlhelpers.cart_products_list_url())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data["total_price"]), Decimal(340))
+        line = response.data["products"][0]
+        self.assertEqual(Decimal(line["final_price_with_offset"]), Decimal(85))
+        self.assertEqual(Decimal(line["total_discount"]), Decimal(15))
+
+        with CaptureQueriesContext(connection) as one_line:
+            self.client.get(urlhelpers.cart_products_list_url())
+
+        cart = Cart.objects.get(customer=self.customer)
+        base_product = self.product.base_product
+        base_product_payload = {
+            field: getattr(base_product, field)
+            for field in [
+                "superadmin",
+                "dosage_form",
+                "manufacturer",
+                "unit",
+                "brand",
+                "category",
+                "route_of_administration",
+                "medicine_physical_state",
+            ]
+        }
+        base_product_payload["ingredient"] = base_product.active_ingredients.first()
+        for _ in range(3):
+            product = Product.objects.create(
+                base_product=self.base_orm.baseproduct(base_product_payload),
+                organization=self.organization,
+                stock=10,
+                selling_price=10,
+            )
+            CartProduct.objects.create(cart=cart, product=product, quantity=1)
+
+        with CaptureQueriesContext(connection) as four_lines:
+            response = self.client.get(urlhelpers.cart_products_list_url())
+
+        self.assertEqual(Decimal(response.data["total_price"]), Decimal("368.50"))
+        self.assertEqual(len(four_lines), len(one_line))
+        self.assertEqual(cart.total_price(), Decimal("368.50"))
+
+    def test_place_cart(self):
+        # Test the cart is ordered with its reserved stock and emptied in one go
+
+        self.client.post(urlhelpers.cart_checkout_url())
+
+        order = OrderPlacementService(
+            self.organization, self.customer, self.customer
+        ).place_cart(
+            CartPricingService(self.organization, self.customer),
+            delivery_charge=50,
+            address={},
+            payment_method=self.base_orm.payment_method(),
+        )
+
+        self.assertEqual(order.total_price, Decimal(450))
+        self.assertEqual(order.order_products.get().quantity, 4)
+        self.assertStock(6)
+        self.assertEqual(
+            StockReservation.objects.get().status, StockReservationStatus.CONSUMED
+        )
+        self.assertFalse(Cart.objects.filter(customer=self.customer).exists())
+        # the bulk stock changes are in the product history
+        self.assertEqual(
+            self.product.history.filter(history_change_reason="Stock taken")
+            .latest("history_date")
+            .stock,
+            6,
+        )
+
+        # an empty cart cannot be ordered
+        with self.assertRaises(ValidationError):
+            OrderPlacementService(
+                self.organization, self.customer, self.customer
+            ).place_cart(CartPricingService(self.organization, self.customer))
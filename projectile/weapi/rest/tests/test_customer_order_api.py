@@ -355,12 +355,10 @@ class OrganizationStaffCustomersOrderListApiTests(BaseAPITestCase):
         )
         order_delivery1 = self.base_orm.create_order_delivery(
             status=self.order_status.ORDER_PLACED,
-            stage=self.order_stage.CURRENT,
             order=order1,
         )
         order_delivery2 = self.base_orm.create_order_delivery(
             status=self.order_status.ORDER_PLACED,
-            stage=self.order_stage.CURRENT,
             order=order2,
         )
 
@@ -1,5 +1,18 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
 from rest_framework import status
 
+from accountio.choices import OrganizationUserRole
+from accountio.models import Organization
+
+from catalogio.models import Product
+
+from orderio.models import Order
+
 from common.base_orm import BaseOrmCallApi
 from common.base_test import BaseAPITestCase
 
@@ -55,3 +68,79 @@ class PrivateDashboardApiTest(BaseAPITestCase):
         self.assertEqual(
             response.data["categories_product"][0]["total_stock"], self.payload["stock"]
         )
+
+    def test_dashboard_cache(self):
+        # Test the dashboard is cached until a product or order changes
+
+        response = self.client.get(urlhelpers.dashboard_list_url())
+        self.assertEqual(response.data["product_stock_count_sum"]["total_count"], 10)
+
+        # queryset updates skip the signals, the cached dashboard stays
+        Product.objects.filter().update(stock=20)
+        response = self.client.get(urlhelpers.dashboard_list_url())
+        self.assertEqual(response.data["product_stock_count_sum"]["total_count"], 10)
+
+        response = self.client.get(urlhelpers.dashboard_list_url(), {"fresh": 1})
+        self.assertEqual(response.data["product_stock_count_sum"]["total_count"], 20)
+
+        # saving a product drops the cached dashboard
+        product = Product.objects.get()
+        product.stock = 30
+        product.save()
+        response = self.client.get(urlhelpers.dashboard_list_url())
+        self.assertEqual(response.data["product_stock_count_sum"]["total_count"], 30)
+
+    def test_sales_series(self):
+        # Test the sales series read from the daily rollups
+
+        organization = Organization.objects.get(domain="bill-corp")
+        customer = self.base_orm.create_user(
+            phone="+8801722222244",
+            password="newpass1122",
+            **payloads.user_naming_payload()
+        )
+        self.base_orm.create_organization_user(
+            organization=organization,
+            user=customer,
+            role=OrganizationUserRole.CUSTOMER,
+        )
+        payment_method = self.base_orm.payment_method()
+        orders = [
+            self.base_orm.create_order(
+                customer=customer,
+                organization=organization,
+                order_by=customer,
+                total_price=total_price,
+                address=payloads.address_payload(),
+                payment_method=payment_method,
+            )
+            for total_price in ("200.00", "300.00")
+        ]
+
+        response = self.client.get(
+            urlhelpers.dashboard_sales_list_url(), {"period": "DAY"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["order_count"], 2)
+        self.assertEqual(response.data[0]["net"], "500.00")
+
+        # rows written behind the signals are picked up by the backfill
+        Order.objects.filter(pk=orders[0].pk).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+        call_command("orderio_daily_sales_backfill", stdout=StringIO())
+
+        response = self.client.get(
+            urlhelpers.organization_customer_sales_list_url(customer.uid),
+            {"period": "MONTH"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [sales["net"] for sales in response.data], ["200.00", "300.00"]
+        )
+
+        response = self.client.get(
+            urlhelpers.dashboard_sales_list_url(), {"period": "YEAR"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
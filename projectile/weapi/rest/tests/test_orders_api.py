@@ -1,7 +1,13 @@
 from datetime import datetime
 
+from django.test import override_settings
+
 from rest_framework import status
 
+from accountio.choices import OrganizationUserRole
+from accountio.models import Organization, TransactionOrganizationUser
+
+from catalogio.models import Product
 from catalogio.rest.tests import urlhelpers as catalogio_urlhelpers
 
 from common.base_orm import BaseOrmCallApi
@@ -9,7 +15,26 @@ from common.base_test import BaseAPITestCase
 
 from core.rest.tests import urlhelpers as core_urlhelpers, payloads as core_payloads
 
-from orderio.choices import OrderDeliveryStatus
+from orderio.choices import (
+    MERCHANT_ORDER_SKIPPED_STATUSES,
+    OrderDeliveryStatus,
+    OrderStageChoices,
+)
+from notificationio.choices import (
+    NotificationEnableStatusChoices,
+    NotificationEventStatusChoices,
+    NotificationModelTypeChoices,
+)
+from notificationio.models import (
+    Notification,
+    NotificationEvent,
+    NotificationUserPreference,
+    NotificationUserReceiver,
+)
+from notificationio.services import process_notification_events
+
+from orderio.models import Order, ReturnOrderProduct
+from orderio.services import change_order_status
 
 from . import payloads, urlhelpers
 
@@ -146,7 +171,7 @@ class PrivateOrdersListApiTests(BaseAPITestCase):
 
         # Assert that the response is correct
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_get_private_orders_detail(self):
         # Test organization private orders detail api
@@ -178,3 +203,274 @@ class PrivateOrdersListApiTests(BaseAPITestCase):
             response.data["delivery_statuses"][0]["status"],
             payload["delivery_status_name"],
         )
+
+
+class PrivateMerchantOrderCreateApiTests(BaseAPITestCase):
+    """Test organization private order create api"""
+
+    def setUp(self):
+        super(PrivateMerchantOrderCreateApiTests, self).setUp()
+
+        self.base_orm = BaseOrmCallApi()
+
+        # Create base product and product
+        self.base_product = self.base_orm.baseproduct(payloads.base_product_payload())
+        self.organization = self.client.get(urlhelpers.organization_list_url())
+        self.user = self.client.get(urlhelpers.organization_user_list_url())
+        self.post_response = self.client.post(
+            urlhelpers.product_list_url(),
+            {
+                "base_product": self.base_product.uid,
+                "organization": self.organization,
+                "stock": 10,
+                "selling_price": "100",
+                "merchant": self.user.data["results"][0]["user"]["uid"],
+            },
+        )
+        self.assertEqual(self.post_response.status_code, status.HTTP_201_CREATED)
+        self.product = Product.objects.get()
+
+        self.payment_method = self.base_orm.payment_method()
+
+    def order_payload(self, quantity):
+        return {
+            "products": [{"uid": str(self.product.uid), "quantity": quantity}],
+            "customer_phone": "+8801722222244",
+            "address": payloads.address_payload(),
+            "payment_method_uid": str(self.payment_method.uid),
+        }
+
+    def test_create_private_order(self):
+        # Test merchant order takes the stock and records the payment
+
+        response = self.client.post(
+            urlhelpers.private_orders_list_url(), self.order_payload(4), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get()
+        self.assertEqual(order.order_products.get().quantity, 4)
+        self.assertEqual(order.current_status, OrderDeliveryStatus.COMPLETED)
+        self.assertTrue(
+            TransactionOrganizationUser.objects.filter(order=order).exists()
+        )
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 6)
+
+    def test_create_private_order_stock_out(self):
+        # Test a stock out rolls the whole order back
+
+        Product.objects.filter(pk=self.product.pk).update(stock=3)
+
+        response = self.client.post(
+            urlhelpers.private_orders_list_url(), self.order_payload(4), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+
+    def test_create_private_order_serial_numbers(self):
+        # Test orders and their payments get unique serial numbers without a lookup
+
+        for _ in range(3):
+            response = self.client.post(
+                urlhelpers.private_orders_list_url(),
+                self.order_payload(1),
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        serial_numbers = list(
+            Order.objects.order_by("created_at").values_list("serial_number", flat=True)
+        )
+        self.assertEqual(len(set(serial_numbers)), 3)
+        self.assertEqual(serial_numbers, sorted(serial_numbers))
+        self.assertEqual(
+            TransactionOrganizationUser.objects.values("serial_number")
+            .distinct()
+            .count(),
+            3,
+        )
+
+    def test_private_order_list_counters(self):
+        # Test the list reads the line, return and status counters of the order
+
+        for _ in range(3):
+            self.client.post(
+                urlhelpers.private_orders_list_url(),
+                self.order_payload(3),
+                format="json",
+            )
+        order = Order.objects.earliest("created_at")
+        order_product = order.order_products.get()
+        # equal quantities were lost by a distinct sum before
+        for _ in range(2):
+            ReturnOrderProduct.objects.create(
+                order=order,
+                order_product=order_product,
+                organization=order.organization,
+                product=self.product,
+                returned_quantity=1,
+                is_damage=False,
+            )
+        change_order_status(order, OrderDeliveryStatus.ACCEPTED)
+
+        order.refresh_from_db()
+        self.assertEqual(order.total_products, 1)
+        self.assertEqual(order.returned_total_quantity, 2)
+        self.assertEqual(order.current_status, OrderDeliveryStatus.ACCEPTED)
+
+        response = self.client.get(
+            urlhelpers.private_orders_list_url(),
+            {"status": OrderDeliveryStatus.ACCEPTED},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["total_products"], 1)
+        self.assertEqual(response.data["results"][0]["returned_total_quantity"], 2)
+
+        # keyset pages
+        response = self.client.get(urlhelpers.private_orders_list_url(), {"limit": 2})
+
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["uid"], str(order.uid))
+
+    def test_private_order_status_log(self):
+        # Test a status change is appended to the log and the stages derive from it
+
+        self.client.post(
+            urlhelpers.private_orders_list_url(), self.order_payload(4), format="json"
+        )
+        order = Order.objects.get()
+
+        response = self.client.patch(
+            urlhelpers.private_orders_detail_url(order.uid),
+            {"delivery_status_name": OrderDeliveryStatus.ACCEPTED},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(order.delivery_statuses.values_list("previous_status", "status")),
+            [
+                ("", OrderDeliveryStatus.COMPLETED),
+                (OrderDeliveryStatus.COMPLETED, OrderDeliveryStatus.ACCEPTED),
+            ],
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.current_status, OrderDeliveryStatus.ACCEPTED)
+        # merchant orders do not show the statuses they skip
+        stages = response.data["delivery_statuses"]
+        self.assertEqual(
+            [stage["status"] for stage in stages],
+            [
+                status
+                for status in OrderDeliveryStatus.values
+                if status not in MERCHANT_ORDER_SKIPPED_STATUSES
+            ],
+        )
+        self.assertEqual(
+            [stage["stage"] for stage in stages[:3]],
+            [
+                OrderStageChoices.COMPLETED,
+                OrderStageChoices.CURRENT,
+                OrderStageChoices.PENDING,
+            ],
+        )
+        self.assertEqual(stages[1]["created_at"], "")
+
+        # the customer order count reads the current status column
+        response = self.client.get(
+            urlhelpers.private_customer_order_count_url(order.customer.uid)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        counts = {
+            count["status"]: count["total_order_count"]
+            for count in response.data["order_count_by_status"]
+        }
+        self.assertEqual(counts[OrderDeliveryStatus.ACCEPTED], 1)
+        self.assertEqual(counts[OrderDeliveryStatus.COMPLETED], 0)
+
+    def test_create_private_order_notifies(self):
+        # Test the order notification reaches the staff who want it and the customer
+
+        organization = Organization.objects.get(domain="bill-corp")
+        owner = organization.organizationuser_set.get(
+            role=OrganizationUserRole.OWNER
+        ).user
+        staff = self.base_orm.create_user(phone="+8801722222266")
+        self.base_orm.create_organization_user(
+            organization, staff, OrganizationUserRole.STAFF, is_default=False
+        )
+        NotificationUserPreference.objects.create(
+            user=staff,
+            organization=organization,
+            enable_order_notification=NotificationEnableStatusChoices.OFF,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                urlhelpers.private_orders_list_url(),
+                self.order_payload(1),
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # the request only captures the event, a worker creates the notification
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(process_notification_events(), 2)
+
+        notification = Notification.objects.get(
+            model_type=NotificationModelTypeChoices.ORDER
+        )
+        order = Order.objects.get()
+        self.assertEqual(
+            set(
+                NotificationUserReceiver.objects.filter(
+                    notification=notification
+                ).values_list("user_id", flat=True)
+            ),
+            {owner.id, order.customer_id},
+        )
+        self.assertEqual(
+            NotificationEvent.objects.get(notification=notification).status,
+            NotificationEventStatusChoices.DONE,
+        )
+        # processed events are not picked up again
+        self.assertEqual(process_notification_events(), 0)
+        # the owner had no preference yet, it is created with everything on
+        self.assertTrue(
+            NotificationUserPreference.objects.filter(
+                user=owner, organization=organization
+            ).exists()
+        )
+
+    @override_settings(NOTIFICATIONS_EAGER=True)
+    def test_create_private_order_notifies_eagerly(self):
+        # Test eager mode creates the notifications right after the commit
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                urlhelpers.private_orders_list_url(),
+                self.order_payload(1),
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            set(Notification.objects.values_list("model_type", flat=True)),
+            {
+                NotificationModelTypeChoices.ORDER,
+                NotificationModelTypeChoices.TRANSACTION,
+            },
+        )
+        self.assertFalse(
+            NotificationEvent.objects.exclude(
+                status=NotificationEventStatusChoices.DONE
+            ).exists()
+        )
@@ -1,5 +1,10 @@
+from decimal import Decimal
+
 from rest_framework import status
 
+from accountio.choices import OrganizationUserRole
+from accountio.models import CustomerBalance, Organization
+
 from catalogio.rest.tests import urlhelpers as catalogio_urlhelpers
 
 from common.base_orm import BaseOrmCallApi
@@ -174,3 +179,77 @@ class PrivateCustomersOrderListApiTests(BaseAPITestCase):
         self.assertEqual(
             response.data["charge"], self.delivery_charge_payload["charge"]
         )
+
+
+class PrivateCustomerBalanceListApiTests(BaseAPITestCase):
+    """Test organization private customer list balances"""
+
+    def setUp(self):
+        super(PrivateCustomerBalanceListApiTests, self).setUp()
+
+        self.base_orm = BaseOrmCallApi()
+
+        self.organization = Organization.objects.get(domain="bill-corp")
+
+        # Customer with two orders and one payment
+        self.customer = self.base_orm.create_user(
+            phone="+8801722222244",
+            password="newpass1122",
+            **payloads.user_naming_payload()
+        )
+        self.base_orm.create_organization_user(
+            organization=self.organization,
+            user=self.customer,
+            role=OrganizationUserRole.CUSTOMER,
+        )
+        payment_method = self.base_orm.payment_method()
+        self.orders = [
+            self.base_orm.create_order(
+                customer=self.customer,
+                organization=self.organization,
+                order_by=self.customer,
+                total_price=total_price,
+                address=payloads.address_payload(),
+                payment_method=payment_method,
+            )
+            for total_price in ("200.00", "300.00")
+        ]
+        self.transaction = self.base_orm.create_transaction(
+            organization=self.organization,
+            user=self.customer,
+            order=self.orders[0],
+            total_money="200.00",
+            payable_money="150.00",
+        )
+
+    def test_customer_balance_list(self):
+        # Test the customer list reads the maintained balance
+
+        customer_balance = CustomerBalance.objects.get(
+            organization=self.organization, user=self.customer
+        )
+        self.assertEqual(customer_balance.total_buy, Decimal("500.00"))
+        self.assertEqual(customer_balance.total_pay, Decimal("150.00"))
+        self.assertEqual(customer_balance.order_count, 2)
+
+        response = self.client.get(
+            urlhelpers.organization_customer_list_url(), {"balance": "due"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["balance"], "-350.00")
+        self.assertEqual(response.data["results"][0]["total_orders"], 2)
+
+        response = self.client.get(
+            urlhelpers.organization_customer_list_url(), {"balance": "advance"}
+        )
+        self.assertEqual(response.data["count"], 0)
+
+        # Deleting an order refreshes the balance
+        self.orders[1].delete()
+        response = self.client.get(
+            urlhelpers.organization_customer_list_url(), {"balance": "due"}
+        )
+        self.assertEqual(response.data["results"][0]["balance"], "-50.00")
+        self.assertEqual(response.data["results"][0]["total_orders"], 1)
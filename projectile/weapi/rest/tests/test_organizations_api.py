@@ -1,5 +1,11 @@
+from django.core.cache import cache
+
 from rest_framework import status
 
+from accountio.choices import OrganizationUserRole
+from accountio.context import default_organization_user_key
+from accountio.models import OrganizationUser
+
 from common.base_orm import BaseOrmCallApi
 from common.base_test import BaseAPITestCase
 
@@ -101,6 +107,26 @@ class PrivateOrganizationUserApiTests(BaseAPITestCase):
         # Get organization user uid
         self.organization_user_uid = self.organization_user.data["results"][1]["uid"]
 
+    def test_organization_context_cache_invalidation(self):
+        # Test the cached organization context follows organization user changes
+
+        response = self.client.get(urlhelpers.organization_info_detail_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        organization_user = OrganizationUser.objects.get(
+            organization__domain="bill-corp", role=OrganizationUserRole.OWNER
+        )
+        cache_key = default_organization_user_key(organization_user.user_id)
+        self.assertEqual(cache.get(cache_key), organization_user)
+
+        # Saving the organization user drops the cached context
+        organization_user.role = OrganizationUserRole.CUSTOMER
+        organization_user.save()
+        self.assertIsNone(cache.get(cache_key))
+
+        response = self.client.get(urlhelpers.organization_info_detail_url())
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_create_organization_user(self):
         # Test create organization user api
 
@@ -4,6 +4,8 @@ from decimal import Decimal
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from openpyxl import load_workbook
+
 from rest_framework import status
 
 from accountio.models import Organization
@@ -15,6 +17,9 @@ from common.base_test import BaseAPITestCase
 
 from core.models import User
 
+from redisio.services import redis_connection
+from redisio.services.sync import DIRTY_KEY, PRODUCT
+
 from . import payloads, urlhelpers
 
 
@@ -112,6 +117,48 @@ class PrivateProductApiTests(BaseAPITestCase):
         # Assert that the response is correct
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+    def test_product_changes_recorded_for_search_index(self):
+        # Test product writes are queued for the redis search index sync
+        dirty_key = DIRTY_KEY.format(entity=PRODUCT)
+        redis_connection.delete(dirty_key)
+        product = Product.objects.get(uid=self.product_uid)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                urlhelpers.product_detail_url(self.product_uid), {"stock": 20}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(redis_connection.sismember(dirty_key, product.id))
+
+        # bulk writes skip the model signals
+        redis_connection.delete(dirty_key)
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(id=product.id).update(stock=5)
+        self.assertTrue(redis_connection.sismember(dirty_key, product.id))
+
+    def test_product_facets(self):
+        # Test product filter facet counts api
+
+        response = self.client.get(urlhelpers.product_facet_url())
+
+        # Assert that the response is correct
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total"], 1)
+        self.assertEqual(response.data["categories"][0]["count"], 1)
+        self.assertEqual(response.data["manufacturers"][0]["count"], 1)
+        self.assertEqual(
+            {row["status"]: row["count"] for row in response.data["stock_status"]},
+            {"In_Stock": 1, "Low": 0, "Out_Of_Stock": 0},
+        )
+        self.assertEqual(
+            sum(bucket["count"] for bucket in response.data["price_buckets"]), 1
+        )
+
+        # Filters narrow the counts
+        response = self.client.get(urlhelpers.product_facet_url(), {"stock": "out"})
+        self.assertEqual(response.data["total"], 0)
+        self.assertEqual(response.data["categories"], [])
+
     def test_product_bulk_discount(self):
         # Test bulk discount update api
 
@@ -220,6 +267,32 @@ class PrivateProductApiTests(BaseAPITestCase):
         response = self.client.get(urlhelpers.product_bulk_download_url())
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_product_bulk_download_streams(self):
+        # Test the product file is streamed with one row per product
+
+        response = self.client.get(urlhelpers.product_bulk_download_url())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook.active.values)
+        self.assertEqual(rows[0][:2], ("Name", "Category"))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], self.base_product.name)
+        self.assertEqual(rows[1][7], self.payload["stock"])
+
+        response = self.client.get(
+            urlhelpers.product_bulk_download_url(), {"file_format": "csv"}
+        )
+
+        rows = list(
+            csv.reader(
+                io.StringIO(b"".join(response.streaming_content).decode("utf-8"))
+            )
+        )
+        self.assertEqual(rows[0][-1], "Box type")
+        self.assertEqual(rows[1][7], str(self.payload["stock"]))
+
     # def test_product_bulk_update(self):
     #     # Test product bulk update api
     #     organization = Organization.objects.get(name=self.organization_name)
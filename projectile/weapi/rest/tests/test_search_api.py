@@ -1,8 +1,23 @@
+from unittest import mock
+
+from redis.exceptions import RedisError
+
 from rest_framework import status
 
+from accountio.choices import OrganizationUserRole
+from accountio.models import Organization
+
 from common.base_orm import BaseOrmCallApi
 from common.base_test import BaseAPITestCase
 
+from redisio.services import redis_connection
+from redisio.services.products import ProductRedisServices
+from redisio.services.autocomplete import (
+    AUTOCOMPLETE_KEY,
+    AUTOCOMPLETE_MEMBERS_KEY,
+    BaseProductAutocomplete,
+)
+
 from . import payloads, urlhelpers
 
 
@@ -65,3 +80,66 @@ class PrivateProductSearchApiTest(BaseAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"][0]["name"], "Napa")
         self.assertEqual(response.data["count"], 1)
+
+    def test_search_product_by_dosage_form_without_redis(self):
+        # The database fallback matches the dosage form slug like redis does
+        slug = self.base_product.dosage_form.slug
+
+        customer = self.base_orm.create_user(phone="+8801722222266")
+        self.base_orm.create_organization_user(
+            Organization.objects.get(domain="bill-corp"),
+            customer,
+            OrganizationUserRole.CUSTOMER,
+        )
+        self.client.force_authenticate(user=customer)
+
+        with mock.patch.object(
+            ProductRedisServices, "search_products", side_effect=RedisError
+        ):
+            response = self.client.get(
+                urlhelpers.search_product_url(), {"dosage-form": slug}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["count"], 1)
+            self.assertEqual(response.data["results"][0]["name"], "Napa")
+
+            response = self.client.get(
+                urlhelpers.search_product_url(),
+                {"dosage-form": self.base_product.dosage_form.name},
+            )
+            self.assertEqual(response.data["count"], 0)
+
+    def test_autocomplete_base_product(self):
+        # Test base product typeahead api
+        redis_connection.delete(AUTOCOMPLETE_KEY, AUTOCOMPLETE_MEMBERS_KEY)
+        BaseProductAutocomplete().index([self.base_product])
+
+        response = self.client.get(
+            urlhelpers.search_base_product_autocomplete_url(), {"search": "NAP"}
+        )
+
+        # Assert that the response is correct
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["uid"], str(self.base_product_uid))
+        self.assertEqual(response.data[0]["name"], "Napa")
+        self.assertEqual(response.data[0]["unit"], "100")
+
+        # Re-indexing a renamed base product replaces its old entry
+        self.base_product.name = "Ace"
+        BaseProductAutocomplete().index([self.base_product])
+
+        response = self.client.get(
+            urlhelpers.search_base_product_autocomplete_url(), {"search": "nap"}
+        )
+        self.assertEqual(response.data, [])
+
+        # Names past latin-1 are suggested too
+        self.base_product.name = "কমল"
+        BaseProductAutocomplete().index([self.base_product])
+
+        response = self.client.get(
+            urlhelpers.search_base_product_autocomplete_url(), {"search": "ক"}
+        )
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["name"], "কমল")
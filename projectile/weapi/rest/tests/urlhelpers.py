@@ -93,6 +93,10 @@ def cart_products_remove_url(product_slug):
     return reverse("cart_product-remove", args=[product_slug])
 
 
+def cart_checkout_url():
+    return reverse("cart-checkout")
+
+
 def create_order_list_url():
     return reverse("customer-order-list")
 
@@ -121,10 +125,22 @@ def search_base_product_url():
     return reverse("search-base.product")
 
 
+def search_base_product_autocomplete_url():
+    return reverse("search-base.product-autocomplete")
+
+
 def dashboard_list_url():
     return reverse("dashboard-list")
 
 
+def dashboard_sales_list_url():
+    return reverse("dashboard-sales-list")
+
+
+def organization_customer_sales_list_url(uid):
+    return reverse("organization-customer-sales-list", args=[uid])
+
+
 def private_orders_list_url():
     return reverse("orders-list")
 
@@ -153,6 +169,10 @@ def search_product_url():
     return reverse("search-product")
 
 
+def product_facet_url():
+    return reverse("product-facet-detail")
+
+
 def bulk_discount_update_url():
     return reverse("product-bulk-discount-by-filter")
 
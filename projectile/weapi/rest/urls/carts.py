@@ -2,6 +2,7 @@ from django.urls import path
 from weapi.rest.views import carts
 
 urlpatterns = [
+    path("/checkout", carts.PrivateCartCheckout.as_view(), name="cart-checkout"),
     path(
         "/<slug:product_slug>",
         carts.PrivateCartDetail.as_view(),
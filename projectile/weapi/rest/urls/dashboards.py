@@ -1,7 +1,10 @@
 from django.urls import path
 
-from ..views.dashboards import PrivateDashboardList
+from ..views.dashboards import PrivateDashboardList, PrivateOrganizationSalesList
 
 urlpatterns = [
+    path(
+        r"/sales", PrivateOrganizationSalesList.as_view(), name="dashboard-sales-list"
+    ),
     path(r"", PrivateDashboardList.as_view(), name="dashboard-list"),
 ]
@@ -13,6 +13,11 @@ urlpatterns = [
         products.PrivateStockCountDetail.as_view(),
         name="products-stock-detail",
     ),
+    path(
+        "/facets",
+        products.PrivateProductFacetDetail.as_view(),
+        name="product-facet-detail",
+    ),
     path(
         "/discount",
         products.PrivateProductBulkDiscount.as_view(),
@@ -8,6 +8,11 @@ urlpatterns = [
         search.PrivateBaseProductSearch.as_view(),
         name="search-base.product",
     ),
+    path(
+        "/products/autocomplete",
+        search.PrivateBaseProductAutocomplete.as_view(),
+        name="search-base.product-autocomplete",
+    ),
     path(
         "/merchant/products",
         search.PrivateProductSearch.as_view(),
@@ -13,6 +13,11 @@ urlpatterns = [
         users.PrivateCustomerCountByMonthOfAYear.as_view(),
         name="organization-customer-order-count-by-month-of-a-year",
     ),
+    path(
+        "/<uuid:customer_uid>/sales",
+        users.PrivateCustomerSalesList.as_view(),
+        name="organization-customer-sales-list",
+    ),
     path(
         "/<uuid:uid>/transactions",
         users.PrivateCustomerTransactionHistoryList.as_view(),
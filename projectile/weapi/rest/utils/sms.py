@@ -1,12 +1,47 @@
+import datetime
+import logging
 import os
 import re
-from typing import List
+import threading
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
 
 from infobip_channels.sms.channel import SMSChannel
 from rest_framework.exceptions import ValidationError
 
+from otpio.choices import OutboundSMSStatus
+from otpio.models import OutboundSMS
+
+logger = logging.getLogger(__name__)
+
+# Bangladeshi numbers like 8801681845722 or +8801681845722
+PHONE_PATTERN = re.compile(r"^(((\+)?880))(\d){10}$", re.I)
+
+
+def normalize_recipient(number: str) -> str:
+    """Validate a number and remove the + from the start of it."""
+    if not PHONE_PATTERN.match(number):
+        raise ValidationError(
+            {
+                "detail": "Invalid phone number. Accepted numbers are 8801681845722 or +8801681845722"
+            }
+        )
+    return number[1:] if number.startswith("+") else number
+
+
+def otp_text(otp: str) -> str:
+    return f"Your REPLIQ OTP is {otp}. Thanks"
+
+
+class InfobipSMSProvider:
+    """Send messages with the multi message payload of infobip."""
 
-class SMS:
     _BASE_URL = "https://jdyvkv.api.infobip.com"
 
     def __init__(self):
@@ -17,49 +52,152 @@ class SMS:
             }
         )
 
-    def send_otp(self, recipients: List[str], otp: str) -> bool | ValidationError:
+    def send(self, messages: List[Dict]) -> bool:
         """
-        @recipients add numbers of the users like 8801681845722.
-        @message write message for the recipient users.
+        @messages like [{"recipients": ["8801681845722"], "text": "..."}].
         Response will be true if sms response is 200.
         """
-
-        # validation number
-        for index, _ in enumerate(recipients):
-            # Checking number using regex if number is Bangladeshi
-            pattern = r"^(((\+)?880))(\d){10}$"
-            try:
-                regex_validator = re.compile(pattern, re.I)
-            except re.error:
-                raise ValidationError({"detail": "Invalid regex pattern"})
-            if not regex_validator.match(recipients[index]):
-                raise ValidationError(
-                    {
-                        "detail": "Invalid phone number. Accepted numbers are 8801681845722 or +8801681845722"
-                    }
-                )
-
-            # remove + from the start of the number if exists
-            if recipients[index].startswith("+"):
-                recipients[index] = recipients[index][1:]
-
-        # sending sms to phone numbers
         response = self._channel.send_sms_message(
             {
                 "messages": [
                     {
-                        "destinations": [{"to": number} for number in recipients],
-                        "text": f"Your REPLIQ OTP is {otp}. Thanks",
+                        "destinations": [
+                            {"to": number} for number in message["recipients"]
+                        ],
+                        "text": message["text"],
                     }
+                    for message in messages
                 ]
             }
         )
         return True if response.status_code < 300 else False
 
+
+class FakeSMSProvider:
+    """Keep the messages in `outbox` instead of sending them, for tests and benchmarks.
+
+    `fail` makes every send fail, `latency` waits like a real provider would.
+    """
+
+    outbox: List[Dict] = []
+    fail = False
+    latency = 0
+    _lock = threading.Lock()
+
+    def send(self, messages: List[Dict]) -> bool:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            return False
+        with self._lock:
+            self.outbox.extend(messages)
+        return True
+
+
+def get_sms_provider():
+    return import_string(settings.SMS_PROVIDER)()
+
+
+class SMS:
+    def __init__(self, provider=None):
+        self._provider = provider or get_sms_provider()
+
+    def send_otp(self, recipients: List[str], otp: str) -> bool | ValidationError:
+        """
+        @recipients add numbers of the users like 8801681845722.
+        Sends right away, response will be true if sms response is 200.
+        """
+        recipients = [normalize_recipient(number) for number in recipients]
+        return self._provider.send([{"recipients": recipients, "text": otp_text(otp)}])
+
     def send_otp_to_one(self, recipient: str, otp: str) -> bool | ValidationError:
         """
         @recipients add a user number like 8801681845722.
-        @message write message for the recipient users.
-        Response will be true if sms response is 200.
+        Sends right away, response will be true if sms response is 200.
         """
         return self.send_otp([recipient], otp)
+
+    @staticmethod
+    def enqueue_otp(recipient: str, otp: str) -> OutboundSMS:
+        """Queue the otp for `dispatch_pending`, the request does not wait for it."""
+        return OutboundSMS.objects.create(
+            recipient=normalize_recipient(recipient), text=otp_text(otp)
+        )
+
+
+def retry_delay(attempts: int) -> datetime.timedelta:
+    """Exponential backoff after `attempts` failed sends."""
+    seconds = settings.SMS_RETRY_BACKOFF_SEC * 2 ** (attempts - 1)
+    return datetime.timedelta(seconds=min(seconds, settings.SMS_RETRY_BACKOFF_MAX_SEC))
+
+
+def claim_pending(batch_size, ids=None) -> List[OutboundSMS]:
+    """Mark up to `batch_size` due messages SENDING, the rows locked by others are skipped.
+
+    Messages left SENDING by a worker which died are claimed again after
+    `SMS_SENDING_TIMEOUT_SEC`. `ids` limits the claim to those messages.
+    """
+    now = timezone.now()
+    stale = now - datetime.timedelta(seconds=settings.SMS_SENDING_TIMEOUT_SEC)
+    queryset = OutboundSMS.objects.select_for_update(skip_locked=True)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    with transaction.atomic():
+        messages = list(
+            queryset.filter(
+                Q(status=OutboundSMSStatus.PENDING, next_attempt_at__lte=now)
+                | Q(status=OutboundSMSStatus.SENDING, updated_at__lt=stale)
+            ).order_by("next_attempt_at")[:batch_size]
+        )
+        OutboundSMS.objects.filter(id__in=[message.id for message in messages]).update(
+            status=OutboundSMSStatus.SENDING, updated_at=now
+        )
+    return messages
+
+
+def dispatch_pending(batch_size=None, provider=None, ids=None) -> int:
+    """Send one batch of the queue with a single provider call, return its size.
+
+    `ids` limits the batch to those messages, see `claim_pending`.
+    """
+    messages = claim_pending(batch_size or settings.SMS_BATCH_SIZE, ids=ids)
+    if not messages:
+        return 0
+
+    provider = provider or get_sms_provider()
+    error = ""
+    try:
+        sent = provider.send(
+            [
+                {"recipients": [message.recipient], "text": message.text}
+                for message in messages
+            ]
+        )
+    except Exception as exception:
+        logger.exception("Could not send %s SMS", len(messages))
+        sent, error = False, str(exception)
+
+    now = timezone.now()
+    if sent:
+        OutboundSMS.objects.filter(id__in=[message.id for message in messages]).update(
+            status=OutboundSMSStatus.SENT,
+            attempts=F("attempts") + 1,
+            sent_at=now,
+            last_error="",
+            updated_at=now,
+        )
+        return len(messages)
+
+    for message in messages:
+        message.updated_at = now
+        message.attempts += 1
+        message.last_error = error or "The provider did not accept the message."
+        if message.attempts >= settings.SMS_MAX_ATTEMPTS:
+            message.status = OutboundSMSStatus.FAILED
+        else:
+            message.status = OutboundSMSStatus.PENDING
+            message.next_attempt_at = now + retry_delay(message.attempts)
+    OutboundSMS.objects.bulk_update(
+        messages, ["attempts", "last_error", "status", "next_attempt_at", "updated_at"]
+    )
+    return len(messages)
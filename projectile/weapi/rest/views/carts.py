@@ -1,13 +1,15 @@
 import logging
-from decimal import Decimal
 
-from django.db.models import Prefetch, F
+from django.db.models import Prefetch
 from rest_framework.generics import (
     get_object_or_404,
     DestroyAPIView,
     CreateAPIView,
+    ListCreateAPIView,
     RetrieveAPIView,
 )
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from accountio.utils import get_subdomain
@@ -17,11 +19,14 @@ from catalogio.choices import ProductStatus
 from catalogio.models import Product
 
 from orderio.models import Cart
+from orderio.pricing import CartPricingService
+from orderio.services import StockReservationService
 
 from ..permissions import IsOrganizationCustomer
 from ..serializers.carts import (
     PrivateCartsSerializer,
     PrivateCartProductSerializer,
+    PrivateStockReservationSerializer,
 )
 
 logger = logging.getLogger(__name__)
@@ -37,14 +42,12 @@ class PrivateCartList(CreateAPIView, RetrieveAPIView, DestroyAPIView):
             user=self.request.user
         )
 
-        # start
-        discount_offset = organization_user.discount_offset
-
         products = (
             Product.objects.get_status_active()
             .select_related(
                 "organization",
                 "base_product__category",
+                "base_product__dosage_form",
                 "base_product__manufacturer",
                 "base_product__brand",
                 "base_product__route_of_administration",
@@ -55,15 +58,9 @@ class PrivateCartList(CreateAPIView, RetrieveAPIView, DestroyAPIView):
                 "mediaimageconnector_set__image",
                 "tagconnector_set__tag",
             )
-            .annotate(
-                total_discount=F("discount_price") + discount_offset,
-                final_price_with_offset=F("selling_price")
-                * (1 - F("total_discount") / Decimal(100)),
-            )
             .filter(organization=organization)
             .order_by("base_product__name")
         )
-        # end
 
         try:
             cart = (
@@ -73,11 +70,17 @@ class PrivateCartList(CreateAPIView, RetrieveAPIView, DestroyAPIView):
                 .select_related("organization")
                 .get(customer=self.request.user, organization=organization)
             )
-            cart.discount_offset = organization_user.discount_offset
-            return cart
         except Cart.DoesNotExist:
             return Response(status=200)
 
+        # the loaded lines are priced in memory with the offset read above
+        cart.price = CartPricingService(
+            organization,
+            self.request.user,
+            discount_offset=organization_user.discount_offset,
+        ).price(cart.products.all())
+        return cart
+
 
 class PrivateCartDetail(DestroyAPIView):
     serializer_class = PrivateCartProductSerializer
@@ -97,3 +100,48 @@ class PrivateCartDetail(DestroyAPIView):
             product=product,
         )
         return cart_product
+
+
+class PrivateCartCheckout(ListCreateAPIView):
+    """Hold the stock of the cart while the customer fills in the order.
+
+    POST reserves every cart line, DELETE gives the stock back. The reservations
+    expire after `STOCK_RESERVATION_TIMEOUT_SEC` and are used by the next order.
+    """
+
+    serializer_class = PrivateStockReservationSerializer
+    permission_classes = [IsOrganizationCustomer]
+    pagination_class = None
+
+    def get_service(self):
+        return StockReservationService(get_subdomain(self.request), self.request.user)
+
+    def get_queryset(self):
+        return (
+            self.get_service()
+            .get_queryset()
+            .select_related("product__base_product")
+            .order_by("product__base_product__name")
+        )
+
+    def create(self, request, *args, **kwargs):
+        service = self.get_service()
+        try:
+            cart = Cart.objects.prefetch_related("products__product__base_product").get(
+                organization=get_subdomain(request), customer=request.user
+            )
+        except Cart.DoesNotExist:
+            raise ValidationError("Please add some products to cart first.")
+
+        service.reserve(
+            [
+                (cart_product.product, cart_product.quantity)
+                for cart_product in cart.products.all()
+            ]
+        )
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, *args, **kwargs):
+        self.get_service().release()
+        return Response(status=status.HTTP_204_NO_CONTENT)
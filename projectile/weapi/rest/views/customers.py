@@ -1,4 +1,3 @@
-import decimal
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
@@ -8,7 +7,10 @@ from django.db.models import (
     QuerySet,
     Prefetch,
     F,
+    FilteredRelation,
+    Q,
 )
+from django.db.models.functions import Coalesce
 
 from django_filters.rest_framework import DjangoFilterBackend
 
@@ -25,11 +27,11 @@ from rest_framework.generics import (
 )
 
 from accountio.choices import OrganizationUserRole
-from accountio.models import TransactionOrganizationUser, Organization, OrganizationUser
+from accountio.models import TransactionOrganizationUser, Organization
 from accountio.utils import get_subdomain
 
-from orderio.choices import OrderDeliveryStatus, OrderStageChoices
-from orderio.models import Order, ReturnOrderProduct, OrderProduct
+from orderio.choices import OrderDeliveryStatus, SalesPeriod
+from orderio.models import CustomerDailySales, Order, ReturnOrderProduct, OrderProduct
 
 from weapi.rest import permissions
 
@@ -44,7 +46,6 @@ from ..serializers.organizations import (
     PrivateCustomerDetailSerializer,
     PrivateCustomerTransactionHistoryDetailSerializer,
 )
-from ..utils.customers import add_customer_extra_role_balance_information
 
 User = get_user_model()
 
@@ -110,16 +111,12 @@ class PrivateCustomerOrderList(ListCreateAPIView):
                 ),
             )
             .filter(organization=organization, customer=self.request.user)
-            .annotate(total_products=Count("order_products"))
             .order_by("-created_at")
         )
         # filter by delivery status which is in current stage
         delivery_status = self.request.query_params.get("status", "")
         if delivery_status:
-            orders = orders.filter(
-                delivery_statuses__status=delivery_status,
-                delivery_statuses__stage=OrderStageChoices.CURRENT,
-            )
+            orders = orders.filter(current_status=delivery_status)
         return orders
 
 
@@ -161,10 +158,7 @@ class PrivateCustomerOrderDetail(RetrieveAPIView):
                     ).filter(is_return_by_merchant=False),
                 ),
             )
-            .filter(organization=organization, customer=self.request.user)
-            .annotate(
-                total_products=Count("order_products"),
-            ),
+            .filter(organization=organization, customer=self.request.user),
             uid=self.kwargs.get("uid"),
         )
 
@@ -200,91 +194,54 @@ class PrivateCustomerList(ListAPIView):
 
     def get_queryset(self):
         organization: Organization = self.request.user.get_organization()
-        users_ids = list(
-            organization.organizationuser_set.filter(
-                role=OrganizationUserRole.CUSTOMER
-            ).values_list("user", flat=True)
-        )
 
+        # one row per customer, the totals come from the maintained CustomerBalance
         users: QuerySet[User] = (
-            User.objects.prefetch_related("organizationuser_set", "orders")
-            .filter(id__in=users_ids)
+            User.objects.annotate(
+                membership=FilteredRelation(
+                    "organizationuser",
+                    condition=Q(organizationuser__organization=organization),
+                ),
+                customer_balance=FilteredRelation(
+                    "customer_balances",
+                    condition=Q(customer_balances__organization=organization),
+                ),
+            )
+            .filter(membership__role=OrganizationUserRole.CUSTOMER)
+            .annotate(
+                discount_offset=F("membership__discount_offset"),
+                role=F("membership__role"),
+                total_orders=Coalesce("customer_balance__order_count", 0),
+                total_buying=Coalesce("customer_balance__total_buy", Decimal(0)),
+                total_payable=Coalesce("customer_balance__total_pay", Decimal(0)),
+                balance=Coalesce("customer_balance__balance", Decimal(0)),
+            )
+            .prefetch_related("address_set")
             .order_by("-created_at")
         )
 
         search = self.request.query_params.get("search", "")
         if len(search):
-            search_users_first_name = users.filter(first_name__istartswith=search)
-            search_users_last_name = users.filter(last_name__istartswith=search)
-            search_users_phone = users.filter(phone__istartswith=search)
-
-            users = (
-                search_users_phone | search_users_first_name | search_users_last_name
-            ).distinct()
+            users = users.filter(
+                Q(first_name__istartswith=search)
+                | Q(last_name__istartswith=search)
+                | Q(phone__istartswith=search)
+            )
 
         statuses = self.request.query_params.getlist("statuses", [""])
         if statuses[0]:
-            users = users.filter(organizationuser__status__in=statuses)
-
-        # a new filtered variable where i store the filtered value
-        filtered_users = []
+            users = users.filter(membership__status__in=statuses)
 
-        for user in users:
-            total_pay = (
-                user.transactionorganizationuser_set.filter(organization=organization)
-                .aggregate(total_payable_money=Sum("payable_money", default=0))
-                .get("total_payable_money", Decimal(0))
-            )
-            total_buy = (
-                user.orders.filter(organization=organization)
-                .aggregate(total_price=Sum("total_price", default=0))
-                .get("total_price", Decimal(0))
-            )
-            organization_user: OrganizationUser = get_object_or_404(
-                user.organizationuser_set, organization=organization
-            )
+        # Filter by balance
+        balance_filter = self.request.query_params.get("balance", "")
+        if balance_filter == "advance":
+            users = users.filter(balance__gt=0)
+        elif balance_filter == "due":
+            users = users.filter(balance__lt=0)
+        elif balance_filter == "zero":
+            users = users.filter(balance=0)
 
-            # Filter by balance
-            balance_filter = self.request.query_params.get("balance", "")
-            if len(balance_filter):
-                balance: decimal.Decimal = total_pay - total_buy
-
-                if (
-                    (
-                        balance_filter == "advance"
-                        and balance.compare(decimal.Decimal(0)) == 1
-                    )
-                    or (
-                        balance_filter == "due"
-                        and balance.compare(decimal.Decimal(0)) == -1
-                    )
-                    or (
-                        balance_filter == "zero"
-                        and balance.compare(decimal.Decimal(0)) == 0
-                    )
-                ):
-                    filtered_users.append(
-                        add_customer_extra_role_balance_information(
-                            user=user,
-                            organization_user=organization_user,
-                            total_buy=total_buy,
-                            total_pay=total_pay,
-                        )
-                    )
-                else:
-                    continue
-
-            else:
-                filtered_users.append(
-                    add_customer_extra_role_balance_information(
-                        user=user,
-                        organization_user=organization_user,
-                        total_buy=total_buy,
-                        total_pay=total_pay,
-                    )
-                )
-
-        return filtered_users
+        return users
 
 
 @extend_schema(
@@ -360,23 +317,20 @@ class PrivateCustomerCountByMonthOfAYear(ListAPIView):
             11: "november",
             12: "december",
         }
+        # one range scan over the daily rollup of the customer
+        monthly_sales = {
+            sales["period"].month: sales
+            for sales in CustomerDailySales.objects.filter(
+                organization=organization, customer=customer, date__year=year
+            ).series(SalesPeriod.MONTH)
+        }
         for i in range(1, 13):
-            months_orders = Order.objects.filter(
-                organization=organization,
-                customer=customer,
-                created_at__year=year,
-                created_at__month=i,
-            )
-            total_order_price = months_orders.aggregate(total_price=Sum("total_price"))[
-                "total_price"
-            ]
+            sales = monthly_sales.get(i, {})
             orders.append(
                 {
                     "month": months[i],
-                    "count": months_orders.count(),
-                    "total_order_price": total_order_price
-                    if total_order_price != None
-                    else 0,
+                    "count": sales.get("order_count", 0),
+                    "total_order_price": sales.get("net", 0),
                 }
             )
         return orders
@@ -411,19 +365,16 @@ class PrivateCustomerOrderCount(RetrieveAPIView):
 
         last_order_date = queryset.filter().order_by("id").latest("id").created_at
 
-        order_count_by_status = []
-
-        orders = queryset.filter(delivery_statuses__stage="CURRENT")
-
-        for key, value in OrderDeliveryStatus.choices:
-            order_count = orders.filter(delivery_statuses__status=key).aggregate(
-                total_orders=Count("uid")
-            )["total_orders"]
-            data = {
-                "status": key,
-                "total_order_count": order_count,
-            }
-            order_count_by_status.append(data)
+        # one GROUP BY on the current status column
+        order_counts = dict(
+            queryset.order_by()
+            .values_list("current_status")
+            .annotate(total_orders=Count("id"))
+        )
+        order_count_by_status = [
+            {"status": key, "total_order_count": order_counts.get(key, 0)}
+            for key in OrderDeliveryStatus.values
+        ]
 
         final_data = {
             "order_count_by_status": order_count_by_status,
@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from django.db.models import Count, Sum, Prefetch, F
+from django.db.models import F
 
 from django_filters.rest_framework import DjangoFilterBackend
 
@@ -19,8 +19,10 @@ from rest_framework.generics import (
     UpdateAPIView,
 )
 
-from orderio.choices import OrderStageChoices, OrderDeliveryStatus
-from orderio.models import Order, OrderDelivery, OrderProduct
+from common.pagination import BoundedCursorPagination
+
+from orderio.choices import OrderDeliveryStatus
+from orderio.models import Order, OrderProduct
 
 from ..filters.orders import FilterOrders
 from ..permissions import IsOrganizationStaff, IsOrganizationAdmin
@@ -93,6 +95,7 @@ class PrivateOrderList(ListCreateAPIView):
         "address__district",
     ]
     filterset_class = FilterOrders
+    pagination_class = BoundedCursorPagination
 
     def get_permissions(self):
         if self.request.method == "POST":
@@ -101,27 +104,20 @@ class PrivateOrderList(ListCreateAPIView):
         return [IsOrganizationStaff()]
 
     def get_queryset(self):
+        # the counters and current status are columns of the order, the page is
+        # read from the (organization, created_at) index without any join fan-out
         orders = (
             Order.objects.select_related("customer", "organization")
             .prefetch_related(
                 "delivery_statuses",
             )
             .filter(organization=self.request.user.get_organization())
-            .annotate(
-                total_products=Count("order_products", distinct=True),
-                returned_total_quantity=Sum(
-                    "returnorderproduct__returned_quantity", default=0, distinct=True
-                ),
-            )
             .order_by("-created_at")
         )
         # checking if status is in query params
         status = self.request.query_params.get("status", "")
         if status:
-            orders = orders.filter(
-                delivery_statuses__status=status,
-                delivery_statuses__stage=OrderStageChoices.CURRENT,
-            )
+            orders = orders.filter(current_status=status)
 
         return orders
 
@@ -140,10 +136,7 @@ class PrivateOrderDetail(RetrieveUpdateAPIView):
             Order.objects.select_related("customer")
             .prefetch_related(
                 "order_products__product__base_product",
-                Prefetch(
-                    "delivery_statuses",
-                    queryset=OrderDelivery.objects.filter().order_by("stage"),
-                ),
+                "delivery_statuses",
                 "returnorderproduct_set__product__base_product",
             )
             .filter(organization=self.request.user.get_organization()),
@@ -1,4 +1,3 @@
-import pandas as pd
 import uuid
 
 from django.core.files.uploadedfile import InMemoryUploadedFile
@@ -9,7 +8,6 @@ from django.db.models import (
     CharField,
     BooleanField,
 )
-from django.http import HttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 
 from drf_spectacular.types import OpenApiTypes
@@ -30,6 +28,9 @@ from rest_framework.response import Response
 
 from catalogio.choices import ProductStatus
 from catalogio.models import Product, BaseProduct
+from catalogio.rest.serializers.products import GlobalProductFacetSerializer
+
+from common.exports import csv_response, export_rows, xlsx_response
 
 from ..filters.products import FilterProducts
 from ..permissions import IsOrganizationStaff, IsOrganizationAdmin
@@ -177,6 +178,20 @@ class PrivateProductList(ListCreateAPIView):
         return super().create(request=request, *args, **kwargs)
 
 
+@extend_schema(
+    description="Filter sidebar counts for the merchant products, accepts the same filters as the product list."
+)
+class PrivateProductFacetDetail(PrivateProductList):
+    serializer_class = GlobalProductFacetSerializer
+    pagination_class = None
+    http_method_names = ["get", "head", "options"]
+
+    def list(self, request, *args, **kwargs):
+        products = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer(products.get_facets())
+        return Response(serializer.data)
+
+
 @extend_schema(
     description="The product can be viewed by admin, owner, manager, and staff. Only admin or owner can update or remove the product."
 )
@@ -317,68 +332,42 @@ class PrivateProductBulkUpdate(CreateAPIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+# the layout read back by `PrivateBulkProductUpdateSerializer`
+PRODUCT_EXPORT_COLUMNS = [
+    ("Name", "base_product__name"),
+    ("Category", "base_product__category__name"),
+    ("Dosage Form", "base_product__dosage_form__name"),
+    ("Brand", "base_product__brand__name"),
+    ("Strength", "base_product__strength"),
+    ("MRP", "selling_price"),
+    ("Discount", "discount_price"),
+    ("Stock", "stock"),
+    ("Box type", "box_type"),
+]
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            "file_format",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            enum=["xlsx", "csv"],
+            description="xlsx (default) or csv, ex: URL?file_format=csv",
+        ),
+    ]
+)
 class PrivateProductBulkDownload(ListAPIView):
     serializer_class = PrivateBulkProductDownloadSerializer
     permission_classes = [IsOrganizationStaff]
 
     def get(self, request, *args, **kwargs):
         organization = self.request.user.get_organization()
-        products = Product.objects.select_related(
-            "base_product__dosage_form",
-            "base_product__brand",
-        ).filter(organization=organization)
-
-        # Set up response object with appropriate Excel header
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        products = Product.objects.filter(organization=organization).order_by("id")
+
+        # the rows are read in chunks while the file is written
+        rows = export_rows(products, PRODUCT_EXPORT_COLUMNS)
         unique_file_name = str(uuid.uuid4())
-        response[
-            "Content-Disposition"
-        ] = f'attachment; filename="{unique_file_name}.xlsx"'
-
-        # Create a DataFrame with the product data
-        data = []
-        header_row = [
-            "Name",
-            "Category",
-            "Dosage Form",
-            "Brand",
-            "Strength",
-            "MRP",
-            "Discount",
-            "Stock",
-            "Box type",
-        ]
-        data.append(header_row)
-
-        # add products to array with data serially
-        for product in products:
-            data_row = [
-                product.base_product.name
-                if product.base_product.name is not None
-                else "",
-                product.base_product.category.name
-                if product.base_product.category is not None
-                else "",
-                product.base_product.dosage_form.name
-                if product.base_product.dosage_form is not None
-                else "",
-                product.base_product.brand.name
-                if product.base_product.brand is not None
-                else "",
-                product.base_product.strength,
-                product.selling_price,
-                product.discount_price,
-                product.stock,
-                product.box_type,
-            ]
-            data.append(data_row)
-
-        # Convert the data to a pandas DataFrame
-        df = pd.DataFrame(data)
-
-        # Save the DataFrame to Excel format
-        df.to_excel(response, index=False, header=False)
-
-        return response
+        if request.query_params.get("file_format") == "csv":
+            return csv_response(rows, unique_file_name)
+        return xlsx_response(rows, unique_file_name)
@@ -1,3 +1,5 @@
+import logging
+
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
@@ -6,30 +8,104 @@ from rest_framework.filters import SearchFilter
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 
+from redis.exceptions import RedisError
+
 from catalogio.models import Product
 
+from common.pagination import BoundedLimitOffsetPagination
+
+from redisio.services.autocomplete import BaseProductAutocomplete
 from redisio.services.base_products import BaseProductRedisServices
+from redisio.services.products import ProductRedisServices, ProductSearchResult
 
 from ..permissions import IsOrganizationCustomer, IsOrganizationStaff
 from ..serializers.products import PrivateProductSerializer
-from ..serializers.search import PrivateBaseProductSearchSerializer
+from ..serializers.search import (
+    PrivateBaseProductAutocompleteSerializer,
+    PrivateBaseProductSearchSerializer,
+)
 
+logger = logging.getLogger(__name__)
 
+
+@extend_schema(
+    description="Ranked base product search, exact name matches first, then name prefix and typo tolerant matches.",
+    parameters=[
+        OpenApiParameter(
+            "search",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            description="Base product name ex: URL?search=napa",
+        ),
+        OpenApiParameter(
+            "limit",
+            OpenApiTypes.INT,
+            OpenApiParameter.QUERY,
+            description="Page size, 20 by default and 50 at most",
+        ),
+        OpenApiParameter(
+            "offset",
+            OpenApiTypes.INT,
+            OpenApiParameter.QUERY,
+            description="Number of results to skip",
+        ),
+    ],
+)
 class PrivateBaseProductSearch(ListAPIView):
     serializer_class = PrivateBaseProductSearchSerializer
     permission_classes = [IsOrganizationStaff]
+    pagination_class = BoundedLimitOffsetPagination
 
     def get_queryset(self):
         return None
 
     def get(self, request, *args, **kwargs):
-        search = self.request.query_params.get("search", "")
+        search = self.request.query_params.get("search", "").strip()
         if not search:
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         base_product_search = BaseProductRedisServices()
-        search_products = base_product_search.search_by_base_product_name(name=search)
-        return Response(data=search_products)
+        offset, limit = self.paginator.get_window(request)
+        total, search_products = base_product_search.search(
+            search, offset=offset, limit=limit
+        )
+        return self.paginator.get_total_paginated_response(total, search_products)
+
+
+@extend_schema(
+    description="Typeahead for the base product picker, matches the beginning of `name strength`.",
+    parameters=[
+        OpenApiParameter(
+            "search",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            description="Typed prefix ex: URL?search=napa 5",
+        ),
+        OpenApiParameter(
+            "limit",
+            OpenApiTypes.INT,
+            OpenApiParameter.QUERY,
+            description="Number of suggestions, 10 by default and 20 at most",
+        ),
+    ],
+)
+class PrivateBaseProductAutocomplete(ListAPIView):
+    serializer_class = PrivateBaseProductAutocompleteSerializer
+    permission_classes = [IsOrganizationStaff]
+    pagination_class = None
+
+    def get_queryset(self):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        search = self.request.query_params.get("search", "")
+        try:
+            limit = min(int(self.request.query_params.get("limit", 10)), 20)
+        except ValueError:
+            limit = 10
+
+        suggestions = BaseProductAutocomplete().suggest(search, limit=max(limit, 1))
+        return Response(data=suggestions)
 
 
 @extend_schema(
@@ -51,7 +127,7 @@ class PrivateBaseProductSearch(ListAPIView):
             "dosage-form",
             OpenApiTypes.STR,
             OpenApiParameter.QUERY,
-            description="Single dosage-form name only ex: URL?dosage-form=oral",
+            description="Single dosage-form slug only ex: URL?dosage-form=oral",
         ),
         OpenApiParameter(
             "active-ingredients",
@@ -78,45 +154,76 @@ class PrivateProductSearch(ListAPIView):
         "base_product__strength",
     ]
 
+    def get_product_queryset(self):
+        return self.queryset.select_related(
+            "base_product",
+            "base_product__category",
+            "base_product__manufacturer",
+            "base_product__brand",
+            "base_product__route_of_administration",
+            "base_product__medicine_physical_state",
+        ).prefetch_related(
+            "base_product__active_ingredients",
+            "mediaimageconnector_set__image",
+        )
+
+    def get_search_filters(self):
+        return {
+            "search": self.request.query_params.get("search", ""),
+            "category": self.request.query_params.get("category", ""),
+            "dosage_form": self.request.query_params.get("dosage-form", ""),
+            "manufacturer": self.request.query_params.get("manufacturer", ""),
+            "active_ingredients": [
+                slug
+                for slug in self.request.query_params.getlist("active-ingredients")
+                if slug
+            ],
+        }
+
+    def list(self, request, *args, **kwargs):
+        try:
+            search_result = ProductSearchResult(
+                ProductRedisServices(),
+                self.get_product_queryset(),
+                organization_id=request.user.get_organization().id,
+                **self.get_search_filters(),
+            )
+            page = self.paginate_queryset(search_result)
+        except RedisError:
+            logger.warning("Redis product search is unavailable, using the database")
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     def get_queryset(self):
+        # database fallback, used when redis cannot answer the search
+        filters = self.get_search_filters()
         products = (
-            self.queryset.select_related(
-                "base_product",
-                "base_product__category",
-                "base_product__manufacturer",
-                "base_product__brand",
-                "base_product__route_of_administration",
-                "base_product__medicine_physical_state",
-            )
-            .prefetch_related(
-                "base_product__active_ingredients",
-                "mediaimageconnector_set__image",
-            )
+            self.get_product_queryset()
             .filter(organization=self.request.user.get_organization())
             .order_by("base_product__name")
         )
         # filter by category
-        category = self.request.query_params.get("category", "")
-        if category:
-            products = products.filter(base_product__category__slug=category)
+        if filters["category"]:
+            products = products.filter(base_product__category__slug=filters["category"])
 
         # filter by dosage form
-        dosage_form = self.request.query_params.get("dosage-form", "")
-        if dosage_form:
-            products = products.filter(base_product__dosage_form__icontains=dosage_form)
+        if filters["dosage_form"]:
+            products = products.filter(
+                base_product__dosage_form__slug=filters["dosage_form"]
+            )
 
         # filter by manufacturer
-        manufacturer = self.request.query_params.get("manufacturer", "")
-        if manufacturer:
-            products = products.filter(base_product__manufacturer__slug=manufacturer)
+        if filters["manufacturer"]:
+            products = products.filter(
+                base_product__manufacturer__slug=filters["manufacturer"]
+            )
 
         # filter by active-ingredients
-        active_ingredients = self.request.query_params.getlist(
-            "active-ingredients", [""]
-        )
-        if active_ingredients[0]:
+        if filters["active_ingredients"]:
             products = products.filter(
-                base_product__active_ingredients__slug__in=active_ingredients
+                base_product__active_ingredients__slug__in=filters["active_ingredients"]
             )
 
         return products
@@ -18,13 +18,13 @@ from rest_framework.generics import (
 from accountio.choices import OrganizationUserRole
 from accountio.models import OrganizationUser, TransactionOrganizationUser, Organization
 
-from notificationio.models import Notification
 from notificationio.services import NotificationService
 
-from orderio.choices import OrderDeliveryStatus
-from orderio.models import Order
+from orderio.choices import OrderDeliveryStatus, SalesPeriod
+from orderio.models import CustomerDailySales, Order
 
 from weapi.rest import permissions
+from weapi.rest.views.dashboards import BaseSalesSeriesList
 from weapi.rest.serializers.organizations import (
     PrivateCustomerTransactionHistoryDetailSerializer,
 )
@@ -97,14 +97,11 @@ class PrivateOrganizationUserList(ListCreateAPIView):
             notification_service = NotificationService(
                 request=self.request,
             )
-            notification: Notification = notification_service.create_notification_with_sending_notification_to_organization_users(
+            notification_service.notify(
                 previous_data={},
                 saved_or_updated_instance=instance,
+                user_ids=[instance.user_id] if role == "CUSTOMER" else [],
             )
-            if role == "CUSTOMER":
-                notification_service.send_notification_to_custom_users(
-                    notification=notification, user_ids=[instance.user.id]
-                )
 
             return serializer
 
@@ -212,12 +209,10 @@ class PrivateCustomerTransactionHistoryList(CreateAPIView, RetrieveAPIView):
                 request=self.request,
                 organization=organization,
             )
-            notification: Notification = notification_service.create_notification_with_sending_notification_to_organization_users(
+            notification_service.notify(
                 previous_data={},
                 saved_or_updated_instance=transaction_user,
-            )
-            notification_service.send_notification_to_custom_users(
-                notification=notification, user_ids=[transaction_user.user.id]
+                user_ids=[transaction_user.user_id],
             )
 
 
@@ -252,28 +247,31 @@ class PrivateCustomerCountByMonthOfAYear(ListAPIView):
             11: "november",
             12: "december",
         }
+        # one range scan over the daily rollup of the customer
+        monthly_sales = {
+            sales["period"].month: sales
+            for sales in CustomerDailySales.objects.filter(
+                organization=organization, customer=customer, date__year=year
+            ).series(SalesPeriod.MONTH)
+        }
         for i in range(1, 13):
-            months_orders = Order.objects.filter(
-                organization=organization,
-                customer=customer,
-                created_at__year=year,
-                created_at__month=i,
-            )
-            total_order_price = months_orders.aggregate(total_price=Sum("total_price"))[
-                "total_price"
-            ]
+            sales = monthly_sales.get(i, {})
             orders.append(
                 {
                     "month": months[i],
-                    "count": months_orders.count(),
-                    "total_order_price": total_order_price
-                    if total_order_price != None
-                    else 0,
+                    "count": sales.get("order_count", 0),
+                    "total_order_price": sales.get("net", 0),
                 }
             )
         return orders
 
 
+@extend_schema(description="Customer sales by day, week or month.")
+class PrivateCustomerSalesList(BaseSalesSeriesList):
+    sales_model = CustomerDailySales
+    url_lookups = {"customer_uid": "customer__uid"}
+
+
 @extend_schema(
     description="Order count by all current status of merchant customer.",
 )
@@ -309,19 +307,16 @@ class PrivateCustomerOrderCount(RetrieveAPIView):
         except Order.DoesNotExist:
             raise APIException(detail="Invalid order.")
 
-        order_count_by_status = []
-
-        orders = queryset.filter(delivery_statuses__stage="CURRENT")
-
-        for key, value in OrderDeliveryStatus.choices:
-            order_count = orders.filter(delivery_statuses__status=key).aggregate(
-                total_orders=Count("uid")
-            )["total_orders"]
-            data = {
-                "status": key,
-                "total_order_count": order_count,
-            }
-            order_count_by_status.append(data)
+        # one GROUP BY on the current status column
+        order_counts = dict(
+            queryset.order_by()
+            .values_list("current_status")
+            .annotate(total_orders=Count("id"))
+        )
+        order_count_by_status = [
+            {"status": key, "total_order_count": order_counts.get(key, 0)}
+            for key in OrderDeliveryStatus.values
+        ]
 
         final_data = {
             "order_count_by_status": order_count_by_status,
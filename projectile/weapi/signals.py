@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accountio.models import TransactionOrganizationUser
+
+from catalogio.models import Product
+
+from orderio.models import Order, OrderDelivery
+
+from .dashboards import invalidate_dashboard
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=TransactionOrganizationUser)
+@receiver(post_delete, sender=TransactionOrganizationUser)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_organization_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard(instance.organization_id)
+
+
+@receiver(post_save, sender=OrderDelivery)
+@receiver(post_delete, sender=OrderDelivery)
+def orderdelivery_invalidate_organization_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard(instance.order.organization_id)